@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 11:45
+# Yapılan Değişiklikler:
+# 1. Şube bazlı ERP ürün sorgusunun eski (ilişkili TOP 1 alt sorgulu) ve yeni (CTE/JOIN) hallerini
+#    yerel bir SQL Server test veritabanı üzerinde karşılaştıran benchmark betiği oluşturuldu.
+#
+# Kullanım (SonTechBot_Project klasöründen):
+#   python -m benchmarks.erp_product_query_benchmark --server localhost --database ERP12_BENCH \
+#       --username sa --password Parola123! --seed --products 40000 --locations 12
+#
+# '--seed' verilirse 'fixtures/erp12_fixture.sql' ile test tabloları SİLİNİP yeniden oluşturulur.
+# Bu nedenle betik yalnızca boş bir test veritabanına karşı çalıştırılmalıdır.
+
+import argparse
+import os
+import re
+import statistics
+import time
+
+from sontechbot.erp_integrations.erp12_handler import (PRODUCTS_FOR_BRANCH_QUERY,
+                                                       ERP12Handler)
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "erp12_fixture.sql")
+
+# Karşılaştırma için sorgunun yeniden yazılmadan önceki hali. Parametreler: (lokasyon, fiyat listesi, lokasyon)
+LEGACY_PRODUCTS_FOR_BRANCH_QUERY = """
+        SELECT
+            s.ID AS erp_product_id, s.KOD AS stok_kod, s.AD AS name,
+            (SELECT MIN(sb.BARKOD) FROM dbo.STOK_BARKOD sb
+             INNER JOIN dbo.STOK_STOK_BIRIM ssb_b1 ON sb.STOK_STOK_BIRIM = ssb_b1.ID
+             WHERE ssb_b1.STOK = s.ID AND ssb_b1.VARSAYILAN = 1) AS barcode1,
+            brm.AD AS unit, CAST(ISNULL(v.KDV_PAREKENDE, 0) AS INT) AS vat_rate,
+            sg.AD AS erp_grup_kod,
+            smk.AD AS erp_marka_adi,
+            s.WEBDEYAYINLANIRMI AS web_publish_flag,
+            ISNULL((SELECT TOP 1 smiktar.MIKTAR FROM dbo.STOK_MIKTAR smiktar
+                    WHERE smiktar.STOK = s.ID AND smiktar.LOKASYON = ?), 0) AS erp_stock_quantity,
+            ISNULL((SELECT TOP 1 fiyat.FIYAT FROM dbo.STOK_STOK_BIRIM_FIYAT fiyat
+                    INNER JOIN dbo.STOK_STOK_BIRIM ssb_fiyat ON fiyat.STOK_STOK_BIRIM = ssb_fiyat.ID
+                    WHERE ssb_fiyat.STOK = s.ID AND ssb_fiyat.VARSAYILAN = 1 AND fiyat.STOK_FIYAT_AD = ?), 0) AS price
+        FROM dbo.STOK s
+        LEFT JOIN dbo.STOK_STOK_BIRIM ssb ON s.ID = ssb.STOK AND ssb.VARSAYILAN = 1
+        LEFT JOIN dbo.STOK_BIRIM brm ON ssb.STOK_BIRIM = brm.ID
+        LEFT JOIN dbo.STOK_VERGI v ON s.STOK_VERGI = v.ID
+        LEFT JOIN dbo.STOGRUPSEFC sg ON s.STOK_GRUP = sg.ID
+        LEFT JOIN dbo.STOK_MARKA smk ON s.STOK_MARKA = smk.ID
+        WHERE
+            s.WEBDEYAYINLANIRMI = 1
+            AND ISNULL((SELECT TOP 1 smiktar.MIKTAR FROM dbo.STOK_MIKTAR smiktar WHERE smiktar.STOK = s.ID AND smiktar.LOKASYON = ?), 0) > 0
+        ORDER BY s.ID;
+        """
+
+
+def seed_fixture(cursor, products, locations, price_lists):
+    """Test veritabanını fixture betiği ile sıfırdan doldurur."""
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        script = f.read().format(
+            urun_sayisi=int(products), lokasyon_sayisi=int(locations),
+            fiyat_listesi_sayisi=int(price_lists)
+        )
+    started = time.perf_counter()
+    cursor.execute(script)
+    while cursor.nextset():
+        pass
+    cursor.connection.commit()
+    print(f"Fixture yüklendi: {products} ürün x {locations} lokasyon ({time.perf_counter() - started:.1f} sn)")
+
+
+def _logical_reads(cursor):
+    """'SET STATISTICS IO ON' mesajlarından toplam mantıksal okuma sayısını çıkarır (pyodbc >= 4.0.31)."""
+    messages = getattr(cursor, "messages", None) or []
+    return sum(int(m) for _, text in messages for m in re.findall(r"logical reads (\d+)", str(text)))
+
+
+def run_query(cursor, query, params, repeat):
+    durations, rows, reads = [], [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(query, *params)
+        rows = cursor.fetchall()
+        durations.append(time.perf_counter() - started)
+        reads = _logical_reads(cursor)
+    result_set = {(r.erp_product_id, r.barcode1, float(r.erp_stock_quantity), float(r.price)) for r in rows}
+    return statistics.median(durations), min(durations), len(rows), reads, result_set
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ERP 12 şube ürün sorgusu benchmark'ı")
+    parser.add_argument("--server", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--username", default="")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--seed", action="store_true", help="Fixture verisini yeniden oluştur (tabloları siler!)")
+    parser.add_argument("--products", type=int, default=40000)
+    parser.add_argument("--locations", type=int, default=12)
+    parser.add_argument("--price-lists", type=int, default=2)
+    parser.add_argument("--location-id", type=int, default=1)
+    parser.add_argument("--price-list-id", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    handler = ERP12Handler(erp_config_override={
+        "server": args.server, "database": args.database,
+        "username": args.username, "password": args.password
+    })
+    if not handler._connect_erp_db():
+        raise SystemExit("Test veritabanına bağlanılamadı.")
+    cursor = handler.cursor
+    try:
+        if args.seed:
+            seed_fixture(cursor, args.products, args.locations, args.price_lists)
+
+        cursor.execute("SET STATISTICS IO ON;")
+        cases = [
+            ("Eski (ilişkili alt sorgular)", LEGACY_PRODUCTS_FOR_BRANCH_QUERY,
+             (args.location_id, args.price_list_id, args.location_id)),
+            ("Yeni (CTE + JOIN)", PRODUCTS_FOR_BRANCH_QUERY,
+             (args.location_id, args.price_list_id)),
+        ]
+        results = []
+        for name, query, params in cases:
+            run_query(cursor, query, params, 1)  # Plan önbelleği ve veri sayfalarını ısıt
+            median, best, row_count, reads, result_set = run_query(cursor, query, params, args.repeat)
+            results.append(result_set)
+            print(f"{name:32s} medyan={median * 1000:9.1f} ms  en iyi={best * 1000:9.1f} ms  "
+                  f"satır={row_count:7d}  mantıksal okuma={reads or 'N/A'}")
+
+        print("Sonuçlar aynı mı?:", "EVET" if results[0] == results[1] else "HAYIR - sorguları kontrol edin!")
+    finally:
+        handler._close_erp_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+-- ERP 12 ürün sorguları için SQL Server test verisi (benchmark fixture).
+-- SonTechBot'un okuduğu tabloların yalnızca kullanılan sütunlarını içeren küçük bir şemadır.
+-- Boş bir test veritabanında (örn. SQL Server Express veya mcr.microsoft.com/mssql/server imajı)
+-- çalıştırılmalıdır; canlı ERP veritabanında ÇALIŞTIRMAYIN.
+-- {urun_sayisi}, {lokasyon_sayisi} ve {fiyat_listesi_sayisi} değerleri benchmark betiği tarafından doldurulur.
+
+SET NOCOUNT ON;
+
+IF OBJECT_ID('dbo.STOK_STOK_BIRIM_FIYAT') IS NOT NULL DROP TABLE dbo.STOK_STOK_BIRIM_FIYAT;
+IF OBJECT_ID('dbo.STOK_BARKOD') IS NOT NULL DROP TABLE dbo.STOK_BARKOD;
+IF OBJECT_ID('dbo.STOK_MIKTAR') IS NOT NULL DROP TABLE dbo.STOK_MIKTAR;
+IF OBJECT_ID('dbo.STOK_STOK_BIRIM') IS NOT NULL DROP TABLE dbo.STOK_STOK_BIRIM;
+IF OBJECT_ID('dbo.STOK') IS NOT NULL DROP TABLE dbo.STOK;
+IF OBJECT_ID('dbo.STOK_BIRIM') IS NOT NULL DROP TABLE dbo.STOK_BIRIM;
+IF OBJECT_ID('dbo.STOK_VERGI') IS NOT NULL DROP TABLE dbo.STOK_VERGI;
+IF OBJECT_ID('dbo.STOGRUPSEFC') IS NOT NULL DROP TABLE dbo.STOGRUPSEFC;
+IF OBJECT_ID('dbo.STOK_MARKA') IS NOT NULL DROP TABLE dbo.STOK_MARKA;
+
+CREATE TABLE dbo.STOK_BIRIM (ID INT PRIMARY KEY, AD NVARCHAR(50));
+CREATE TABLE dbo.STOK_VERGI (ID INT PRIMARY KEY, KDV_PAREKENDE DECIMAL(5, 2));
+CREATE TABLE dbo.STOGRUPSEFC (ID INT PRIMARY KEY, AD NVARCHAR(100));
+CREATE TABLE dbo.STOK_MARKA (ID INT PRIMARY KEY, AD NVARCHAR(100));
+CREATE TABLE dbo.STOK (
+    ID INT PRIMARY KEY, KOD NVARCHAR(50), AD NVARCHAR(200), STOK_VERGI INT,
+    STOK_GRUP INT, STOK_MARKA INT, WEBDEYAYINLANIRMI BIT
+);
+CREATE TABLE dbo.STOK_STOK_BIRIM (ID INT PRIMARY KEY, STOK INT, STOK_BIRIM INT, VARSAYILAN BIT);
+CREATE TABLE dbo.STOK_BARKOD (ID INT IDENTITY PRIMARY KEY, STOK_STOK_BIRIM INT, BARKOD NVARCHAR(50));
+CREATE TABLE dbo.STOK_MIKTAR (ID INT IDENTITY PRIMARY KEY, STOK INT, LOKASYON INT, MIKTAR DECIMAL(18, 3));
+CREATE TABLE dbo.STOK_STOK_BIRIM_FIYAT (ID INT IDENTITY PRIMARY KEY, STOK_STOK_BIRIM INT, STOK_FIYAT_AD INT, FIYAT DECIMAL(18, 2));
+
+-- ERP 12 kurulumlarında bulunan tipik ikincil indeksler
+CREATE INDEX IX_STOK_STOK_BIRIM_STOK ON dbo.STOK_STOK_BIRIM (STOK, VARSAYILAN);
+CREATE INDEX IX_STOK_BARKOD_SSB ON dbo.STOK_BARKOD (STOK_STOK_BIRIM);
+CREATE INDEX IX_STOK_MIKTAR_STOK_LOK ON dbo.STOK_MIKTAR (STOK, LOKASYON);
+CREATE INDEX IX_STOK_FIYAT_SSB ON dbo.STOK_STOK_BIRIM_FIYAT (STOK_STOK_BIRIM, STOK_FIYAT_AD);
+
+INSERT INTO dbo.STOK_BIRIM (ID, AD) VALUES (1, N'ADET'), (2, N'KG');
+INSERT INTO dbo.STOK_VERGI (ID, KDV_PAREKENDE) VALUES (1, 1), (2, 10), (3, 20);
+
+WITH sayilar AS (
+    SELECT TOP ({urun_sayisi}) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n
+    FROM sys.all_objects a CROSS JOIN sys.all_objects b
+)
+SELECT n INTO #sayilar FROM sayilar;
+
+INSERT INTO dbo.STOGRUPSEFC (ID, AD) SELECT n, CONCAT(N'GRUP ', n) FROM #sayilar WHERE n <= 200;
+INSERT INTO dbo.STOK_MARKA (ID, AD) SELECT n, CONCAT(N'MARKA ', n) FROM #sayilar WHERE n <= 500;
+
+INSERT INTO dbo.STOK (ID, KOD, AD, STOK_VERGI, STOK_GRUP, STOK_MARKA, WEBDEYAYINLANIRMI)
+SELECT n, CONCAT('STK', n), CONCAT(N'Ürün ', n), (n % 3) + 1, (n % 200) + 1, (n % 500) + 1,
+       CASE WHEN n % 10 = 0 THEN 0 ELSE 1 END
+FROM #sayilar;
+
+INSERT INTO dbo.STOK_STOK_BIRIM (ID, STOK, STOK_BIRIM, VARSAYILAN)
+SELECT n, n, (n % 2) + 1, 1 FROM #sayilar;
+
+INSERT INTO dbo.STOK_BARKOD (STOK_STOK_BIRIM, BARKOD)
+SELECT n, CONCAT('869', RIGHT(CONCAT('0000000000', n), 10)) FROM #sayilar;
+INSERT INTO dbo.STOK_BARKOD (STOK_STOK_BIRIM, BARKOD)
+SELECT n, CONCAT('868', RIGHT(CONCAT('0000000000', n), 10)) FROM #sayilar WHERE n % 4 = 0;
+
+INSERT INTO dbo.STOK_MIKTAR (STOK, LOKASYON, MIKTAR)
+SELECT s.n, l.n, (s.n * 7 + l.n) % 25
+FROM #sayilar s CROSS JOIN (SELECT n FROM #sayilar WHERE n <= {lokasyon_sayisi}) l;
+
+INSERT INTO dbo.STOK_STOK_BIRIM_FIYAT (STOK_STOK_BIRIM, STOK_FIYAT_AD, FIYAT)
+SELECT s.n, f.n, CASE WHEN s.n % 50 = 0 THEN 0 ELSE 5 + (s.n % 300) + f.n END
+FROM #sayilar s CROSS JOIN (SELECT n FROM #sayilar WHERE n <= {fiyat_listesi_sayisi}) f;
+
+DROP TABLE #sayilar;
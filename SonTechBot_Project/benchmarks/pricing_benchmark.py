@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 03:00
+# Yapılan Değişiklikler:
+# 1. Dönüştürme aşamasının (kategori kuralları ile fiyat, stok tamponu, gönderilebilirlik ve fiyatsız ürün
+#    tespiti) süresini, ERP ve Trendyol olmadan ölçen benchmark betiği oluşturuldu. NumPy kuruluysa vektörel
+#    yol ile düz Python yolu karşılaştırılır.
+#
+# Kullanım (SonTechBot_Project klasöründen):
+#   python -m benchmarks.pricing_benchmark --sizes 10000,100000,500000
+
+import argparse
+import time
+
+from sontechbot.core import pricing
+from sontechbot.core.synchronizer import _transform_products
+from tests.fakes import SyntheticERP
+
+
+def measure(rows, branch, pricing_rules, repeat):
+    """'_transform_products' çağrısının en iyi süresini ve gönderilecek ürün sayısını döndürür."""
+    best, sent = None, 0
+    for _ in range(repeat):
+        result = {"processed": 0, "issues": 0, "unpriced": [], "issue_records": []}
+        started = time.perf_counter()
+        sent = len(_transform_products(rows, branch, pricing_rules, result, set()))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dönüştürme (fiyatlandırma) aşaması benchmark'ı")
+    parser.add_argument("--sizes", default="10000,100000,500000", help="Virgülle ayrılmış satır sayıları")
+    parser.add_argument("--unpriced-rate", type=float, default=0.01, help="Fiyatı 0 olan ürünlerin oranı (0-1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Her ölçüm kaç kez tekrarlansın (en iyisi raporlanır)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    modes = [True, False] if pricing.VECTORIZED_PRICING_ENABLED else [False]
+    print(f"{'Satır':>8s} {'Yol':8s} {'Süre(sn)':>9s} {'Satır/sn':>12s} {'Gönderi':>9s}")
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        erp = SyntheticERP(size, zero_stock_rate=0.0, unpriced_rate=args.unpriced_rate, seed=args.seed)
+        branch = dict(erp.branch_maps()[0], stock_buffer=2)
+        rows = list(erp.rows_for_branch(int(branch["erp_location_id"]), int(branch["erp_price_list_id"])))
+        pricing_rules = pricing.compile_pricing_rules(erp.categories())
+        for vectorized in modes:
+            pricing.VECTORIZED_PRICING_ENABLED = vectorized
+            elapsed, sent = measure(rows, branch, pricing_rules, args.repeat)
+            print(f"{len(rows):>8d} {'NumPy' if vectorized else 'Python':8s} {elapsed:>9.3f} "
+                  f"{len(rows) / elapsed:>12.0f} {sent:>9d}")
+        pricing.VECTORIZED_PRICING_ENABLED = modes[0]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 17:45
+# Yapılan Değişiklikler:
+# 1. Sorun raporu, ana panel ve tekrar kontrolü sorgularının, göçlerle eklenen indekslerden önce ve sonra
+#    büyük bir yerel SQLite veritabanında ne kadar sürdüğünü ölçen benchmark betiği oluşturuldu.
+#
+# Kullanım (SonTechBot_Project klasöründen):
+#   python -m benchmarks.sqlite_index_benchmark --issues 1000000 --history 100000 --repeat 5
+#
+# Betik geçici bir veritabanı dosyası oluşturur ve iş bitince siler; uygulamanın kendi veritabanına dokunmaz.
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sontechbot.repositories import CREATE_TABLES_SCRIPT
+from sontechbot.repositories.base_repository import BaseRepository
+from sontechbot.repositories.migrations import run_migrations
+
+ISSUE_TYPES = ["Fiyatsız Ürün", "Eşleşmemiş Ürün", "API Güncelleme Hatası", "Paket Sonucu Alınamadı"]
+SYNC_STATUSES = ["Başarılı", "Uyarılarla Tamamlandı", "Kritik Hata"]
+BRANCH_COUNT = 12
+
+
+class _BenchmarkRepository(BaseRepository):
+    """Uygulamayla aynı PRAGMA ayarlarıyla, verilen geçici dosyaya bağlanmak için kullanılır."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+
+def seed(conn, issue_count, history_count, mapping_count, resolved_ratio):
+    started = time.perf_counter()
+    now = datetime.datetime.now()
+    conn.executescript(CREATE_TABLES_SCRIPT)
+
+    def issue_rows():
+        for i in range(issue_count):
+            ts = now - datetime.timedelta(seconds=random.randint(0, 90 * 24 * 3600))
+            yield (
+                str(i), f"869{i:010d}", f"Şube {i % BRANCH_COUNT}", ISSUE_TYPES[i % len(ISSUE_TYPES)],
+                "Benchmark kaydı", ts.strftime('%Y-%m-%d %H:%M:%S'), 1 if random.random() < resolved_ratio else 0
+            )
+
+    conn.executemany(
+        "INSERT INTO sync_issues (erp_product_id, barcode, erp_branch_name, issue_type, message, timestamp, is_resolved) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", issue_rows()
+    )
+    conn.executemany(
+        "INSERT INTO sync_history (start_time, duration_seconds, sync_type, status, summary_message) VALUES (?, ?, ?, ?, ?)",
+        (
+            ((now - datetime.timedelta(minutes=5 * i)).strftime('%Y-%m-%d %H:%M:%S'), 12.5, "auto",
+             SYNC_STATUSES[i % len(SYNC_STATUSES)], "Benchmark")
+            for i in range(history_count)
+        )
+    )
+    conn.executemany(
+        "INSERT INTO product_platform_mappings (erp_product_id, erp_barcode, platform_name) VALUES (?, ?, 'trendyol')",
+        ((str(i), f"869{i:010d}") for i in range(mapping_count))
+    )
+    conn.commit()
+    print(f"Veri yüklendi: {issue_count} sorun, {history_count} geçmiş, {mapping_count} eşleştirme "
+          f"({time.perf_counter() - started:.1f} sn)")
+
+
+def build_cases(issue_count):
+    day_ago = (datetime.datetime.now() - datetime.timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+    sample_id = issue_count // 2
+    return [
+        ("Çözülmemiş sorunlar (son 100)",
+         "SELECT * FROM sync_issues WHERE is_resolved = 0 ORDER BY timestamp DESC LIMIT 100", ()),
+        ("Tüm sorunlar (son 100)",
+         "SELECT * FROM sync_issues ORDER BY timestamp DESC LIMIT 100", ()),
+        ("Türe göre çözülmemiş sayılar",
+         "SELECT issue_type, COUNT(*) FROM sync_issues WHERE is_resolved = 0 GROUP BY issue_type", ()),
+        ("Çözülmemiş toplam",
+         "SELECT COUNT(*) FROM sync_issues WHERE is_resolved = 0", ()),
+        ("Tekrar kontrolü",
+         "SELECT id FROM sync_issues WHERE erp_product_id = ? AND erp_branch_name = ? AND issue_type = ? AND is_resolved = 0",
+         (str(sample_id), f"Şube {sample_id % BRANCH_COUNT}", ISSUE_TYPES[sample_id % len(ISSUE_TYPES)])),
+        ("Son 24 saat senkronizasyonlar",
+         "SELECT status FROM sync_history WHERE start_time >= ?", (day_ago,)),
+        ("Son senkronizasyon özeti",
+         "SELECT duration_seconds, summary_message FROM sync_history ORDER BY start_time DESC LIMIT 1", ()),
+        ("Barkoda göre platform eşleştirmesi",
+         "SELECT * FROM product_platform_mappings WHERE erp_barcode = ? AND platform_name = ?",
+         (f"869{sample_id:010d}", "trendyol")),
+    ]
+
+
+def measure(conn, query, params, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite indeks/göç benchmark'ı")
+    parser.add_argument("--issues", type=int, default=1000000)
+    parser.add_argument("--history", type=int, default=100000)
+    parser.add_argument("--mappings", type=int, default=200000)
+    parser.add_argument("--resolved-ratio", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--show-plans", action="store_true", help="Göç sonrası sorgu planlarını da yazdır")
+    args = parser.parse_args()
+
+    random.seed(42)
+    fd, db_path = tempfile.mkstemp(suffix=".db", prefix="sontechbot_bench_")
+    os.close(fd)
+    conn = _BenchmarkRepository(db_path)._open_connection()
+    try:
+        seed(conn, args.issues, args.history, args.mappings, args.resolved_ratio)
+        cases = build_cases(args.issues)
+        before = [measure(conn, query, params, args.repeat) for _, query, params in cases]
+
+        started = time.perf_counter()
+        run_migrations(conn)
+        print(f"Göçler uygulandı ({time.perf_counter() - started:.1f} sn)\n")
+
+        print(f"{'Sorgu':38s} {'Önce (ms)':>12s} {'Sonra (ms)':>12s} {'Hızlanma':>10s}")
+        for (name, query, params), before_s in zip(cases, before):
+            after_s = measure(conn, query, params, args.repeat)
+            speedup = before_s / after_s if after_s else float('inf')
+            print(f"{name:38s} {before_s * 1000:12.2f} {after_s * 1000:12.2f} {speedup:9.1f}x")
+            if args.show_plans:
+                for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params):
+                    print(f"    {row[-1]}")
+    finally:
+        conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
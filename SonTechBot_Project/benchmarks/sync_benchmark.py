@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 00:45
+# Yapılan Değişiklikler:
+# 1. 'run_single_sync_cycle' döngüsünü, üretim ERP'si ve Trendyol yerine sentetik ERP verisi ve yerel sahte
+#    Trendyol sunucusuyla uçtan uca çalıştıran benchmark betiği oluşturuldu. Her ürün sayısı x şube sayısı
+#    için ürün/sn, istek sayısı, gönderilen/alınan bayt ve en yüksek bellek kullanımı raporlanır.
+#
+# Kullanım (SonTechBot_Project klasöründen):
+#   python -m benchmarks.sync_benchmark --sizes 1000,10000,100000 --branches 4
+#   python -m benchmarks.sync_benchmark --sizes 10000 --branches 8 --latency-ms 80 --throttle-rate 0.02 \
+#       --failure-rate 0.01 --delta 0.05 --incremental
+#
+# Her ölçüm ayrı bir geçici veritabanında yapılır ve iş bitince silinir; uygulamanın kendi veritabanına dokunulmaz.
+# Sahte sunucu aynı süreçte çalıştığı için sonuçlar, ağ ve Trendyol tarafı hariç istemci maliyetini gösterir.
+# '--unthrottled' verilmezse istemcinin gerçek hız sınırları (config.TRENDYOL_RATE_LIMITS) geçerlidir.
+# Paket sonucu kontrolü döngüyle eş zamanlı çalışabildiğinden, istek ve bayt sayılarına bu sorgular da girebilir.
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from sontechbot import config
+from sontechbot.core import synchronizer
+from sontechbot.core.batch_poller import batch_poller
+from sontechbot.repositories import (branch_repo, category_repo,
+                                     initialize_database, settings_repo)
+from sontechbot.repositories.base_repository import BaseRepository
+from tests.fakes import FakeTrendyolServer, SyntheticERP
+
+UNTHROTTLED_RATE_LIMIT = {"rate": 100000, "burst": 100000}
+
+
+def seed_settings(server, erp, args):
+    """Geçici veritabanına sahte sunucunun adresini, şubeleri ve kategori kurallarını yazar."""
+    settings = {
+        "trendyol_api_key": server.api_key, "trendyol_api_secret": server.api_secret,
+        "trendyol_supplier_id": server.supplier_id, "trendyol_test_mode_enabled": "True",
+        "trendyol_base_url_override": server.base_url,
+        "sync_max_workers": args.workers, "erp_bulk_fetch_enabled": str(not args.per_branch),
+        "delta_sync_enabled": "True", "adaptive_chunk_enabled": str(not args.fixed_chunks),
+        "erp_incremental_mode": "rowversion" if args.incremental else "off",
+    }
+    for key, value in settings.items():
+        settings_repo.save_app_setting(key, value)
+    for branch in erp.branch_maps():
+        branch_repo.add_or_update_branch_mapping(branch)
+    for rule in erp.categories():
+        category_repo.add_or_update_category_rule(rule)
+
+
+def wait_for_batches(timeout_seconds):
+    """Gönderilen paketlerin sonuç kontrolünün bitmesini en fazla 'timeout_seconds' saniye bekler."""
+    deadline = time.monotonic() + timeout_seconds
+    while batch_poller.is_running() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    batch_poller.stop()
+
+
+def measure_cycle(server, label, sync_type, track_memory):
+    server.reset_stats()
+    if track_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = synchronizer.run_single_sync_cycle(sync_type=sync_type)
+    elapsed = time.perf_counter() - started
+    peak_bytes = tracemalloc.get_traced_memory()[1] if track_memory else None
+    if track_memory:
+        tracemalloc.stop()
+    return {"label": label, "elapsed": elapsed, "result": result, "server": server.get_stats(), "peak_bytes": peak_bytes}
+
+
+def run_case(product_count, args, work_dir):
+    """Tek bir ürün sayısı için geçici veritabanı kurar, döngüyü (ve istenirse delta döngüsünü) ölçer."""
+    BaseRepository.close_all_connections()
+    BaseRepository.db_path = os.path.join(work_dir, f"bench_{product_count}.db")
+    initialize_database()
+
+    erp = SyntheticERP(product_count, branch_count=args.branches, unpriced_rate=args.unpriced_rate, seed=args.seed)
+    server = FakeTrendyolServer(latency_seconds=args.latency_ms / 1000, throttle_rate=args.throttle_rate,
+                                failure_rate=args.failure_rate, retry_after_seconds=args.retry_after,
+                                seed=args.seed).start()
+    measurements = []
+    try:
+        seed_settings(server, erp, args)
+        synchronizer.set_erp_handler_factory(erp.handler_factory())
+        measurements.append(measure_cycle(server, "ilk", "benchmark", not args.skip_memory))
+        if args.batch_wait:
+            wait_for_batches(args.batch_wait)
+        if args.delta:
+            changed = erp.mutate(args.delta, seed=args.seed)
+            measurements.append(measure_cycle(server, f"delta ({len(changed)} ürün)", "benchmark-delta", not args.skip_memory))
+            if args.batch_wait:
+                wait_for_batches(args.batch_wait)
+    finally:
+        batch_poller.stop()
+        synchronizer.close_trendyol_client()
+        synchronizer.set_erp_handler_factory(None)
+        server.stop()
+        BaseRepository.close_all_connections()
+    return measurements
+
+
+def print_row(product_count, branches, m):
+    result, stats = m["result"], m["server"]
+    processed = result["products_processed"]
+    rate = processed / m["elapsed"] if m["elapsed"] else 0
+    peak = f"{m['peak_bytes'] / 1024 / 1024:9.1f}" if m["peak_bytes"] is not None else f"{'-':>9s}"
+    print(f"{product_count:>8d} {branches:>5d} {m['label']:22s} {m['elapsed']:8.2f} {processed:>9d} {rate:>10.0f} "
+          f"{result['products_sent']:>8d} {stats['requests']:>6d} {stats['throttled']:>5d} "
+          f"{stats['bytes_in'] / 1024:>10.0f} {stats['bytes_out'] / 1024:>9.0f} {peak}  {result['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca senkronizasyon döngüsü benchmark'ı (sahte ERP ve Trendyol)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Virgülle ayrılmış ürün (SKU) sayıları")
+    parser.add_argument("--branches", type=int, default=4, help="Şube sayısı")
+    parser.add_argument("--workers", type=int, default=4, help="Paralel işlenecek en fazla şube sayısı (sync_max_workers)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Sahte sunucunun her isteğe eklediği gecikme")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 dönecek isteklerin oranı (0-1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 yanıtlarındaki 'Retry-After' süresi (sn)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Paket sonucunda FAILURE dönecek ürünlerin oranı (0-1)")
+    parser.add_argument("--unpriced-rate", type=float, default=0.0, help="Fiyatı 0 olan ürünlerin oranı (0-1)")
+    parser.add_argument("--delta", type=float, default=0.0,
+                        help="İlk döngüden sonra bu orandaki ürünü değiştirip ikinci (delta) döngüyü de ölç")
+    parser.add_argument("--incremental", action="store_true", help="Delta döngüsünde ERP'den artımlı okuma yap")
+    parser.add_argument("--per-branch", action="store_true", help="Toplu ERP sorgusu yerine şube bazlı okuma kullan")
+    parser.add_argument("--fixed-chunks", action="store_true", help="Uyarlanabilir paket boyutunu kapat")
+    parser.add_argument("--unthrottled", action="store_true", help="İstemci tarafı hız sınırlarını kaldır")
+    parser.add_argument("--batch-wait", type=int, default=0,
+                        help="Her döngüden sonra paket sonuçlarının kontrolü en fazla kaç sn beklensin (0: bekleme)")
+    parser.add_argument("--skip-memory", action="store_true", help="tracemalloc ile bellek ölçümü yapma (daha hızlı)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.unthrottled:
+        config.TRENDYOL_RATE_LIMITS = {key: dict(UNTHROTTLED_RATE_LIMIT) for key in config.TRENDYOL_RATE_LIMITS}
+    if args.batch_wait:
+        batch_poller.initial_delay = 0.5
+
+    original_db_path = BaseRepository.db_path
+    work_dir = tempfile.mkdtemp(prefix="sontechbot_sync_bench_")
+    print(f"{'SKU':>8s} {'Şube':>5s} {'Döngü':22s} {'Süre(sn)':>8s} {'İşlenen':>9s} {'Ürün/sn':>10s} "
+          f"{'Gönderi':>8s} {'İstek':>6s} {'429':>5s} {'Giden(KB)':>10s} {'Gelen(KB)':>9s} {'Tepe(MB)':>9s}  Durum")
+    try:
+        for product_count in sizes:
+            for measurement in run_case(product_count, args, work_dir):
+                print_row(product_count, args.branches, measurement)
+    finally:
+        BaseRepository.db_path = original_db_path
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
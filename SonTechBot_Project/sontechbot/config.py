@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 07.07.2025 04:30
+# Güncelleme Tarihi: 19.10.2026 07:30
 # Yapılan Değişiklikler:
-# 1. Artık otomatik olarak algılandığı için, ERP_DATABASE_CONFIG_DEFAULT içerisindeki "driver" anahtarı kaldırıldı.
+# 1. 'PRICE_ROUNDING_TIERS' açıklamasına en düşük/en yüksek fiyat sınırının yuvarlamadan önce uygulandığı eklendi.
 
 import os
 from appdirs import user_data_dir
@@ -14,7 +14,9 @@ APP_AUTHOR = "SonTech"
 USER_DATA_DIR = user_data_dir(APP_NAME, APP_AUTHOR)
 LOGS_DIR = os.path.join(USER_DATA_DIR, "logs")
 LOG_FILE = os.path.join(LOGS_DIR, "sontechbot_app.log")
+SYNC_LOG_FILE = os.path.join(LOGS_DIR, "sontechbot_sync.log")
 _DATABASE_FILE_PATH = os.path.join(USER_DATA_DIR, "sontechbot.db")
+ARCHIVE_DIR = os.path.join(USER_DATA_DIR, "archive")
 
 # --- Uygulama Bilgileri ---
 APP_VERSION = "1.7.0"
@@ -34,13 +36,114 @@ TRENDYOL_API_CONFIG_DEFAULT = {
     "api_secret": "TRNDYOL_API_SECRET",
     "supplier_id": "TRNDYOL_SATICI_ID",
     "base_url": "https://api.tgoapps.com",
-    "test_mode_enabled": True
+    "test_mode_enabled": True,
+    # Boş değilse tüm Trendyol istekleri bu adrese yapılır (ör. 'http://127.0.0.1:8765'). Yalnızca test içindir.
+    "base_url_override": ""
 }
 
+# Trendyol uç noktaları için istek hızı sınırları. Anahtar, istek yolunda aranan ifadedir;
+# eşleşme olmazsa "default" kullanılır. 'rate': saniyedeki istek sayısı, 'burst': art arda yapılabilecek istek sayısı.
+TRENDYOL_RATE_LIMITS = {
+    "price-and-inventory": {"rate": 5, "burst": 10},
+    "batch-requests": {"rate": 10, "burst": 20},
+    "default": {"rate": 5, "burst": 10}
+}
+
+# Hız sınırı (429) ve geçici sunucu hatalarında yapılacak yeniden denemeler.
+TRENDYOL_RETRY_SETTINGS = {
+    "max_retries": 4,
+    "backoff_base_seconds": 1.0,
+    "backoff_max_seconds": 30.0
+}
+
+# Fiyat kurallarında 'tiered' yuvarlamanın kademeleri: (üst sınır, adım). Fiyat, sınırı aşmayan ilk kademenin
+# adımına yukarı yuvarlanıp 0.01 düşülür. Örn: 4.32 -> 4.39, 12.30 -> 12.99, 123.40 -> 129.99.
+# Kuralın en düşük/en yüksek fiyatı yuvarlamadan önce uygulanır; yuvarlanan fiyat sınırı aşarsa bir adım içeri
+# alınır (ör. en yüksek 95 -> 94.99). Sınırlar arasında x.99 ile biten fiyat yoksa sınır değeri kullanılır.
+# Son kademenin üst sınırı None olmalıdır.
+PRICE_ROUNDING_TIERS = (
+    (10.0, 0.1),
+    (100.0, 1.0),
+    (None, 10.0),
+)
+
 GENERAL_SETTINGS_DEFAULT = {
     "sync_interval_minutes": 30,
     "database_file_path": _DATABASE_FILE_PATH,
-    "log_level": "INFO"
+    "log_level": "INFO",
+    # Ana paneldeki işlem loglarında tutulacak en fazla satır. Daha eski satırlar ekrandan düşer.
+    "log_max_lines": 500
+}
+
+SYNC_SETTINGS_DEFAULT = {
+    # True ise sadece son başarılı gönderimden bu yana stoğu/fiyatı değişen ürünler gönderilir.
+    "delta_sync_enabled": True,
+    # Aynı anda işlenecek en fazla şube sayısı. 1 ise şubeler sırayla işlenir.
+    "sync_max_workers": 4,
+    # True ise tüm aktif şubelerin stok ve fiyatları ERP'den tek bir sorgu turunda çekilir. Bu turda tüm
+    # şubelerin ürün listeleri birlikte bellekte tutulur. Çok büyük kataloglarda belleği şube başına bir parçayla
+    # sınırlamak için False yapılmalıdır; o zaman her şube parça parça okunup parça parça gönderilir.
+    "erp_bulk_fetch_enabled": True,
+    # ERP okumasında 'fetchmany' ile tek seferde okunacak satır sayısı (toplu ve şube bazlı okuma).
+    "erp_fetch_batch_size": 5000,
+    # True ise Trendyol'a gönderilen paket boyutu yanıt süresine ve hata/429 yanıtlarına göre otomatik ayarlanır.
+    "adaptive_chunk_enabled": True,
+    # Tek bir stok/fiyat isteğinde gönderilebilecek en fazla ürün sayısı (API sınırı).
+    "chunk_size_max": 1000,
+    # ERP artımlı okuma kipi: 'off' = her döngüde tüm stoklu ürünler okunur, 'change_tracking' = SQL Server
+    # Change Tracking (STOK_MIKTAR ve STOK_STOK_BIRIM_FIYAT tablolarında açık olmalı), 'rowversion' = aşağıdaki
+    # rowversion sütunları, 'modified_since' = aşağıdaki son değişiklik zamanı (datetime) sütunları.
+    # Artımlı kipte yalnızca son başarılı döngüden bu yana stoğu veya fiyatı değişen ürünler okunur.
+    "erp_incremental_mode": "off",
+    # 'rowversion' / 'modified_since' kiplerinde STOK_MIKTAR ve STOK_STOK_BIRIM_FIYAT tablolarındaki sütun adları.
+    "erp_incremental_stock_column": "",
+    "erp_incremental_price_column": "",
+    # Artımlı kipte bile en fazla bu kadar dakikada bir tam okuma yapılır; silinen satırlar, katalog
+    # değişiklikleri ve stoktan çıkan ürünler bu turda düzeltilir.
+    "erp_full_reconcile_minutes": 360
+}
+
+MAINTENANCE_SETTINGS_DEFAULT = {
+    # Bu günden daha eski ÇÖZÜLMÜŞ sorun kayıtları arşivlenip veritabanından silinir.
+    "issue_retention_days": 30,
+    # Bu günden daha eski senkronizasyon geçmişi kayıtları arşivlenip veritabanından silinir.
+    "history_retention_days": 90,
+    # Bakım işinin en fazla kaç saatte bir çalışacağı.
+    "maintenance_interval_hours": 24,
+    # True ise silinen kayıtlar önce ARCHIVE_DIR altına sıkıştırılmış (.jsonl.gz) dosyalar olarak yazılır.
+    "archive_enabled": True
+}
+
+SCHEDULE_SETTINGS_DEFAULT = {
+    # True ise otomatik senkronizasyon açıktır; program yeniden açıldığında plan kaldığı yerden sürer.
+    "auto_sync_enabled": False,
+    # Bir döngü bir sonraki çalışma zamanına kadar bitmezse: 'skip' = o çalışmayı atla,
+    # 'queue' = döngü bitince bir kez daha çalıştır.
+    "sync_overlap_policy": "skip",
+    # Saat aralıklarına göre farklı sıklıklar. Biçim: '[günler] SS:DD-SS:DD=dakika', tanımlar ';' ile ayrılır.
+    # Örnek: '1-6 09:00-22:00=5' (Pazartesi-Cumartesi mağaza saatlerinde 5 dakikada bir). Boşsa her zaman
+    # 'sync_interval_minutes' kullanılır.
+    "sync_windows": "",
+    # True ise tam (fiyat) senkronizasyonuna ek olarak, yalnızca ERP stok miktarlarını okuyup stoğu değişen
+    # ürünleri son gönderilen fiyatlarla gönderen hızlı stok senkronizasyonu da çalışır. Fiyat değişiklikleri
+    # ve yeni ürünler 'sync_interval_minutes' aralığıyla çalışan tam senkronizasyonda gönderilir.
+    "stock_lane_enabled": False,
+    # Hızlı stok senkronizasyonunun çalışma aralığı (dakika).
+    "stock_sync_interval_minutes": 2
+}
+
+METRICS_SETTINGS_DEFAULT = {
+    # True ise senkronizasyon metrikleri (işlenen/gönderilen ürün, istek ve sorgu süreleri, paket hataları)
+    # merkezi izleme sisteminin okuyabileceği Prometheus/OpenMetrics metin biçiminde yayınlanır.
+    "metrics_enabled": False,
+    # Metriklerin 'http://<adres>:<port>/metrics' üzerinden sunulacağı port. 0 ise HTTP uç noktası açılmaz.
+    "metrics_http_port": 9464,
+    # HTTP uç noktasının dinleyeceği adres. Merkezden okunacaksa '0.0.0.0' veya mağaza PC'sinin IP adresi yazılır.
+    "metrics_bind_address": "127.0.0.1",
+    # Doluysa metrikler bu dosyaya da yazılır (node_exporter 'textfile' toplayıcısı için, uzantısı '.prom' olmalı).
+    "metrics_textfile_path": "",
+    # Metrik dosyasının kaç saniyede bir yenileneceği.
+    "metrics_textfile_interval_seconds": 15
 }
 
 # --- Lisanslama ve Güncelleme Ayarları ---
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 14:45
+# Yapılan Değişiklikler:
+# 1. Trendyol'a gönderilen stok/fiyat paketlerinin boyutunu, gözlenen yanıt süresine, gövde boyutuna ve
+#    hata/429 yanıtlarına göre büyütüp küçülten 'AdaptiveChunker' sınıfı oluşturuldu.
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_SIZE = 50
+DEFAULT_MIN_SIZE = 10
+DEFAULT_MAX_SIZE = 1000
+DEFAULT_TARGET_LATENCY_SECONDS = 5.0        # Bu sürenin altında kalan istekler paketin büyütülmesine izin verir
+DEFAULT_MAX_PAYLOAD_BYTES = 2 * 1024 * 1024  # Tek bir isteğin gövdesi için hedeflenen üst sınır
+
+# Bu durum kodları sunucunun yük altında olduğunu gösterir; paket boyutu hemen yarıya indirilir.
+BACKOFF_STATUS_CODES = {408, 413, 429, 500, 502, 503, 504}
+
+
+class AdaptiveChunker:
+    """
+    Paket boyutunu AIMD (toplamsal artış, çarpımsal azalış) mantığıyla ayarlar.
+    Başarılı ve hızlı yanıtlarda paket önce hızla (x1.5), ilk yavaşlama/hata görüldükten sonra
+    ise yavaşça (+%10) büyütülür. 429, 5xx, zaman aşımı gibi durumlarda paket yarıya indirilir.
+    Paralel şube işçileri aynı nesneyi paylaştığı için tüm işlemler kilit altında yapılır.
+    """
+
+    def __init__(self, initial_size=DEFAULT_INITIAL_SIZE, min_size=DEFAULT_MIN_SIZE, max_size=DEFAULT_MAX_SIZE,
+                 target_latency=DEFAULT_TARGET_LATENCY_SECONDS, max_payload_bytes=DEFAULT_MAX_PAYLOAD_BYTES):
+        self.max_size = max(1, int(max_size))
+        self.min_size = max(1, min(int(min_size), self.max_size))
+        self.target_latency = target_latency
+        self.max_payload_bytes = max_payload_bytes
+        self._size = max(self.min_size, min(int(initial_size), self.max_size))
+        self._slow_start = True
+        self._lock = threading.Lock()
+        self.peak_size = self._size
+        self.request_count = 0
+        self.backoff_count = 0
+
+    @classmethod
+    def fixed(cls, size):
+        """Boyutu hiç değişmeyen bir paketleyici döndürür (uyarlanabilir paketleme kapalıyken)."""
+        return cls(initial_size=size, min_size=size, max_size=size)
+
+    @property
+    def size(self):
+        with self._lock:
+            return self._size
+
+    def record(self, item_count, latency_seconds, payload_bytes=0, status_code=None, success=True):
+        """
+        Gönderilen bir paketin sonucunu kaydeder ve bir sonraki paket boyutunu günceller.
+        'status_code' yalnızca hatalı yanıtlarda beklenir; ağ hatasında None olarak verilir.
+        """
+        with self._lock:
+            self.request_count += 1
+            old_size = self._size
+
+            if not success and (status_code is None or status_code in BACKOFF_STATUS_CODES):
+                self._size = max(self.min_size, self._size // 2)
+                self._slow_start = False
+                self.backoff_count += 1
+            elif success:
+                size_limit = self.max_size
+                if payload_bytes and item_count:
+                    bytes_per_item = payload_bytes / item_count
+                    size_limit = min(size_limit, max(self.min_size, int(self.max_payload_bytes / bytes_per_item)))
+
+                if latency_seconds > self.target_latency * 1.5:
+                    self._size = max(self.min_size, int(self._size * 0.75))
+                    self._slow_start = False
+                elif latency_seconds < self.target_latency and item_count >= self._size:
+                    # Yalnızca tam dolu paketler büyümeye esas alınır; son kalan küçük paketler ölçüt değildir.
+                    growth = self._size // 2 if self._slow_start else max(1, self._size // 10)
+                    self._size = self._size + growth
+                self._size = max(self.min_size, min(self._size, size_limit))
+
+            if self._size != old_size:
+                logger.debug(f"Paket boyutu {old_size} -> {self._size} (süre: {latency_seconds:.2f} sn, "
+                             f"durum kodu: {status_code}, başarılı: {success})")
+            self.peak_size = max(self.peak_size, self._size)
+            return self._size
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 05:30
+# Yapılan Değişiklikler:
+# 1. Trendyol ayarları eksikken kontrol iş parçacığı sonlanıyor ve bekleyen paketler (uygulama yeniden
+#    başlatıldıktan sonra bile) bir daha kontrol edilmiyordu. Artık ayarlar artan aralıklarla yeniden okunur.
+# 2. Durum sorgusu sürekli hata veren paketler de 'max_attempts' denemeden sonra takipten çıkarılıyor
+#    (EXPIRED); önceden sonsuza kadar yeniden zamanlanıyordu.
+
+import datetime
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..ecommerce_integrations.trendyol_handler import TrendyolGoAPI
+from ..repositories import (batch_repo, issue_repo, profile_repo, settings_repo,
+                            snapshot_repo)
+from .metrics import BATCH_ITEMS_FAILED, BATCHES_FINISHED
+from .profiling import STAGE_BATCH_POLL
+
+logger = logging.getLogger(__name__)
+
+INITIAL_DELAY_SECONDS = 5     # Paket gönderildikten sonra ilk kontrol için beklenecek süre
+MAX_DELAY_SECONDS = 300       # İki kontrol arasındaki en uzun bekleme süresi
+MAX_ATTEMPTS = 15             # Bu sayıda denemede sonuç alınamayan paketin takibi bırakılır
+MAX_CONCURRENT_CHECKS = 4     # Aynı anda sorgulanacak en fazla paket sayısı
+
+
+def record_batch_failures(response, branch_name, store_id):
+    """
+    Tamamlanmış bir paketin yanıtındaki başarısız (FAILURE) ürünleri sorun olarak kaydeder.
+    Bu ürünlerin anlık görüntüleri silinir, böylece bir sonraki döngüde yeniden gönderilirler.
+    Kaydedilen başarısız ürün sayısını döndürür.
+    """
+    failed_items = [item for item in response.get('items', []) if item.get('status') == 'FAILURE']
+    failed_barcodes = [item.get('requestItem', {}).get('barcode') for item in failed_items]
+    snapshot_repo.delete_snapshots(store_id, [b for b in failed_barcodes if b])
+    issues = []
+    for item in failed_items:
+        error_reason = (item.get('failureReasons') or ['Bilinmeyen hata'])[0]
+        barcode = item.get('requestItem', {}).get('barcode')
+        if "not found" in error_reason.lower() or "bulunamadı" in error_reason.lower():
+            issue_type = "Eşleşmemiş Ürün"
+        else:
+            issue_type = "API Güncelleme Hatası"
+        issues.append({
+            "erp_product_id": None, "barcode": barcode, "erp_branch_name": branch_name,
+            "issue_type": issue_type, "message": error_reason
+        })
+    issue_repo.add_sync_issues_bulk(issues)
+    return len(failed_items)
+
+
+def _record_poll_span(batch, started_at, duration, status):
+    """Paket kontrolünü, paketin gönderildiği döngünün profiline ekler. Döngü başlangıcı bilinmeyen paketler atlanır."""
+    cycle_started_at = batch.get('cycle_started_at')
+    if not cycle_started_at:
+        return
+    profile_repo.add_batch_poll_span(batch['batch_request_id'], {
+        "stage": STAGE_BATCH_POLL, "branch": batch.get('erp_branch_name'),
+        "start_ms": round((started_at - cycle_started_at) * 1000, 2), "duration_ms": round(duration * 1000, 2),
+        "item_count": batch.get('item_count'), "detail": f"{batch['batch_request_id']}: {status}"
+    })
+
+
+class BatchStatusPoller:
+    """
+    Sonucu beklenen Trendyol paketlerini arka plandaki tek bir iş parçacığından takip eder.
+    Kontrol zamanı gelen paketler eş zamanlı olarak sorgulanır; 'PROCESSING' durumundaki paketler
+    üstel olarak artan aralıklarla (5 sn, 10 sn, 20 sn, ... en fazla 5 dk) yeniden kontrol edilir.
+    Trendyol ayarları eksikse aynı aralıklarla ayarlar yeniden okunur.
+    Bekleyen paket kalmadığında iş parçacığı kendiliğinden sonlanır.
+    """
+
+    def __init__(self, initial_delay=INITIAL_DELAY_SECONDS, max_delay=MAX_DELAY_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, max_workers=MAX_CONCURRENT_CHECKS):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.max_workers = max_workers
+        self._status_callback = None
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def set_status_callback(self, callback_function):
+        """Paket sonuçlarıyla ilgili bilgilendirme mesajlarının iletileceği fonksiyonu belirler."""
+        self._status_callback = callback_function
+
+    def _notify(self, message):
+        logger.info(message)
+        if self._status_callback:
+            try:
+                self._status_callback(message)
+            except Exception as e:
+                logger.warning(f"Paket durum mesajı iletilemedi: {e}")
+
+    def register_batch(self, batch_request_id, branch_name, store_id, barcodes, cycle_started_at=None):
+        """Gönderilen bir paketi takip listesine ekler ve gerekirse arka plandaki kontrolü başlatır."""
+        batch_repo.add_pending_batch(batch_request_id, branch_name, store_id, barcodes,
+                                     first_check_delay=self.initial_delay, cycle_started_at=cycle_started_at)
+        self.start()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Arka plandaki kontrol iş parçacığını başlatır; zaten çalışıyorsa yeni kayıtlar için uyandırır."""
+        with self._lock:
+            if self.is_running():
+                self._wake_event.set()
+                return
+            self._stop_event.clear()
+            self._wake_event.clear()
+            self._thread = threading.Thread(target=self._run, name="batch-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Arka plandaki kontrolü durdurur. Bekleyen paketler veritabanında kalır ve sonraki başlatmada devam eder."""
+        self._stop_event.set()
+        self._wake_event.set()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _next_delay(self, attempts):
+        """Deneme sayısına göre bir sonraki kontrole kadar beklenecek süreyi (±%20 rastgele sapma ile) hesaplar."""
+        delay = min(self.max_delay, self.initial_delay * (2 ** attempts))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _create_api_client(self):
+        trendyol_cfg = settings_repo.get_trendyol_config()
+        if not all(trendyol_cfg.get(k) for k in ['api_key', 'api_secret', 'supplier_id']):
+            logger.warning("Trendyol API ayarları eksik olduğu için paket sonuçları kontrol edilemiyor.")
+            return None
+        return TrendyolGoAPI(**trendyol_cfg, pool_size=self.max_workers)
+
+    def _run(self):
+        logger.info("Paket sonucu kontrol servisi başlatıldı.")
+        api_client = None
+        config_attempts = 0
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-check")
+        try:
+            while not self._stop_event.is_set():
+                due_batches = batch_repo.get_due_batches(limit=self.max_workers * 5)
+                if due_batches:
+                    if api_client is None:
+                        api_client = self._create_api_client()
+                        if api_client is None:
+                            # Ayarlar tamamlanana kadar iş parçacığı sonlanmaz; artan aralıklarla yeniden denenir
+                            config_attempts += 1
+                            self._wake_event.wait(self._next_delay(config_attempts))
+                            self._wake_event.clear()
+                            continue
+                        config_attempts = 0
+                    list(executor.map(lambda batch: self._check_batch(api_client, batch), due_batches))
+                    continue
+
+                with self._lock:
+                    next_check_at = batch_repo.get_next_check_time()
+                    if next_check_at is None:
+                        self._thread = None
+                        break
+                wait_seconds = (next_check_at - datetime.datetime.now()).total_seconds()
+                self._wake_event.wait(min(max(wait_seconds, 0.5), self.max_delay))
+                self._wake_event.clear()
+        except Exception as e:
+            logger.error(f"Paket sonucu kontrol servisinde beklenmedik hata: {e}", exc_info=True)
+        finally:
+            executor.shutdown(wait=True)
+            if api_client:
+                api_client.close()
+            logger.info("Paket sonucu kontrol servisi durdu.")
+
+    def _check_batch(self, api_client, batch):
+        """Tek bir paketin durumunu sorgular; sonuca göre paketi kapatır veya yeniden zamanlar."""
+        batch_id = batch['batch_request_id']
+        branch_name = batch['erp_branch_name']
+        store_id = batch['store_id']
+        try:
+            started_at, started = time.time(), time.perf_counter()
+            response = api_client.check_batch_request_status(batch_id)
+            status = response.get('status') if response else None
+            _record_poll_span(batch, started_at, time.perf_counter() - started, status)
+
+            if status == 'COMPLETED':
+                failed_count = record_batch_failures(response, branch_name, store_id)
+                batch_repo.complete_batch(batch_id, 'COMPLETED', failed_count, status)
+                BATCHES_FINISHED.inc(branch=branch_name, result="completed")
+                BATCH_ITEMS_FAILED.inc(failed_count, branch=branch_name)
+                if failed_count:
+                    self._notify(f"'{batch_id}' nolu paket tamamlandı: {failed_count} ürün güncellenemedi.")
+                return failed_count
+
+            self._retry_or_expire(batch, status, f"Son yanıt: {response}")
+            return 0
+        except Exception as e:
+            logger.error(f"'{batch_id}' nolu paket kontrol edilirken hata oluştu: {e}", exc_info=True)
+            self._retry_or_expire(batch, "HATA", f"Son hata: {e}")
+            return 0
+
+    def _retry_or_expire(self, batch, status, last_result):
+        """
+        Sonucu henüz alınamayan paketi yeniden zamanlar. 'max_attempts' denemeye ulaşılmışsa paketin takibi
+        bırakılır ve ürünlerin anlık görüntüleri silinir; böylece sonraki döngüde yeniden gönderilirler.
+        """
+        batch_id = batch['batch_request_id']
+        branch_name = batch['erp_branch_name']
+        attempts = batch['attempts'] + 1
+        if attempts < self.max_attempts:
+            batch_repo.reschedule_batch(batch_id, self._next_delay(attempts), status)
+            return
+        barcodes = json.loads(batch['barcodes_json'] or '[]')
+        snapshot_repo.delete_snapshots(batch['store_id'], barcodes)
+        issue_repo.add_sync_issue(
+            None, None, branch_name, "Paket Sonucu Alınamadı",
+            f"'{batch_id}' nolu paketin sonucu {attempts} denemede alınamadı. {last_result}"
+        )
+        batch_repo.complete_batch(batch_id, 'EXPIRED', 0, status)
+        BATCHES_FINISHED.inc(branch=branch_name, result="expired")
+        self._notify(f"UYARI: '{batch_id}' nolu paketin sonucu alınamadı, ürünler sonraki döngüde yeniden gönderilecek.")
+
+
+# Uygulama genelinde kullanılacak tek kontrol servisi
+batch_poller = BatchStatusPoller()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 00:00
+# Yapılan Değişiklikler:
+# 1. ERP'den artımlı okumanın planlanması oluşturuldu. Her döngüde, kayıtlı su seviyesinden (watermark) bu yana
+#    değişen ürünler okunur. Belirlenen aralıkta bir, su seviyesi geçersizse veya ayarlar değiştiyse tam okuma yapılır.
+# 2. Su seviyesi döngü başında alınır ve yalnızca döngü sorunsuz bittiğinde kaydedilir. Başarısız bir döngüde
+#    kaydedilmediği için aynı değişiklikler sonraki döngüde tekrar okunur.
+
+import datetime
+import logging
+from collections import namedtuple
+
+from ..erp_integrations.erp12_handler import (INCREMENTAL_MODE_OFF,
+                                              INCREMENTAL_MODES)
+from ..repositories import settings_repo
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_SETTING_KEY = "erp_change_watermark"
+LAST_FULL_EXTRACT_SETTING_KEY = "erp_last_full_extract_at"
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class ExtractionPlan(namedtuple("ExtractionPlan", "mode incremental product_ids new_watermark tag")):
+    """
+    Bir döngünün ERP okuma planı. 'incremental' True ise yalnızca 'product_ids' içindeki ürünler okunur.
+    'new_watermark', döngü başarılı olursa kaydedilecek su seviyesidir (kip kapalıysa None).
+    """
+
+
+def _watermark_tag(sync_settings):
+    """Su seviyesinin hangi kip ve sütunlarla alındığını belirten etiket; ayarlar değişirse eski su seviyesi kullanılmaz."""
+    return "|".join((sync_settings["erp_incremental_mode"], sync_settings["erp_incremental_stock_column"],
+                     sync_settings["erp_incremental_price_column"]))
+
+
+def _load_watermark(tag):
+    value = settings_repo.get_app_setting(WATERMARK_SETTING_KEY)
+    if not value or "#" not in value:
+        return None
+    saved_tag, watermark = value.rsplit("#", 1)
+    return watermark if saved_tag == tag and watermark else None
+
+
+def _is_full_reconcile_due(sync_settings, now):
+    last_full_str = settings_repo.get_app_setting(LAST_FULL_EXTRACT_SETTING_KEY)
+    if not last_full_str:
+        return True
+    try:
+        last_full = datetime.datetime.strptime(last_full_str, DATETIME_FORMAT)
+    except ValueError:
+        return True
+    return now - last_full >= datetime.timedelta(minutes=sync_settings["erp_full_reconcile_minutes"])
+
+
+def plan_extraction(erp_handler, sync_settings, force_full=False, now=None):
+    """
+    Döngünün ERP'den tam mı yoksa artımlı mı okuyacağına karar verir ve bir 'ExtractionPlan' döndürür.
+    Artımlı okuma; kip açıksa, geçerli bir su seviyesi varsa, tam okuma zamanı gelmemişse ve
+    'force_full' / delta kontrolü kapalı değilse yapılır. Değişen ürünler okunamazsa tam okumaya dönülür.
+    """
+    mode = sync_settings["erp_incremental_mode"]
+    tag = _watermark_tag(sync_settings)
+    if mode not in INCREMENTAL_MODES:
+        logger.warning(f"Bilinmeyen ERP artımlı okuma kipi '{mode}', tam okuma yapılacak.")
+        mode = INCREMENTAL_MODE_OFF
+    if mode == INCREMENTAL_MODE_OFF:
+        return ExtractionPlan(mode, False, None, None, tag)
+
+    # Su seviyesi veriden önce alınır; okuma sırasında değişen satırlar sonraki döngüde tekrar okunur
+    new_watermark = erp_handler.get_change_watermark(mode)
+    if new_watermark is None:
+        return ExtractionPlan(mode, False, None, None, tag)
+
+    now = now or datetime.datetime.now()
+    saved_watermark = _load_watermark(tag)
+    if force_full or not sync_settings.get("delta_sync_enabled", True):
+        reason = "delta kontrolü kapalı"
+    elif saved_watermark is None:
+        reason = "kayıtlı su seviyesi yok"
+    elif _is_full_reconcile_due(sync_settings, now):
+        reason = "periyodik tam okuma zamanı"
+    else:
+        product_ids = erp_handler.get_changed_product_ids(
+            mode, saved_watermark, sync_settings["erp_incremental_stock_column"],
+            sync_settings["erp_incremental_price_column"]
+        )
+        if product_ids is not None:
+            return ExtractionPlan(mode, True, product_ids, new_watermark, tag)
+        reason = "değişen ürünler okunamadı"
+    logger.info(f"ERP tam okuma yapılacak ({reason}).")
+    return ExtractionPlan(mode, False, None, new_watermark, tag)
+
+
+def commit_extraction(plan, now=None):
+    """Döngü sorunsuz bittiğinde çağrılır: su seviyesini ve (tam okumaysa) son tam okuma zamanını kaydeder."""
+    if not plan or plan.new_watermark is None:
+        return
+    settings_repo.save_app_setting(WATERMARK_SETTING_KEY, f"{plan.tag}#{plan.new_watermark}")
+    if not plan.incremental:
+        now = now or datetime.datetime.now()
+        settings_repo.save_app_setting(LAST_FULL_EXTRACT_SETTING_KEY, now.strftime(DATETIME_FORMAT))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 09:30
+# Yapılan Değişiklikler:
+# 1. Sorunların saklama sınırı UTC ile hesaplanıyor: 'sync_issues.timestamp' SQLite'ın CURRENT_TIMESTAMP (UTC)
+#    değeridir, 'sync_history.start_time' ise yerel saattir. Her tablo kendi saatiyle karşılaştırılır.
+
+import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+
+from .. import config
+from ..repositories import maintenance_repo, settings_repo
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 5000
+LAST_MAINTENANCE_SETTING_KEY = "last_maintenance_at"
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _format_size(size_bytes):
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+
+def is_maintenance_due(maintenance_settings=None):
+    """Son bakımdan bu yana ayarlardaki aralık kadar süre geçtiyse True döner."""
+    maintenance_settings = maintenance_settings or settings_repo.get_maintenance_settings()
+    last_run_str = settings_repo.get_app_setting(LAST_MAINTENANCE_SETTING_KEY)
+    if not last_run_str:
+        return True
+    try:
+        last_run = datetime.datetime.strptime(last_run_str, DATETIME_FORMAT)
+    except ValueError:
+        return True
+    interval = datetime.timedelta(hours=maintenance_settings["maintenance_interval_hours"])
+    return datetime.datetime.now() - last_run >= interval
+
+
+def _archive_and_delete(table, fetch_rows, cutoff, archive_path):
+    """
+    'fetch_rows' ile parça parça okunan kayıtları (varsa) arşiv dosyasına ekler ve ardından siler.
+    Bir parça diske yazılmadan silinmez; silme başarısız olursa iş durdurulur. Silinen kayıt sayısını döndürür.
+    """
+    archive_file = None
+    total_deleted, after_id = 0, 0
+    try:
+        while True:
+            rows = fetch_rows(cutoff, after_id, ARCHIVE_BATCH_SIZE)
+            if not rows:
+                break
+            if archive_path:
+                if archive_file is None:
+                    archive_file = gzip.open(archive_path, 'at', encoding='utf-8')
+                for row in rows:
+                    archive_file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                archive_file.flush()
+            deleted = maintenance_repo.delete_rows(table, [row['id'] for row in rows])
+            if deleted is None:
+                logger.error(f"'{table}' tablosundaki eski kayıtlar silinemedi, bakım işi bu tablo için durduruldu.")
+                break
+            total_deleted += deleted
+            after_id = rows[-1]['id']
+    finally:
+        if archive_file:
+            archive_file.close()
+    return total_deleted
+
+
+def run_maintenance(force=False):
+    """
+    Bakım işini çalıştırır ve bir özet sözlüğü döndürür. 'force' False ise ve bakım zamanı gelmemişse
+    hiçbir şey yapmadan None döner. Adımlar:
+      1. Saklama süresi dolmuş çözülmüş sorunlar ve senkronizasyon geçmişi arşivlenip silinir.
+      2. Takibi bitmiş eski paket kayıtları ve kullanılmayan sağlık sayaçları silinir.
+      3. Boşalan sayfalar 'incremental_vacuum' ile dosyadan geri kazanılır.
+    """
+    settings = settings_repo.get_maintenance_settings()
+    if not force and not is_maintenance_due(settings):
+        return None
+
+    started = time.perf_counter()
+    now = datetime.datetime.now()
+    size_before = maintenance_repo.get_storage_stats()
+    # 'sync_issues.timestamp' UTC, 'sync_history.start_time' yerel saattir
+    issue_cutoff = (datetime.datetime.utcnow() - datetime.timedelta(days=settings["issue_retention_days"])).strftime(DATETIME_FORMAT)
+    history_cutoff = (now - datetime.timedelta(days=settings["history_retention_days"])).strftime(DATETIME_FORMAT)
+
+    issue_archive_path = history_archive_path = None
+    if settings["archive_enabled"]:
+        os.makedirs(config.ARCHIVE_DIR, exist_ok=True)
+        stamp = now.strftime('%Y%m%d_%H%M%S')
+        issue_archive_path = os.path.join(config.ARCHIVE_DIR, f"sync_issues_{stamp}.jsonl.gz")
+        history_archive_path = os.path.join(config.ARCHIVE_DIR, f"sync_history_{stamp}.jsonl.gz")
+
+    report = {"issues_archived": 0, "history_archived": 0, "batches_purged": 0}
+    step_started = time.perf_counter()
+    report["issues_archived"] = _archive_and_delete(
+        "sync_issues", maintenance_repo.get_archivable_issues, issue_cutoff, issue_archive_path
+    )
+    report["history_archived"] = _archive_and_delete(
+        "sync_history", maintenance_repo.get_archivable_history, history_cutoff, history_archive_path
+    )
+    report["batches_purged"] = maintenance_repo.purge_finished_batches(history_cutoff)
+    # Sağlık puanı yalnızca son 24 saati kullanır; daha eski kovalar geçmişle birlikte silinir
+    maintenance_repo.prune_health_buckets(history_cutoff)
+    report["archive_seconds"] = round(time.perf_counter() - step_started, 2)
+
+    step_started = time.perf_counter()
+    if not maintenance_repo.ensure_incremental_auto_vacuum():
+        maintenance_repo.incremental_vacuum()
+    report["vacuum_seconds"] = round(time.perf_counter() - step_started, 2)
+
+    size_after = maintenance_repo.get_storage_stats()
+    report["size_before_bytes"] = size_before["size_bytes"]
+    report["size_after_bytes"] = size_after["size_bytes"]
+    report["duration_seconds"] = round(time.perf_counter() - started, 2)
+    settings_repo.save_app_setting(LAST_MAINTENANCE_SETTING_KEY, now.strftime(DATETIME_FORMAT))
+
+    logger.info(
+        f"Veritabanı bakımı tamamlandı: {report['issues_archived']} sorun ve {report['history_archived']} geçmiş kaydı "
+        f"arşivlendi, {report['batches_purged']} eski paket kaydı silindi. Boyut: {_format_size(size_before['size_bytes'])} -> "
+        f"{_format_size(size_after['size_bytes'])}. Süre: {report['duration_seconds']} sn "
+        f"(arşivleme {report['archive_seconds']} sn, sıkıştırma {report['vacuum_seconds']} sn)."
+    )
+    return report
+
+
+class MaintenanceScheduler:
+    """
+    Bakım işini arka plandaki bir iş parçacığından periyodik olarak tetikler. Son çalışma zamanı
+    veritabanında tutulduğu için program sık sık yeniden başlatılsa bile bakım ayarlanan aralıkta bir yapılır.
+    """
+
+    def __init__(self, check_interval_seconds=3600, initial_delay_seconds=120):
+        self.check_interval_seconds = check_interval_seconds
+        self.initial_delay_seconds = initial_delay_seconds
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        # Açılıştaki ilk senkronizasyonla yarışmamak için kısa bir süre beklenir
+        if self._stop_event.wait(self.initial_delay_seconds):
+            return
+        while not self._stop_event.is_set():
+            try:
+                run_maintenance()
+            except Exception as e:
+                logger.error(f"Veritabanı bakımı sırasında hata oluştu: {e}", exc_info=True)
+            self._stop_event.wait(self.check_interval_seconds)
+
+
+# Uygulama genelinde kullanılacak tek bakım zamanlayıcısı
+maintenance_scheduler = MaintenanceScheduler()
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 02:15
+# Yapılan Değişiklikler:
+# 1. Senkronizasyonun verim ve gecikme metrikleri için iş parçacığı güvenli sayaç (counter), gösterge (gauge)
+#    ve histogram sınıfları oluşturuldu. Metrikler Prometheus metin biçiminde (0.0.4) veya OpenMetrics
+#    biçiminde yazdırılabilir; yayınlama 'metrics_exporter' modülündedir.
+# 2. Bu modül veritabanı katmanından da kullanıldığı için 'repositories' paketini içe aktarmaz.
+
+import math
+import threading
+
+# Saniye cinsinden varsayılan histogram sınırları (HTTP isteği, SQL sorgusu gibi kısa işlemler için)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Tüm senkronizasyon döngüsü gibi uzun işlemler için sınırlar
+CYCLE_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape_label_value(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Etiket (label) değerlerine göre ayrı seriler tutan metriklerin ortak tabanı."""
+
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames) or any(name not in labels for name in self.labelnames):
+            raise ValueError(f"'{self.name}' metriği için etiketler {self.labelnames} olmalı, verilen: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _header(self, family_name):
+        return [f"# HELP {family_name} {_escape_help(self.documentation)}", f"# TYPE {family_name} {self.metric_type}"]
+
+    def render(self, openmetrics=False):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç. Örnek adlarına '_total' eki yazdırılırken eklenir."""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Sayaç yalnızca artırılabilir.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self, openmetrics=False):
+        sample_name = self.name + "_total"
+        lines = self._header(self.name if openmetrics else sample_name)
+        for key, value in self._snapshot():
+            lines.append(f"{sample_name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Artıp azalabilen, son değeri tutan gösterge."""
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def render(self, openmetrics=False):
+        lines = self._header(self.name)
+        for key, value in self._snapshot():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Gözlemleri sabit sınırlı kovalara (bucket) dağıtan histogram. Kova sayıları yazdırılırken kümülatif yapılır."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        if "le" in self.labelnames:
+            raise ValueError("'le' histogram etiketi olarak kullanılamaz.")
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def get_count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series["count"] if series else 0
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted((key, {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]})
+                          for key, s in self._values.items())
+
+    def render(self, openmetrics=False):
+        lines = self._header(self.name)
+        for key, series in self._snapshot():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Yayınlanacak metriklerin listesi. Aynı adla ikinci bir metrik kaydedilemez."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"'{metric.name}' adlı metrik zaten kayıtlı.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self, openmetrics=False):
+        """Tüm metrikleri metin biçiminde döndürür. OpenMetrics çıktısı '# EOF' satırıyla biter."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        """Tüm serileri sıfırlar (metrik tanımları kalır)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+PRODUCTS_PROCESSED = REGISTRY.register(Counter(
+    "sontechbot_products_processed", "ERP'den okunup işlenen ürün sayısı.", ("branch", "lane")))
+PRODUCTS_SENT = REGISTRY.register(Counter(
+    "sontechbot_products_sent", "Trendyol'a gönderilen (değişmiş) ürün sayısı.", ("branch", "lane")))
+SEND_FAILURES = REGISTRY.register(Counter(
+    "sontechbot_send_failures", "Başarısız olan fiyat-stok gönderim istekleri (paketler).", ("branch", "lane")))
+TRENDYOL_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "sontechbot_trendyol_request_duration_seconds",
+    "Trendyol API isteklerinin süresi (her deneme ayrı). Bağlantı hatalarında status_code 'error' olur.",
+    ("endpoint", "status_code")))
+ERP_QUERY_SECONDS = REGISTRY.register(Histogram(
+    "sontechbot_erp_query_duration_seconds",
+    "Bir döngüdeki ERP bağlantı ve sorgu sürelerinin şube bazında toplamı.", ("operation", "lane")))
+SQLITE_WRITE_SECONDS = REGISTRY.register(Histogram(
+    "sontechbot_sqlite_write_duration_seconds",
+    "SQLite yazma işlemlerinin yazma kilidini bekleme dahil süresi.", ("operation",)))
+BATCHES_FINISHED = REGISTRY.register(Counter(
+    "sontechbot_batches_finished", "Sonucu alınan (completed) veya takibi bırakılan (expired) Trendyol paketleri.",
+    ("branch", "result")))
+BATCH_ITEMS_FAILED = REGISTRY.register(Counter(
+    "sontechbot_batch_items_failed", "Tamamlanan paketlerde FAILURE dönen ürün sayısı.", ("branch",)))
+SYNC_CYCLES = REGISTRY.register(Counter(
+    "sontechbot_sync_cycles", "Biten senkronizasyon döngüleri.", ("lane", "status")))
+SYNC_CYCLE_SECONDS = REGISTRY.register(Histogram(
+    "sontechbot_sync_cycle_duration_seconds", "Senkronizasyon döngülerinin süresi.", ("lane",),
+    buckets=CYCLE_BUCKETS))
+SYNC_CYCLE_OVERRUNS = REGISTRY.register(Counter(
+    "sontechbot_sync_cycle_overruns",
+    "Önceki döngü bitmediği için atlanan (skip) veya sıraya alınan (queue) planlı çalışmalar.", ("scope", "policy")))
+LAST_CYCLE_TIMESTAMP = REGISTRY.register(Gauge(
+    "sontechbot_last_sync_cycle_timestamp_seconds", "Son biten döngünün Unix zamanı.", ("lane", "status")))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 02:15
+# Yapılan Değişiklikler:
+# 1. Senkronizasyon metriklerini merkezi izleme sisteminin okuyabilmesi için yayınlayan servis oluşturuldu:
+#    - İsteğe bağlı yerel HTTP uç noktası ('/metrics'). 'Accept' başlığında OpenMetrics istenirse OpenMetrics,
+#      aksi halde Prometheus metin biçimi (0.0.4) döner.
+#    - İsteğe bağlı metin dosyası (node_exporter 'textfile' toplayıcısı için). Dosya geçici bir dosyaya yazılıp
+#      taşındığı için okuyucu hiçbir zaman yarım dosya görmez.
+#    Servis 'metrics_enabled' ayarı kapalıysa hiçbir şey başlatmaz.
+
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from ..repositories import settings_repo
+from .metrics import (OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE,
+                      REGISTRY)
+
+logger = logging.getLogger(__name__)
+
+METRICS_PATHS = ("/metrics", "/")
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if urlsplit(self.path).path not in METRICS_PATHS:
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in (self.headers.get("Accept") or "")
+        data = REGISTRY.render(openmetrics).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrik isteği: {self.address_string()} - {format % args}")
+
+
+def write_textfile(path):
+    """Metrikleri Prometheus metin biçiminde 'path' dosyasına yazar. Başarılıysa True döner."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(REGISTRY.render(openmetrics=False))
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        logger.error(f"Metrik dosyası yazılamadı ({path}): {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+class MetricsExporter:
+    """
+    Ayarlara göre metrik HTTP uç noktasını ve/veya metin dosyası yazıcısını arka planda çalıştırır.
+    'start' birden fazla kez çağrılabilir; ayarlar değiştiğinde 'restart' ile yeniden başlatılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._http_thread = None
+        self._textfile_thread = None
+        self._stop_event = threading.Event()
+
+    def is_running(self):
+        return self._httpd is not None or (self._textfile_thread is not None and self._textfile_thread.is_alive())
+
+    def get_endpoint_url(self):
+        """HTTP uç noktası çalışıyorsa adresini, aksi halde None döndürür."""
+        httpd = self._httpd
+        if not httpd:
+            return None
+        host, port = httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self, metrics_settings=None):
+        """Ayarlarda açıksa metrik yayınını başlatır. Zaten çalışıyorsa hiçbir şey yapmaz."""
+        metrics_settings = metrics_settings or settings_repo.get_metrics_settings()
+        if not metrics_settings["metrics_enabled"]:
+            return
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop_event.clear()
+            if metrics_settings["metrics_http_port"] > 0:
+                self._start_http(metrics_settings["metrics_bind_address"], metrics_settings["metrics_http_port"])
+            if metrics_settings["metrics_textfile_path"]:
+                self._textfile_thread = threading.Thread(
+                    target=self._run_textfile_writer, name="metrics-textfile", daemon=True,
+                    args=(metrics_settings["metrics_textfile_path"], metrics_settings["metrics_textfile_interval_seconds"])
+                )
+                self._textfile_thread.start()
+                logger.info(f"Metrikler {metrics_settings['metrics_textfile_interval_seconds']} sn'de bir "
+                            f"'{metrics_settings['metrics_textfile_path']}' dosyasına yazılacak.")
+
+    def _start_http(self, bind_address, port):
+        try:
+            httpd = ThreadingHTTPServer((bind_address, port), _MetricsRequestHandler)
+        except OSError as e:
+            logger.error(f"Metrik uç noktası {bind_address}:{port} adresinde açılamadı: {e}")
+            return
+        httpd.daemon_threads = True
+        self._httpd = httpd
+        self._http_thread = threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True)
+        self._http_thread.start()
+        logger.info(f"Metrik uç noktası başlatıldı: {self.get_endpoint_url()}")
+
+    def _run_textfile_writer(self, path, interval_seconds):
+        while True:
+            write_textfile(path)
+            if self._stop_event.wait(interval_seconds):
+                break
+        # Kapanışta son değerler de yazılır
+        write_textfile(path)
+
+    def stop(self, timeout=5):
+        """HTTP uç noktasını ve metin dosyası yazıcısını durdurur."""
+        with self._lock:
+            self._stop_event.set()
+            httpd, http_thread, textfile_thread = self._httpd, self._http_thread, self._textfile_thread
+            self._httpd, self._http_thread, self._textfile_thread = None, None, None
+        if httpd:
+            httpd.shutdown()
+            httpd.server_close()
+            http_thread.join(timeout)
+            logger.info("Metrik uç noktası durduruldu.")
+        if textfile_thread and textfile_thread.is_alive():
+            textfile_thread.join(timeout)
+
+    def restart(self, metrics_settings=None):
+        """Ayarlar değiştiğinde yayını yeni ayarlarla yeniden başlatır (kapatıldıysa durdurur)."""
+        self.stop()
+        self.start(metrics_settings)
+
+
+# Uygulama genelinde kullanılacak tek metrik yayın servisi
+metrics_exporter = MetricsExporter()
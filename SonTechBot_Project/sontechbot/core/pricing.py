@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 11:30
+# Yapılan Değişiklikler:
+# 1. 'compile_pricing_rules' tanımından önceki eksik boş satır eklendi.
+
+import logging
+import math
+from collections import namedtuple
+from itertools import repeat
+from operator import itemgetter
+
+from ..config import PRICE_ROUNDING_TIERS
+
+try:
+    import numpy as np
+    VECTORIZED_PRICING_ENABLED = True
+except ImportError:
+    np = None
+    VECTORIZED_PRICING_ENABLED = False
+
+logger = logging.getLogger(__name__)
+
+# Bu satır sayısının altındaki parçalarda dizi oluşturma maliyeti kazançtan büyük olduğu için düz Python kullanılır
+VECTORIZE_MIN_ROWS = 256
+
+# 'ERPProductRow' alanlarını sütun olarak okumak için ('zip(*satırlar)' büyük parçalarda çok daha yavaştır)
+_get_barcode, _get_group, _get_brand = itemgetter(3), itemgetter(6), itemgetter(7)
+_get_quantity, _get_price = itemgetter(9), itemgetter(10)
+
+# Yuvarlama türlerinin adımları. Kademeli yuvarlamada adım fiyata göre 'PRICE_ROUNDING_TIERS'ten seçilir.
+_ROUNDING_STEPS = {"none": 0.0, "x99": 1.0, "tiered": -1.0}
+# Tam sayıya çok yakın bölümlerin (ör. 5.0000000001) bir üst adıma yuvarlanmaması için
+_ROUNDING_EPSILON = 1e-9
+
+
+class PricedBatch(namedtuple("PricedBatch", "barcodes send_barcodes send_stocks send_prices unpriced")):
+    """
+    Bir ERP parçasının fiyatlandırma sonucu.
+    - 'barcodes': Boş olmayan tüm barkodlar (kuralı olmayan ürünler dahil; sıfırlanacak ürünlerin tespiti için).
+    - 'send_barcodes', 'send_stocks', 'send_prices': Gönderilecek ürünlerin barkodu, tampon düşülmüş stoğu ve
+      2 haneye yuvarlanmış fiyatı (aynı sırada, eşit uzunlukta listeler).
+    - 'unpriced': Senkronizasyonu açık ama fiyatı sıfır/negatif çıkan ürünler için (satır sırası, fiyat) demetleri.
+    """
+
+
+def _scope_key(value):
+    """Şube, marka ve kategori değerlerini karşılaştırma için sadeleştirir. Boş değer "hepsi" (None) olur."""
+    text = str(value).strip() if value is not None else ''
+    return text.casefold() or None
+
+
+def _rule_specificity(rule):
+    """Eşit öncelikli kurallarda dar kapsamlı olan kazanır: barkod > marka+kategori > kategori > marka > genel."""
+    if rule['barcode']:
+        return 4
+    return (2 if rule['erp_category_id'] else 0) + (1 if rule['erp_marka_adi'] else 0)
+
+
+def _tier_step(price):
+    for bound, step in PRICE_ROUNDING_TIERS:
+        if bound is None or price <= bound:
+            return step
+    return PRICE_ROUNDING_TIERS[-1][1]
+
+
+def _tier_steps(prices):
+    """'_tier_step' fonksiyonunun dizi karşılığı; ilk uyan kademe seçilir."""
+    steps = np.full(prices.shape, PRICE_ROUNDING_TIERS[-1][1], dtype=np.float64)
+    for bound, step in reversed(PRICE_ROUNDING_TIERS):
+        steps = np.full(prices.shape, step, dtype=np.float64) if bound is None else np.where(prices <= bound, step, steps)
+    return steps
+
+
+class _BranchRuleIndex:
+    """
+    Bir şubeye uygulanabilecek fiyat kurallarının arama sözlükleri. Değerler kuralın sıra numarasıdır (küçük olan
+    kazanır); hiçbir kural uymazsa etkisiz son kayıt ('missing') döner.
+    """
+
+    def __init__(self, ranked_rules, missing):
+        self.missing = missing
+        self.pair_ranks = {}
+        self.barcode_ranks = {}
+        for rank, rule in enumerate(ranked_rules):
+            if rule is None:
+                continue
+            if rule['barcode']:
+                self.barcode_ranks.setdefault(rule['barcode'], rank)
+            else:
+                self.pair_ranks.setdefault((rule['erp_marka_adi'], rule['erp_category_id']), rank)
+
+    def pair_positions(self, pairs):
+        """(marka, grup kodu) çiftlerinin kural sırasını döndürür. Her çift parçada bir kez aranır."""
+        get, missing = self.pair_ranks.get, self.missing
+        positions = {}
+        for pair in set(pairs):
+            brand, category = _scope_key(pair[0]), _scope_key(pair[1])
+            positions[pair] = min(get((brand, category), missing), get((brand, None), missing),
+                                  get((None, category), missing), get((None, None), missing))
+        return positions
+
+
+class CompiledPricingRules:
+    """
+    Kategori ve fiyat kurallarının döngü boyunca değişmeyen, hesaba hazır hali. Her kategoriye bir sıra numarası
+    verilir; senkronizasyon durumu ve fiyat çarpanı bu sıraya göre dizilerde tutulur. Kuralı olmayan veya
+    senkronizasyonu kapalı kategoriler son sıradaki "gönderilmez" kaydına düşer.
+    Fiyat kuralları (öncelik, kapsam, id) sırasına dizilir ve parametreleri de bu sırayla dizilerde tutulur.
+    Kategori çarpanıyla bulunan fiyata, ürüne uyan en öncelikli kural uygulanır.
+    Nesne salt okunurdur; paralel şube işçileri aynı nesneyi kullanabilir.
+    """
+
+    def __init__(self, category_rules, pricing_rules=()):
+        self._index = {}
+        enabled, multipliers = [], []
+        for rule in category_rules:
+            self._index[_scope_key(rule['erp_category_id'])] = len(enabled)
+            enabled.append(bool(rule.get('sync_enabled', True)))
+            multipliers.append(1 + float(rule.get('price_adjustment_percentage') or 0.0) / 100)
+        self._missing = len(enabled)
+        enabled.append(False)
+        multipliers.append(1.0)
+        self._enabled = enabled
+        self._multipliers = multipliers
+        if VECTORIZED_PRICING_ENABLED:
+            self._enabled_array = np.array(enabled, dtype=bool)
+            self._multiplier_array = np.array(multipliers, dtype=np.float64)
+        self._compile_price_rules(pricing_rules)
+
+    def _compile_price_rules(self, pricing_rules):
+        rules = []
+        for rule in pricing_rules:
+            barcode = str(rule.get('barcode') or '').strip() or None
+            rules.append({
+                'id': int(rule.get('id') or 0), 'priority': int(rule.get('priority') or 0),
+                'erp_branch_name': _scope_key(rule.get('erp_branch_name')),
+                'erp_marka_adi': None if barcode else _scope_key(rule.get('erp_marka_adi')),
+                'erp_category_id': None if barcode else _scope_key(rule.get('erp_category_id')),
+                'barcode': barcode,
+                'multiplier': 1 + float(rule.get('adjustment_percentage') or 0.0) / 100,
+                'amount': float(rule.get('adjustment_amount') or 0.0),
+                'step': _ROUNDING_STEPS.get(rule.get('rounding_mode') or 'none', 0.0),
+                'min_price': -math.inf if rule.get('min_price') is None else float(rule['min_price']),
+                'max_price': math.inf if rule.get('max_price') is None else float(rule['max_price']),
+            })
+        # Eşit öncelik ve kapsamda şubeye özel kural, tüm şubelere uygulanan kuraldan önce gelir
+        rules.sort(key=lambda r: (-r['priority'], -_rule_specificity(r), r['erp_branch_name'] is None, r['id']))
+        self._rule_count = len(rules)
+
+        # Son kayıt "kural yok": fiyatı değiştirmez
+        self._rule_multipliers = [r['multiplier'] for r in rules] + [1.0]
+        self._rule_amounts = [r['amount'] for r in rules] + [0.0]
+        self._rule_steps = [r['step'] for r in rules] + [0.0]
+        self._rule_min_prices = [r['min_price'] for r in rules] + [-math.inf]
+        self._rule_max_prices = [r['max_price'] for r in rules] + [math.inf]
+        if VECTORIZED_PRICING_ENABLED:
+            self._rule_multiplier_array = np.array(self._rule_multipliers, dtype=np.float64)
+            self._rule_amount_array = np.array(self._rule_amounts, dtype=np.float64)
+            self._rule_step_array = np.array(self._rule_steps, dtype=np.float64)
+            self._rule_min_array = np.array(self._rule_min_prices, dtype=np.float64)
+            self._rule_max_array = np.array(self._rule_max_prices, dtype=np.float64)
+
+        # Her şube için yalnızca o şubeye ve tüm şubelere ait kurallardan oluşan arama sözlükleri
+        self._branch_indexes = {}
+        if not rules:
+            return
+        branch_names = {r['erp_branch_name'] for r in rules} | {None}
+        for branch_name in branch_names:
+            ranked = [r if r['erp_branch_name'] in (None, branch_name) else None for r in rules]
+            self._branch_indexes[branch_name] = _BranchRuleIndex(ranked, self._rule_count)
+
+    def __len__(self):
+        return self._missing
+
+    @property
+    def rule_count(self):
+        return self._rule_count
+
+    def _category_positions(self, group_codes):
+        """ERP grup kodlarının kural sırasını döndürür. Aynı kod parçada çok tekrar ettiği için kod başına bir kez aranır."""
+        return {code: self._index.get(_scope_key(code), self._missing) for code in set(group_codes)}
+
+    def category_enabled(self, group_code):
+        """ERP grup kodunun senkronizasyonunun açık olup olmadığını döndürür. Kuralı olmayan kategoriler kapalıdır."""
+        return self._enabled[self._index.get(_scope_key(group_code), self._missing)]
+
+    def _rule_index_for(self, branch):
+        """Şubenin fiyat kuralı sözlüklerini döndürür. Hiç fiyat kuralı yoksa None döner."""
+        if not self._branch_indexes:
+            return None
+        branch_name = _scope_key(branch.get('erp_branch_name'))
+        return self._branch_indexes.get(branch_name) or self._branch_indexes[None]
+
+    def _apply_rule(self, price, rank):
+        """
+        Tek bir fiyata sırası 'rank' olan kuralı uygular. '_apply_rules_vectorized' ile aynı işlemleri yapar.
+        Fiyat önce en düşük/en yüksek sınıra çekilir, sonra yuvarlanır. Yuvarlanan fiyat sınırın dışına çıkarsa
+        bir adım içeri alınır; sınırlar arasında x.99 ile biten fiyat yoksa sınırlanan fiyat kullanılır.
+        """
+        min_price, max_price = self._rule_min_prices[rank], self._rule_max_prices[rank]
+        price = min(max(price * self._rule_multipliers[rank] + self._rule_amounts[rank], min_price), max_price)
+        step = self._rule_steps[rank]
+        if step:
+            if step < 0:
+                step = _tier_step(price)
+            rounded = math.ceil(price / step - _ROUNDING_EPSILON) * step - 0.01
+            if rounded < min_price:
+                rounded += step
+            if rounded > max_price:
+                rounded -= step
+            if min_price <= rounded <= max_price:
+                price = rounded
+        return price
+
+    def _apply_rules_vectorized(self, prices, ranks):
+        min_prices, max_prices = self._rule_min_array[ranks], self._rule_max_array[ranks]
+        prices = prices * self._rule_multiplier_array[ranks] + self._rule_amount_array[ranks]
+        prices = np.minimum(np.maximum(prices, min_prices), max_prices)
+        steps = self._rule_step_array[ranks]
+        tiered = steps < 0
+        if tiered.any():
+            steps = np.where(tiered, _tier_steps(prices), steps)
+        rounded = steps > 0
+        if rounded.any():
+            safe_steps = np.where(rounded, steps, 1.0)
+            rounded_prices = np.ceil(prices / safe_steps - _ROUNDING_EPSILON) * safe_steps - 0.01
+            rounded_prices = np.where(rounded_prices < min_prices, rounded_prices + safe_steps, rounded_prices)
+            rounded_prices = np.where(rounded_prices > max_prices, rounded_prices - safe_steps, rounded_prices)
+            rounded &= (rounded_prices >= min_prices) & (rounded_prices <= max_prices)
+            prices = np.where(rounded, rounded_prices, prices)
+        return prices
+
+    def price_batch(self, products, branch):
+        """'ERPProductRow' listesini şubenin stok tamponu ve fiyat kurallarıyla fiyatlandırır; 'PricedBatch' döndürür."""
+        stock_buffer = int(branch.get('stock_buffer', 0))
+        rule_index = self._rule_index_for(branch)
+        if VECTORIZED_PRICING_ENABLED and len(products) >= VECTORIZE_MIN_ROWS:
+            return self._price_batch_vectorized(products, stock_buffer, rule_index)
+        return self._price_batch_python(products, stock_buffer, rule_index)
+
+    def _price_batch_python(self, products, stock_buffer, rule_index):
+        positions = self._category_positions(product.erp_grup_kod for product in products)
+        if rule_index:
+            pair_ranks = rule_index.pair_positions((product.erp_marka_adi, product.erp_grup_kod) for product in products)
+            barcode_ranks, missing_rank = rule_index.barcode_ranks, rule_index.missing
+        enabled, multipliers = self._enabled, self._multipliers
+        barcodes, send_barcodes, send_stocks, send_prices, unpriced = [], [], [], [], []
+        for row_index, product in enumerate(products):
+            barcode = str(product.barcode1 or '').strip()
+            if not barcode:
+                continue
+            barcodes.append(barcode)
+            position = positions[product.erp_grup_kod]
+            if not enabled[position]:
+                continue
+            price = float(product.price or 0) * multipliers[position]
+            if price <= 0:
+                unpriced.append((row_index, price))
+                continue
+            if rule_index:
+                rank = pair_ranks[(product.erp_marka_adi, product.erp_grup_kod)]
+                if barcode_ranks:
+                    rank = min(rank, barcode_ranks.get(barcode, missing_rank))
+                price = self._apply_rule(price, rank)
+                if price <= 0:
+                    unpriced.append((row_index, price))
+                    continue
+            send_barcodes.append(barcode)
+            send_stocks.append(max(0, int(product.erp_stock_quantity or 0) - stock_buffer))
+            send_prices.append(round(price, 2))
+        return PricedBatch(barcodes, send_barcodes, send_stocks, send_prices, unpriced)
+
+    def _price_batch_vectorized(self, products, stock_buffer, rule_index):
+        row_count = len(products)
+        raw_barcodes = list(map(_get_barcode, products))
+        try:
+            raw_barcodes = list(map(str.strip, raw_barcodes))
+        except TypeError:
+            # Barkodu boş (None) veya sayı olan satırlar varsa tek tek dönüştürülür
+            raw_barcodes = [str(barcode or '').strip() for barcode in raw_barcodes]
+        group_codes = list(map(_get_group, products))
+        positions = self._category_positions(group_codes)
+        category = np.fromiter(map(positions.__getitem__, group_codes), dtype=np.intp, count=row_count)
+
+        has_barcode = np.fromiter(map(bool, raw_barcodes), dtype=bool, count=row_count)
+        candidates = has_barcode & self._enabled_array[category]
+        # None değerler NaN olur; '(değer or 0)' ile aynı sonuç için 0'a çevrilir
+        prices = np.nan_to_num(np.array(list(map(_get_price, products)), dtype=np.float64), nan=0.0)
+        prices *= self._multiplier_array[category]
+        quantities = np.trunc(np.nan_to_num(np.array(list(map(_get_quantity, products)), dtype=np.float64), nan=0.0))
+        stocks = np.maximum(quantities.astype(np.int64) - stock_buffer, 0)
+
+        if rule_index:
+            # Kategori çarpanıyla bulunan fiyatı sıfır/negatif olan ürünler, kural uygulanmadan fiyatsız sayılır
+            base_priced = prices > 0
+            pairs = list(zip(map(_get_brand, products), group_codes))
+            pair_ranks = rule_index.pair_positions(pairs)
+            ranks = np.fromiter(map(pair_ranks.__getitem__, pairs), dtype=np.intp, count=row_count)
+            if rule_index.barcode_ranks:
+                barcode_ranks = map(rule_index.barcode_ranks.get, raw_barcodes, repeat(rule_index.missing))
+                ranks = np.minimum(ranks, np.fromiter(barcode_ranks, dtype=np.intp, count=row_count))
+            prices = np.where(base_priced, self._apply_rules_vectorized(prices, ranks), prices)
+        priced = prices > 0
+        send_rows = np.flatnonzero(candidates & priced)
+        unpriced_rows = np.flatnonzero(candidates & ~priced)
+
+        send_prices = _round_prices(prices[send_rows])
+        send_barcodes = np.array(raw_barcodes, dtype=object)[send_rows].tolist()
+        unpriced = list(zip(unpriced_rows.tolist(), prices[unpriced_rows].tolist()))
+        barcodes = [barcode for barcode in raw_barcodes if barcode]
+        return PricedBatch(barcodes, send_barcodes, stocks[send_rows].tolist(), send_prices, unpriced)
+
+
+def _round_prices(prices):
+    """
+    Fiyatları Python'un 'round(fiyat, 2)' sonucuyla birebir aynı olacak şekilde yuvarlar. NumPy'nin yuvarlaması
+    yalnızca 100 katı yarıma çok yakın değerlerde farklı olabilir; bu değerler 'round' ile yeniden hesaplanır.
+    Aksi halde anlık görüntü özetleri değişir ve ürünler gereksiz yere yeniden gönderilirdi.
+    """
+    scaled = prices * 100
+    rounded = (np.rint(scaled) / 100).tolist()
+    for i in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6).tolist():
+        rounded[i] = round(float(prices[i]), 2)
+    return rounded
+
+
+def compile_pricing_rules(category_rules, pricing_rules=()):
+    """
+    'category_repo.get_all_category_rules()' ve 'pricing_rule_repo.get_active_rules()' sonuçlarından döngü
+    boyunca kullanılacak derlenmiş kuralları üretir.
+    """
+    compiled = CompiledPricingRules(category_rules, pricing_rules)
+    logger.debug(f"{len(compiled)} kategori kuralı ve {compiled.rule_count} fiyat kuralı derlendi "
+                 f"(vektörel hesap: {'açık' if VECTORIZED_PRICING_ENABLED else 'kapalı'}).")
+    return compiled
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 01:30
+# Yapılan Değişiklikler:
+# 1. Senkronizasyon döngüsünün adımlarını (ayarlar, ERP bağlantısı/sorgusu, dönüştürme, her POST isteği,
+#    veritabanı okuma/yazma, paket sonucu kontrolü) monoton zamanlayıcıyla ölçen 'CycleProfiler' oluşturuldu.
+#    Ölçümler döngü sonunda 'sync_cycle_spans' tablosuna geçmiş kaydının id'siyle yazılır.
+
+import contextlib
+import threading
+import time
+
+STAGE_SETTINGS = "settings"
+STAGE_ERP_CONNECT = "erp_connect"
+STAGE_ERP_QUERY = "erp_query"
+STAGE_TRANSFORM = "transform"
+STAGE_DB_READ = "db_read"
+STAGE_POST = "post"
+STAGE_DB_WRITE = "db_write"
+STAGE_BATCH_POLL = "batch_poll"
+
+STAGE_LABELS = {
+    STAGE_SETTINGS: "Ayarlar",
+    STAGE_ERP_CONNECT: "ERP bağlantısı",
+    STAGE_ERP_QUERY: "ERP sorgusu",
+    STAGE_TRANSFORM: "Dönüştürme",
+    STAGE_DB_READ: "Veritabanı okuma",
+    STAGE_POST: "Trendyol isteği",
+    STAGE_DB_WRITE: "Veritabanı yazma",
+    STAGE_BATCH_POLL: "Paket sonucu",
+}
+
+
+class CycleProfiler:
+    """
+    Bir döngünün adım sürelerini toplar. Zamanlar 'time.perf_counter' ile ölçülür ve döngünün başlangıcına
+    göre milisaniye olarak saklanır. Şube iş parçacıklarından aynı anda kullanılabilir.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._spans = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, stage, branch=None, item_count=None, detail=None):
+        """'with' bloğunun süresini bir adım olarak kaydeder. Blok hata verse de süre kaydedilir."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(stage, started, time.perf_counter() - started, branch, item_count, detail)
+
+    def add_span(self, stage, started, duration, branch=None, item_count=None, detail=None):
+        """Başka yerde ölçülmüş bir adımı ekler. 'started' bir 'time.perf_counter()' değeri, 'duration' saniyedir."""
+        span = {
+            "stage": stage, "branch": branch, "start_ms": round((started - self._origin) * 1000, 2),
+            "duration_ms": round(duration * 1000, 2), "item_count": item_count, "detail": detail
+        }
+        with self._lock:
+            self._spans.append(span)
+
+    def get_spans(self):
+        with self._lock:
+            return sorted(self._spans, key=lambda s: s["start_ms"])
+
+    def stage_totals(self):
+        """Adım türüne göre toplam süreleri (ms) döndürür. Paralel şubelerde toplam, döngü süresini aşabilir."""
+        totals = {}
+        for span in self.get_spans():
+            totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["duration_ms"]
+        return totals
+
+    def format_totals(self):
+        totals = self.stage_totals()
+        return ", ".join(f"{STAGE_LABELS.get(stage, stage)}: {ms / 1000:.2f} sn"
+                         for stage, ms in sorted(totals.items(), key=lambda item: -item[1]))
+
+
+class _NullProfiler:
+    """Profil tutulmayan çağrılar için hiçbir şey kaydetmeyen profilleyici."""
+
+    started_at = None
+
+    def span(self, stage, branch=None, item_count=None, detail=None):
+        return contextlib.nullcontext()
+
+    def add_span(self, stage, started, duration, branch=None, item_count=None, detail=None):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def iter_timed(iterable, profiler, stage, branch=None):
+    """
+    Bir generator'ın her elemanının üretilme süresini ayrı bir adım olarak kaydeder. Parça parça okunan ERP
+    sonuçlarında sorgu süresi, dönüştürme ve gönderim süresinden ayrılabilsin diye kullanılır.
+    """
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            profiler.add_span(stage, started, time.perf_counter() - started, branch)
+            return
+        profiler.add_span(stage, started, time.perf_counter() - started, branch,
+                          item_count=len(item) if hasattr(item, "__len__") else None)
+        yield item
+
+
+def summarize_spans(spans):
+    """
+    Şelale (waterfall) görünümü için adımları (adım, şube) bazında birleştirir. Her satır; ilk başlangıç,
+    son bitiş, toplam süre ve adım sayısını içerir ve ilk başlangıca göre sıralıdır.
+    """
+    rows = {}
+    for span in spans:
+        key = (span["stage"], span.get("branch") or "")
+        end_ms = span["start_ms"] + span["duration_ms"]
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {"stage": key[0], "branch": key[1], "start_ms": span["start_ms"], "end_ms": end_ms,
+                         "total_ms": span["duration_ms"], "count": 1}
+        else:
+            row["start_ms"] = min(row["start_ms"], span["start_ms"])
+            row["end_ms"] = max(row["end_ms"], end_ms)
+            row["total_ms"] += span["duration_ms"]
+            row["count"] += 1
+    return sorted(rows.values(), key=lambda r: (r["start_ms"], r["stage"]))
@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 09:00
+# Yapılan Değişiklikler:
+# 1. 'enable_auto_sync' açıklaması, stok kulvarının kendi kapsamı ve mağaza kilitleriyle çalıştığını anlatacak
+#    şekilde güncellendi.
+
+import datetime
+import logging
+import threading
+from collections import namedtuple
+
+from ..repositories import settings_repo
+from .metrics import SYNC_CYCLE_OVERRUNS
+
+logger = logging.getLogger(__name__)
+
+OVERLAP_SKIP = "skip"
+OVERLAP_QUEUE = "queue"
+OVERLAP_POLICIES = (OVERLAP_SKIP, OVERLAP_QUEUE)
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+NEXT_RUN_SETTING_PREFIX = "scheduler_next_run_"
+# Sistem saati değişirse plan en geç bu süre içinde yeniden değerlendirilir
+MAX_WAIT_SECONDS = 30
+# Uzun bir kapanmadan sonra kaçırılan çalıştırmalar tek tek sayılmaz; plan şimdiki zamandan yeniden kurulur
+MAX_CATCH_UP = datetime.timedelta(days=1)
+
+AUTO_SYNC_SCOPE = "sync"
+STOCK_SYNC_SCOPE = "stock_sync"
+
+
+class ScheduleWindow(namedtuple("ScheduleWindow", "weekdays start_minute end_minute interval_seconds")):
+    """
+    Haftanın belirli günlerinde, belirli saat aralığında geçerli olan çalışma sıklığı.
+    'weekdays' ISO gün numaralarıdır (1 = Pazartesi ... 7 = Pazar). Bitiş saati başlangıçtan küçükse
+    aralık gece yarısını geçer (ör. 22:00-06:00); bu durumda gün, aralığın başladığı gündür.
+    """
+
+    def contains(self, moment):
+        minute = moment.hour * 60 + moment.minute
+        if self.start_minute < self.end_minute:
+            return moment.isoweekday() in self.weekdays and self.start_minute <= minute < self.end_minute
+        previous_day = (moment - datetime.timedelta(days=1)).isoweekday()
+        return ((moment.isoweekday() in self.weekdays and minute >= self.start_minute)
+                or (previous_day in self.weekdays and minute < self.end_minute))
+
+    def next_start_after(self, moment):
+        """'moment' anından sonraki ilk aralık başlangıcını döndürür."""
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        for offset in range(8):
+            candidate = day + datetime.timedelta(days=offset, minutes=self.start_minute)
+            if candidate > moment and candidate.isoweekday() in self.weekdays:
+                return candidate
+        return None
+
+
+def _parse_clock(text):
+    hours, minutes = text.strip().split(":")
+    value = int(hours) * 60 + int(minutes)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(text)
+    return value
+
+
+def _parse_weekdays(text):
+    weekdays = set()
+    for part in text.split(","):
+        if "-" in part:
+            first, last = (int(x) for x in part.split("-"))
+            weekdays.update(range(first, last + 1))
+        else:
+            weekdays.add(int(part))
+    if not weekdays or not weekdays <= set(range(1, 8)):
+        raise ValueError(text)
+    return frozenset(weekdays)
+
+
+def parse_schedule_windows(text):
+    """
+    Zaman aralığı tanımlarını okur. Biçim: '[günler] SS:DD-SS:DD=dakika', tanımlar ';' ile ayrılır.
+    Günler yazılmazsa her gün geçerlidir. Örnek: '1-5 09:00-22:00=5; 6,7 10:00-20:00=10; 22:00-09:00=60'
+    Hatalı bir tanımda ValueError fırlatır.
+    """
+    windows = []
+    for entry in (text or "").split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            spec, minutes = entry.rsplit("=", 1)
+            parts = spec.split()
+            weekdays = _parse_weekdays(parts[0]) if len(parts) == 2 else frozenset(range(1, 8))
+            start_text, end_text = parts[-1].split("-")
+            interval_seconds = int(minutes) * 60
+            start_minute, end_minute = _parse_clock(start_text), _parse_clock(end_text)
+            if interval_seconds <= 0 or start_minute == end_minute or len(parts) > 2:
+                raise ValueError(entry)
+        except ValueError:
+            raise ValueError(f"Geçersiz zaman aralığı tanımı: '{entry}'. Örnek: '1-5 09:00-22:00=5'")
+        windows.append(ScheduleWindow(weekdays, start_minute, end_minute, interval_seconds))
+    return windows
+
+
+def interval_at(moment, default_interval_seconds, windows):
+    """'moment' anında geçerli çalışma aralığını (saniye) döndürür; ilk eşleşen zaman aralığı kullanılır."""
+    for window in windows or ():
+        if window.contains(moment):
+            return window.interval_seconds
+    return default_interval_seconds
+
+
+def next_slot(previous_slot, default_interval_seconds, windows=None):
+    """
+    Bir önceki planlanan zamandan sonraki çalışma zamanını hesaplar. Daha sık çalışılan bir zaman aralığı
+    bu süre dolmadan başlıyorsa, sonraki çalışma o aralığın başlangıcına çekilir.
+    """
+    candidate = previous_slot + datetime.timedelta(seconds=interval_at(previous_slot, default_interval_seconds, windows))
+    for window in windows or ():
+        window_start = window.next_start_after(previous_slot)
+        if window_start and window_start < candidate:
+            candidate = window_start
+    return candidate
+
+
+def next_slot_after(previous_slot, now, default_interval_seconds, windows=None):
+    """
+    'now' anından sonraki ilk planlı çalışma zamanını döndürür. Kaçırılan çalıştırmalar telafi edilmez,
+    plan bir önceki çalışmayla aynı hizada devam eder.
+    """
+    if now - previous_slot > MAX_CATCH_UP:
+        previous_slot = now
+    candidate = next_slot(previous_slot, default_interval_seconds, windows)
+    while candidate <= now:
+        candidate = next_slot(candidate, default_interval_seconds, windows)
+    return candidate
+
+
+class _ScheduledJob:
+    def __init__(self, scope, func, interval_seconds, windows, overlap_policy, persist, lock_scope=None):
+        self.scope = scope
+        self.lock_scope = lock_scope or scope
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.windows = windows or []
+        self.overlap_policy = overlap_policy
+        self.persist = persist
+        self.next_run = None
+        self.queued = False
+        self.skipped_runs = 0
+        self.running = False
+        self.last_started = None
+        self.last_finished = None
+
+
+class SyncScheduler:
+    """
+    Kayıtlı işleri (ör. otomatik senkronizasyon) tek bir arka plan iş parçacığından zamanında tetikler.
+    İşler ayrı iş parçacıklarında çalışır; aynı kapsamdaki iki iş asla aynı anda çalışmaz. Elle başlatılan
+    çalıştırmalar da 'run_exclusive' ile aynı kapsam kilidini kullanır.
+    """
+
+    def __init__(self, now_func=datetime.datetime.now):
+        self._now = now_func
+        self._jobs = {}
+        self._scope_locks = {}
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # --- İş kaydı ---
+
+    def add_job(self, scope, func, interval_minutes, windows=None, overlap_policy=OVERLAP_SKIP, persist=True,
+                lock_scope=None):
+        """
+        'scope' kapsamı için periyodik bir iş kaydeder (varsa öncekinin yerine geçer). Kayıtlı bir sonraki
+        çalışma zamanı varsa plan oradan sürer; zamanı geçmişse iş hemen bir kez çalıştırılır.
+        'lock_scope' verilirse iş, o kapsamın kilidiyle çalışır ve o kapsamdaki işlerle aynı anda çalışmaz.
+        """
+        if overlap_policy not in OVERLAP_POLICIES:
+            logger.warning(f"Bilinmeyen çakışma politikası '{overlap_policy}', '{OVERLAP_SKIP}' kullanılıyor.")
+            overlap_policy = OVERLAP_SKIP
+        job = _ScheduledJob(scope, func, max(1, int(interval_minutes)) * 60, windows, overlap_policy, persist, lock_scope)
+        now = self._now()
+        saved_next_run = self._load_next_run(scope) if persist else None
+        if saved_next_run and saved_next_run > now:
+            # Aralık kısaltıldıysa kayıtlı zaman yeni aralıktan daha uzağa planlanmış olabilir
+            job.next_run = min(saved_next_run, next_slot(now, job.interval_seconds, job.windows))
+        else:
+            job.next_run = now
+        with self._lock:
+            previous = self._jobs.get(scope)
+            if previous:
+                job.queued, job.last_started, job.last_finished = previous.queued, previous.last_started, previous.last_finished
+            self._jobs[scope] = job
+        self._save_next_run(job)
+        logger.info(f"'{scope}' işi zamanlandı: her {job.interval_seconds // 60} dk, {len(job.windows)} zaman aralığı, "
+                    f"çakışmada '{overlap_policy}'. İlk çalışma: {job.next_run.strftime(DATETIME_FORMAT)}")
+        self.start()
+        self._wake_event.set()
+        return job.next_run
+
+    def remove_job(self, scope):
+        """İşi plandan çıkarır. Çalışmakta olan döngü yarıda kesilmez."""
+        with self._lock:
+            job = self._jobs.pop(scope, None)
+        if job and job.persist:
+            settings_repo.save_app_setting(NEXT_RUN_SETTING_PREFIX + scope, "")
+        self._wake_event.set()
+        return job is not None
+
+    def has_job(self, scope):
+        with self._lock:
+            return scope in self._jobs
+
+    def get_job_status(self, scope):
+        """İşin sonraki çalışma zamanını ve çalışma durumunu döndürür. İş kayıtlı değilse None döner."""
+        with self._lock:
+            job = self._jobs.get(scope)
+            if not job:
+                return None
+            return {
+                "next_run": job.next_run, "running": job.running, "queued": job.queued,
+                "skipped_runs": job.skipped_runs, "last_started": job.last_started, "last_finished": job.last_finished,
+                "interval_seconds": job.interval_seconds, "overlap_policy": job.overlap_policy,
+            }
+
+    # --- Çalıştırma ---
+
+    def _get_scope_lock(self, scope):
+        with self._lock:
+            return self._scope_locks.setdefault(scope, threading.Lock())
+
+    def is_scope_running(self, scope):
+        scope_lock = self._scope_locks.get(scope)
+        return scope_lock is not None and scope_lock.locked()
+
+    def run_exclusive(self, scope, func, *args, **kwargs):
+        """
+        'func' fonksiyonunu, kapsamın kilidi boştaysa çağıran iş parçacığında çalıştırır ve True döner.
+        Aynı kapsamda bir döngü zaten çalışıyorsa hiçbir şey yapmadan False döner.
+        """
+        scope_lock = self._get_scope_lock(scope)
+        if not scope_lock.acquire(blocking=False):
+            return False
+        try:
+            func(*args, **kwargs)
+        finally:
+            # Bu sırada sıraya alınan planlı çalışma varsa kilit bırakılmadan ona devredilir
+            next_job = self._next_queued_job(scope, scope_lock)
+            if next_job is not None:
+                self._start_job_thread(next_job, scope_lock)
+        return True
+
+    def run_now(self, scope):
+        """Kayıtlı işi plandan bağımsız olarak hemen tetikler (çakışma politikası geçerlidir)."""
+        with self._lock:
+            job = self._jobs.get(scope)
+        if not job:
+            return False
+        self._dispatch(job)
+        return True
+
+    def _dispatch(self, job):
+        scope_lock = self._get_scope_lock(job.lock_scope)
+        with self._lock:
+            if scope_lock.acquire(blocking=False):
+                self._start_job_thread(job, scope_lock)
+                return
+            SYNC_CYCLE_OVERRUNS.inc(scope=job.scope, policy=job.overlap_policy)
+            if job.overlap_policy == OVERLAP_QUEUE:
+                if not job.queued:
+                    logger.info(f"'{job.lock_scope}' kapsamında bir döngü hâlâ çalışıyor; '{job.scope}' işinin yeni çalışması, "
+                                f"döngü bitince yapılmak üzere sıraya alındı.")
+                job.queued = True
+            else:
+                job.skipped_runs += 1
+                logger.warning(f"'{job.lock_scope}' kapsamında bir döngü hâlâ çalıştığı için '{job.scope}' işinin planlanan "
+                               f"çalışması atlandı (toplam atlanan: {job.skipped_runs}).")
+
+    def _start_job_thread(self, job, scope_lock):
+        threading.Thread(target=self._run_job, args=(job, scope_lock), name=f"scheduler-{job.scope}", daemon=True).start()
+
+    def _next_queued_job(self, lock_scope, scope_lock, finished_job=None):
+        """
+        Kilidi tutan çalışma bittiğinde çağrılır. Aynı kilidi kullanan işlerden sırada bekleyen varsa onu
+        (kilit bırakılmadan) döndürür; yoksa kilidi bırakıp None döner.
+        """
+        with self._lock:
+            if finished_job is not None:
+                finished_job.queued = finished_job.queued and self._jobs.get(finished_job.scope) is finished_job
+            next_job = next((j for j in self._jobs.values() if j.lock_scope == lock_scope and j.queued), None)
+            if next_job is None:
+                scope_lock.release()
+                return None
+            next_job.queued = False
+            return next_job
+
+    def _run_job(self, job, scope_lock):
+        try:
+            while job is not None:
+                job.last_started = self._now()
+                job.running = True
+                try:
+                    job.func()
+                except Exception as e:
+                    logger.error(f"Zamanlanmış '{job.scope}' işi hata verdi: {e}", exc_info=True)
+                job.running = False
+                job.last_finished = self._now()
+                job = self._next_queued_job(job.lock_scope, scope_lock, finished_job=job)
+        except BaseException:
+            job.running = False
+            if scope_lock.locked():
+                scope_lock.release()
+            raise
+
+    # --- Arka plan iş parçacığı ---
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.is_running():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="sync-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Zamanlayıcıyı durdurur. Çalışmakta olan döngüler kendi iş parçacıklarında tamamlanır."""
+        self._stop_event.set()
+        self._wake_event.set()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _run(self):
+        logger.info("Senkronizasyon zamanlayıcısı başlatıldı.")
+        while not self._stop_event.is_set():
+            now = self._now()
+            with self._lock:
+                jobs = list(self._jobs.values())
+            for job in jobs:
+                if job.next_run <= now:
+                    job.next_run = next_slot_after(job.next_run, now, job.interval_seconds, job.windows)
+                    self._save_next_run(job)
+                    self._dispatch(job)
+            with self._lock:
+                next_runs = [job.next_run for job in self._jobs.values()]
+            wait_seconds = MAX_WAIT_SECONDS
+            if next_runs:
+                wait_seconds = min(wait_seconds, max(0.0, (min(next_runs) - self._now()).total_seconds()))
+            self._wake_event.wait(wait_seconds)
+            self._wake_event.clear()
+        logger.info("Senkronizasyon zamanlayıcısı durdu.")
+
+    # --- Kalıcı durum ---
+
+    def _load_next_run(self, scope):
+        value = settings_repo.get_app_setting(NEXT_RUN_SETTING_PREFIX + scope)
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, DATETIME_FORMAT)
+        except ValueError:
+            return None
+
+    def _save_next_run(self, job):
+        if job.persist:
+            settings_repo.save_app_setting(NEXT_RUN_SETTING_PREFIX + job.scope, job.next_run.strftime(DATETIME_FORMAT))
+
+
+# Uygulama genelinde kullanılacak tek zamanlayıcı
+sync_scheduler = SyncScheduler()
+
+
+def enable_auto_sync(interval_minutes=None, on_finish_callback=None, remember=True, force_full_first=False):
+    """
+    Otomatik senkronizasyonu ayarlardaki aralık, zaman aralıkları ve çakışma politikasıyla zamanlar. Stok
+    kulvarı ayarlarda açıksa, o da kendi aralığıyla ve kendi kapsamında ('STOCK_SYNC_SCOPE') zamanlanır; tam
+    senkronizasyon sürerken de çalışır. O anda tam senkronizasyonun işlediği mağazalar, beklemeyen mağaza
+    kilidi sayesinde stok döngüsünde atlanır.
+    'remember' True ise açık olduğu bilgisi kaydedilir ve program bir sonraki açılışta planı sürdürür.
+    'force_full_first' True ise ilk döngü delta kontrolü yapılmadan çalışır. Sonraki çalışma zamanını döndürür.
+    """
+    from . import synchronizer
+
+    schedule_settings = settings_repo.get_schedule_settings()
+    interval_minutes = interval_minutes or settings_repo.get_general_settings().get("sync_interval_minutes") or 15
+    try:
+        windows = parse_schedule_windows(schedule_settings["sync_windows"])
+    except ValueError as e:
+        logger.warning(f"{e} Zaman aralıkları yok sayılıyor.")
+        windows = []
+
+    force_full = [force_full_first]
+
+    def run_auto_sync():
+        full, force_full[0] = force_full[0], False
+        synchronizer.run_single_sync_cycle(sync_type='auto', on_finish_callback=on_finish_callback, force_full=full)
+
+    def run_stock_sync():
+        synchronizer.run_stock_sync_cycle(sync_type='auto-stock', on_finish_callback=on_finish_callback)
+
+    if remember:
+        settings_repo.save_app_setting("auto_sync_enabled", "True")
+    next_run = sync_scheduler.add_job(
+        AUTO_SYNC_SCOPE, run_auto_sync, interval_minutes, windows=windows,
+        overlap_policy=schedule_settings["sync_overlap_policy"]
+    )
+    if schedule_settings["stock_lane_enabled"]:
+        # Stok kulvarının kendi kilidi vardır; tam senkronizasyon sürerken de çalışır. Aynı mağazanın anlık
+        # görüntüleri mağaza kilidiyle korunur ('synchronizer'). Sık çalıştığı için, önceki stok döngüsü
+        # sürerken gelen çalışmalar sıraya alınmadan atlanır.
+        sync_scheduler.add_job(
+            STOCK_SYNC_SCOPE, run_stock_sync, schedule_settings["stock_sync_interval_minutes"],
+            overlap_policy=OVERLAP_SKIP
+        )
+    else:
+        sync_scheduler.remove_job(STOCK_SYNC_SCOPE)
+    return next_run
+
+
+def disable_auto_sync():
+    settings_repo.save_app_setting("auto_sync_enabled", "False")
+    sync_scheduler.remove_job(STOCK_SYNC_SCOPE)
+    return sync_scheduler.remove_job(AUTO_SYNC_SCOPE)
+
+
+def restore_auto_sync(on_finish_callback=None):
+    """Önceki oturumda otomatik senkronizasyon açık bırakıldıysa planı yeniden kurar. Kurulduysa True döner."""
+    if not settings_repo.get_schedule_settings().get("auto_sync_enabled"):
+        return False
+    enable_auto_sync(on_finish_callback=on_finish_callback)
+    return True
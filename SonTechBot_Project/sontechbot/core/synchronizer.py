@@ -1,175 +1,645 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 09:55
+# Güncelleme Tarihi: 19.10.2026 08:30
 # Yapılan Değişiklikler:
-# 1. 'ImportError' hatasını çözmek için, artık kullanılmayan 'brand_repo' import'u kaldırıldı.
-# 2. Kod, marka eşleştirmesi olmadan, sadece kategori kurallarına göre çalışacak şekilde sadeleştirildi.
+# 1. Stok kulvarı, lokasyonu için ERP'den hiç stoklu ürün dönmeyen şubenin ürünlerini sıfırlamıyor; tam
+#    senkronizasyondaki gibi uyarı verilip şube atlanır.
 
 import datetime
 import json
+import logging
 import threading
 import time
 import traceback
-
-from kivy.app import App
-from kivy.clock import Clock
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ..ecommerce_integrations.trendyol_handler import TrendyolGoAPI
-from ..erp_integrations import ERP12Handler
-from ..repositories import (branch_repo, category_repo, history_repo,
-                            issue_repo, product_repo, settings_repo)
-from ..ui.helpers import LoadingPopup
+from .adaptive_batcher import DEFAULT_INITIAL_SIZE, AdaptiveChunker
+from .batch_poller import batch_poller
+from .incremental_extraction import commit_extraction, plan_extraction
+from .metrics import (ERP_QUERY_SECONDS, LAST_CYCLE_TIMESTAMP, PRODUCTS_PROCESSED,
+                      PRODUCTS_SENT, SEND_FAILURES, SYNC_CYCLE_SECONDS,
+                      SYNC_CYCLES)
+from .pricing import compile_pricing_rules
+from .profiling import (NULL_PROFILER, STAGE_DB_READ, STAGE_DB_WRITE,
+                        STAGE_ERP_CONNECT, STAGE_ERP_QUERY, STAGE_POST,
+                        STAGE_SETTINGS, STAGE_TRANSFORM, CycleProfiler,
+                        iter_timed, summarize_spans)
+from ..erp_integrations import ERP12Handler, branch_product_key
+from ..repositories import (batch_repo, branch_repo, category_repo,
+                            history_repo, issue_repo, pricing_rule_repo,
+                            product_repo, profile_repo, settings_repo,
+                            snapshot_repo)
+from ..repositories.snapshot_repository import compute_content_hash
+
+logger = logging.getLogger(__name__)
+
+METRICS_LANE_FULL = "full"
+METRICS_LANE_STOCK = "stock"
+# Döngü durumlarının metrik etiketleri; listede olmayan durumlar (Kritik Hata vb.) 'error' sayılır
+METRIC_CYCLE_STATUSES = {"Başarılı": "success", "Uyarılarla Tamamlandı": "warning"}
+METRIC_ERP_OPERATIONS = {STAGE_ERP_CONNECT: "connect", STAGE_ERP_QUERY: "query"}
 
 gui_status_update_callback = None
+cycle_start_callback = None
+cycle_end_callback = None
 unpriced_products_with_stock = []
-_loading_popup_instance = None
+
+_trendyol_client = None
+_trendyol_client_key = None
+_trendyol_client_lock = threading.Lock()
+_erp_handler_factory = ERP12Handler
+# Aynı mağazanın anlık görüntülerinin, tam senkronizasyon ve stok kulvarı tarafından aynı anda okunup
+# yazılmaması için mağaza başına kilitler
+_store_locks = {}
+_store_locks_guard = threading.Lock()
 
 def set_gui_status_updater(callback_function):
     global gui_status_update_callback
     gui_status_update_callback = callback_function
 
+def set_cycle_hooks(on_cycle_start=None, on_cycle_end=None):
+    """
+    Her senkronizasyon döngüsünün başında ('on_cycle_start(mesaj)') ve sonunda ('on_cycle_end()') çağrılacak
+    fonksiyonları kaydeder (ör. arayüzdeki yükleniyor penceresi). Fonksiyonlar döngüyü çalıştıran
+    iş parçacığından çağrılır; arayüz işlemlerini kendi ana döngülerine aktarmaları gerekir.
+    """
+    global cycle_start_callback, cycle_end_callback
+    cycle_start_callback = on_cycle_start
+    cycle_end_callback = on_cycle_end
+
+def _run_cycle_hook(hook, *args):
+    if not hook:
+        return
+    try:
+        hook(*args)
+    except Exception as e:
+        logger.warning(f"Senkronizasyon döngüsü bildirim fonksiyonu hata verdi: {e}", exc_info=True)
+
+def set_erp_handler_factory(factory=None):
+    """
+    Döngülerin ERP bağlayıcısını oluşturan fonksiyonu değiştirir. 'factory', 'erp_config_override' anahtar
+    argümanını alıp ERP12Handler ile aynı metotları sunan bir nesne döndürmelidir. None verilirse ERP12Handler'a dönülür.
+    """
+    global _erp_handler_factory
+    _erp_handler_factory = factory or ERP12Handler
+
+def _create_erp_handler(erp_config):
+    return _erp_handler_factory(erp_config_override=erp_config)
+
+def _record_erp_connects(profiler, erp_handler, branch_name=None):
+    """ERP bağlayıcısının ölçtüğü bağlantı sürelerini profile ekler."""
+    for started, duration in getattr(erp_handler, "connect_timings", ()):
+        profiler.add_span(STAGE_ERP_CONNECT, started, duration, branch_name)
+
+def _get_store_lock(store_id):
+    with _store_locks_guard:
+        return _store_locks.setdefault(str(store_id), threading.Lock())
+
 def update_gui_status(message):
+    # Geri çağırma fonksiyonu iş parçacığı güvenli olmalıdır (bkz. DashboardScreen.add_log_message)
     if gui_status_update_callback and hasattr(gui_status_update_callback, '__call__'):
-        Clock.schedule_once(lambda dt: gui_status_update_callback(message), 0)
+        gui_status_update_callback(message)
     else:
-        print(f"[SYNC STATUS] {message}")
+        logger.info(f"[SYNC STATUS] {message}")
+
+# Arka plandaki paket kontrol servisinin mesajları da aynı durum akışına düşer
+batch_poller.set_status_callback(update_gui_status)
+
+def get_trendyol_client(trendyol_cfg, pool_size=None):
+    """
+    Senkronizasyon kulvarlarının ortak kullandığı Trendyol istemcisini döndürür. İstemci ve açık bağlantıları
+    döngüler arasında korunur; API ayarları veya havuz boyutu değiştiyse eskisi kapatılıp yenisi oluşturulur.
+    """
+    global _trendyol_client, _trendyol_client_key
+    client_key = (tuple(sorted(trendyol_cfg.items())), pool_size)
+    with _trendyol_client_lock:
+        if _trendyol_client is None or _trendyol_client_key != client_key:
+            if _trendyol_client:
+                _trendyol_client.close()
+            _trendyol_client = TrendyolGoAPI(**trendyol_cfg, pool_size=pool_size)
+            _trendyol_client_key = client_key
+        return _trendyol_client
+
+def close_trendyol_client():
+    """Ortak Trendyol istemcisini ve bağlantı havuzunu kapatır (program kapanırken)."""
+    global _trendyol_client, _trendyol_client_key
+    with _trendyol_client_lock:
+        if _trendyol_client:
+            _trendyol_client.close()
+        _trendyol_client, _trendyol_client_key = None, None
+
+def _get_api_metrics_delta(trendyol_api_client, metrics_before):
+    """Paylaşılan istemcinin biriken metriklerinden yalnızca bu döngüde oluşan kısmı hesaplar."""
+    metrics = trendyol_api_client.get_metrics()
+    return {
+        "retries": metrics["retries"] - metrics_before["retries"],
+        "throttled_seconds": round(metrics["throttled_seconds"] - metrics_before["throttled_seconds"], 2)
+    }
+
+def _create_chunker(sync_settings):
+    if sync_settings.get('adaptive_chunk_enabled', True):
+        return AdaptiveChunker(max_size=sync_settings.get('chunk_size_max'))
+    return AdaptiveChunker.fixed(DEFAULT_INITIAL_SIZE)
+
+def _get_trendyol_config_or_raise():
+    trendyol_cfg = settings_repo.get_trendyol_config()
+    if not all(trendyol_cfg.get(k) for k in ['api_key', 'api_secret', 'supplier_id']):
+        raise ValueError("Trendyol API ayarları eksik. 'Ayarlar' bölümünü kontrol edin.")
+    return trendyol_cfg
 
 def get_unpriced_products_with_stock():
     global unpriced_products_with_stock
     return list(unpriced_products_with_stock)
 
-def _show_loading_popup(message="İşlem devam ediyor..."):
-    if App.get_running_app():
-        global _loading_popup_instance
-        if _loading_popup_instance is None: _loading_popup_instance = LoadingPopup(message=message)
-        else: _loading_popup_instance.set_message(message)
-        _loading_popup_instance.open()
-
-def _hide_loading_popup():
-    if App.get_running_app():
-        global _loading_popup_instance
-        if _loading_popup_instance:
-            _loading_popup_instance.dismiss()
-            _loading_popup_instance = None
-
-def _process_batch_results(api_client, batch_id, branch_name):
-    update_gui_status(f"'{batch_id}' nolu işlemin sonucu kontrol ediliyor...")
-    time.sleep(5)
-    response = api_client.check_batch_request_status(batch_id)
-    
-    if response and response.get('status') == 'COMPLETED':
-        failed_items = [item for item in response.get('items', []) if item.get('status') == 'FAILURE']
-        for item in failed_items:
-            error_reason = item.get('failureReasons', ['Bilinmeyen hata'])[0]
-            barcode = item.get('requestItem', {}).get('barcode')
-            if "not found" in error_reason.lower() or "bulunamadı" in error_reason.lower():
-                issue_repo.add_sync_issue(None, barcode, branch_name, "Eşleşmemiş Ürün", error_reason)
-            else:
-                issue_repo.add_sync_issue(None, barcode, branch_name, "API Güncelleme Hatası", error_reason)
-        return len(failed_items)
-    elif response and response.get('status') == 'PROCESSING':
-        update_gui_status(f"'{batch_id}' nolu işlem hala sürüyor. Daha sonra kontrol edilecek.")
-        return 0
+def _select_changed_products(products_to_send, snapshots):
+    """
+    Delta aşaması: Son gönderimdeki anlık görüntü ile aynı olan ürünleri eler.
+    Geriye (gönderilecek ürünler, değişmediği için atlanan ürün sayısı) döner.
+    """
+    changed_products, unchanged_count = [], 0
+    for item in products_to_send:
+        snapshot = snapshots.get(item['barcode'])
+        if snapshot and snapshot['content_hash'] == compute_content_hash(item):
+            unchanged_count += 1
+        else:
+            changed_products.append(item)
+    return changed_products, unchanged_count
+
+def _build_zero_stock_products(store_id, snapshots, seen_barcodes):
+    """ERP'de artık stoklu görünmeyen ama Trendyol'da stoklu bilinen ürünler için stok 0 kayıtları üretir."""
+    zero_stock_products = []
+    for barcode, snapshot in snapshots.items():
+        if barcode in seen_barcodes or snapshot['quantity'] <= 0:
+            continue
+        zero_stock_products.append({
+            "barcode": barcode, "quantity": 0,
+            "sellingPrice": snapshot['selling_price'], "originalPrice": snapshot['original_price'],
+            "storeId": store_id
+        })
+    return zero_stock_products
+
+def _transform_products(products, branch, pricing_rules, result, seen_barcodes):
+    """
+    ERP kayıtlarından oluşan bir parçayı Trendyol'a gönderilecek ürün sözlüklerine dönüştürür. Fiyat ve stok
+    hesapları derlenmiş kurallarla ('core.pricing') parçanın tamamı için bir kerede yapılır.
+    """
+    branch_name = branch.get("erp_branch_name")
+    store_id = branch.get("trendyol_store_id")
+    priced = pricing_rules.price_batch(products, branch)
+    result["processed"] += len(products)
+    seen_barcodes.update(priced.barcodes)
+
+    for row_index, price in priced.unpriced:
+        product = products[row_index]
+        unpriced_product = product._asdict()
+        unpriced_product["erp_branch_name"] = branch_name
+        result["unpriced"].append(unpriced_product)
+        result["issue_records"].append({
+            "erp_product_id": product.erp_product_id, "barcode": str(product.barcode1).strip(),
+            "erp_branch_name": branch_name, "issue_type": "Fiyatsız Ürün", "message": f"Fiyat sıfır veya negatif: {price:.2f}"
+        })
+    result["issues"] += len(priced.unpriced)
+
+    return [{"barcode": barcode, "quantity": stock, "sellingPrice": price, "originalPrice": price, "storeId": store_id}
+            for barcode, stock, price in zip(priced.send_barcodes, priced.send_stocks, priced.send_prices)]
+
+def _send_chunk(trendyol_api_client, chunk, branch_name, store_id, result, chunker, profiler=NULL_PROFILER):
+    payload_bytes = len(json.dumps(chunk))
+    started = time.perf_counter()
+    response = trendyol_api_client.update_stock_price(chunk)
+    success = bool(response and response.get("batchRequestId"))
+    elapsed = time.perf_counter() - started
+    wait_seconds = trendyol_api_client.get_last_request_stats()["wait_seconds"]
+    profiler.add_span(STAGE_POST, started, elapsed, branch_name, len(chunk),
+                      detail=f"{payload_bytes} bayt, {wait_seconds:.2f} sn bekleme" if success else "HATA")
+    # Hız sınırı/yeniden deneme beklemeleri sunucu yavaşlığı sayılmaz, ölçülen süreden düşülür
+    latency = elapsed - wait_seconds
+    chunker.record(len(chunk), max(0.0, latency), payload_bytes,
+                   status_code=response.get("status_code") if response else None, success=success)
+    if success:
+        batch_id = response["batchRequestId"]
+        update_gui_status(f"'{branch_name}' için {len(chunk)} ürün gönderildi. Batch ID: {batch_id}")
+        result["batch_ids"].append((batch_id, branch_name, store_id))
+        with profiler.span(STAGE_DB_WRITE, branch_name, len(chunk), detail="anlık görüntü ve paket kaydı"):
+            snapshot_repo.save_snapshots(store_id, chunk)
+            batch_poller.register_batch(batch_id, branch_name, store_id, [item['barcode'] for item in chunk],
+                                        cycle_started_at=profiler.started_at)
+        result["sent"] += len(chunk)
+    else:
+        error_msg = response.get("message", "API'den bilinmeyen hata.") if response else "Boş yanıt"
+        update_gui_status(f"HATA: '{branch_name}' için paket gönderilemedi: {error_msg}")
+        result["issues"] += len(chunk)
+        result["send_failures"] += 1
+
+def _send_chunks(trendyol_api_client, pending, branch_name, store_id, result, chunker, send_partial=False,
+                 profiler=NULL_PROFILER):
+    """
+    Bekleyen ürünleri, her seferinde paketleyicinin o anki boyutunda paketler halinde gönderir.
+    'send_partial' False ise boyutu dolmayan son ürünler gönderilmez ve geri döndürülür.
+    """
+    start = 0
+    while start < len(pending):
+        size = chunker.size
+        if not send_partial and len(pending) - start < size:
+            break
+        _send_chunk(trendyol_api_client, pending[start:start + size], branch_name, store_id, result, chunker, profiler)
+        start += size
+    return pending[start:]
+
+def _sync_branch(branch, erp_config, trendyol_api_client, pricing_rules, use_delta,
+                 prefetched_products=None, fetch_batch_size=None, chunker=None, incremental=False,
+                 profiler=NULL_PROFILER):
+    """
+    Tek bir şubenin ERP'den çekilmesi, dönüştürülmesi ve Trendyol'a gönderilmesi adımlarını yürütür.
+    Paralel çalışabilmesi için her çağrı kendi ERP bağlantısını açar ve sonuçlarını bir sözlük olarak döndürür.
+    Mağazanın anlık görüntüleri işlenirken mağaza kilidi tutulur.
+    'prefetched_products' verilmişse (toplu ERP sorgusu), ERP'ye tekrar gidilmez.
+    ERP satırları parça parça okunur; her parça dönüştürülür ve dolan paketler, sonraki parçalar
+    okunurken Trendyol'a gönderilmeye başlanır. Paket boyutu 'chunker' tarafından belirlenir.
+    'incremental' True ise ürünler yalnızca değişenlerdir: listede olmayan ürünler sıfırlanmaz, stoğu 0 olup
+    daha önce hiç gönderilmemiş ürünler de gönderilmez. Adım süreleri 'profiler'a kaydedilir.
+    """
+    result = {"processed": 0, "sent": 0, "unchanged": 0, "issues": 0, "send_failures": 0,
+              "batch_ids": [], "unpriced": [], "issue_records": []}
+    branch_name = branch.get("erp_branch_name")
+    store_id = branch.get("trendyol_store_id")
+    chunker = chunker or AdaptiveChunker.fixed(DEFAULT_INITIAL_SIZE)
+
+    if not store_id:
+        update_gui_status(f"UYARI: '{branch_name}' için Mağaza ID'si tanımlanmamış. Bu şube atlanıyor.")
+        return result
+
+    erp_handler = None
+    if prefetched_products is not None:
+        product_batches = [prefetched_products]
     else:
-        update_gui_status(f"'{batch_id}' nolu işlemin sonucu alınamadı. Yanıt: {response}")
-        return 0
+        update_gui_status(f"'{branch_name}' (Mağaza ID: {store_id}) için ürünler çekiliyor...")
+        erp_handler = _create_erp_handler(erp_config)
+        product_batches = iter_timed(erp_handler.iter_product_batches_for_branch(branch, batch_size=fetch_batch_size),
+                                     profiler, STAGE_ERP_QUERY, branch_name)
+
+    # Anlık görüntüler okunduktan son paket kaydedilene kadar stok kulvarı bu mağazaya dokunmaz
+    with _get_store_lock(store_id):
+        with profiler.span(STAGE_DB_READ, branch_name, detail="anlık görüntüler"):
+            snapshots = snapshot_repo.get_snapshots_for_store(store_id) if use_delta else None
+        seen_barcodes = set()
+        pending = []
+
+        for products in product_batches:
+            with profiler.span(STAGE_TRANSFORM, branch_name, len(products)):
+                products_to_send = _transform_products(products, branch, pricing_rules, result, seen_barcodes)
+                if incremental:
+                    products_to_send = [item for item in products_to_send if item['quantity'] > 0 or item['barcode'] in snapshots]
+                if use_delta:
+                    products_to_send, unchanged_count = _select_changed_products(products_to_send, snapshots)
+                    result["unchanged"] += unchanged_count
+            pending.extend(products_to_send)
+            pending = _send_chunks(trendyol_api_client, pending, branch_name, store_id, result, chunker, profiler=profiler)
+        if erp_handler is not None:
+            _record_erp_connects(profiler, erp_handler, branch_name)
+
+        if result["processed"] == 0:
+            if incremental:
+                update_gui_status(f"'{branch_name}' için son döngüden bu yana değişen ürün yok.")
+            else:
+                update_gui_status(f"'{branch_name}' için ERP'den stoklu ürün bulunamadı.")
+            return result
+
+        if use_delta and not incremental:
+            pending.extend(_build_zero_stock_products(store_id, snapshots, seen_barcodes))
+            update_gui_status(f"'{branch_name}' için {result['unchanged']} ürün değişmediği için atlandı.")
+
+        _send_chunks(trendyol_api_client, pending, branch_name, store_id, result, chunker, send_partial=True, profiler=profiler)
+        return result
+
+def _build_stock_updates(store_id, snapshots, stock_rows, stock_buffer, pricing_rules, result):
+    """
+    Stok kulvarının delta aşaması: Son gönderilen ürünlerden, ERP'deki güncel stoğu (tampon düşülmüş)
+    gönderilen stoktan farklı olanlar için son gönderilen fiyatlarla güncelleme kayıtları üretir.
+    ERP sonucunda bulunmayan barkodların stoğu 0 kabul edilir. Kategorisinin senkronizasyonu artık kapalı
+    olan ürünler, tam senkronizasyonda olduğu gibi güncellenmez.
+    """
+    stock_updates = []
+    for barcode, snapshot in snapshots.items():
+        stock_row = stock_rows.get(barcode)
+        if stock_row is not None and not pricing_rules.category_enabled(stock_row.erp_grup_kod):
+            continue
+        result["processed"] += 1
+        quantity = max(0, int(stock_row.quantity or 0) - stock_buffer) if stock_row is not None else 0
+        if quantity == snapshot['quantity']:
+            result["unchanged"] += 1
+            continue
+        stock_updates.append({
+            "barcode": barcode, "quantity": quantity,
+            "sellingPrice": snapshot['selling_price'], "originalPrice": snapshot['original_price'],
+            "storeId": store_id
+        })
+    return stock_updates
 
-def run_single_sync_cycle(sync_type='manual', on_finish_callback=None):
+def _sync_branch_stock(branch, trendyol_api_client, stock_rows, pricing_rules, chunker, profiler=NULL_PROFILER):
+    """
+    Tek bir şubenin stok kulvarı adımlarını yürütür. Yalnızca daha önce tam senkronizasyonla gönderilmiş
+    (anlık görüntüsü olan) ürünler ele alınır; yeni ürünler ve fiyat değişiklikleri tam senkronizasyonda gönderilir.
+    Mağaza o anda tam senkronizasyonda işleniyorsa beklenmez; güncel stoklar zaten o döngüyle gönderilir.
+    Lokasyon için ERP'den hiç stoklu ürün dönmezse, tüm ürünler sıfırlanmasın diye şube atlanır.
+    """
+    result = {"processed": 0, "sent": 0, "unchanged": 0, "issues": 0, "send_failures": 0, "batch_ids": []}
+    branch_name = branch.get("erp_branch_name")
+    store_id = branch.get("trendyol_store_id")
+
+    if not stock_rows:
+        logger.warning(f"'{branch_name}' lokasyonu için ERP'den stoklu ürün dönmedi; stoklar sıfırlanmadan şube atlandı.")
+        update_gui_status(f"UYARI: '{branch_name}' için ERP'den stoklu ürün bulunamadı; stoklar sıfırlanmadı.")
+        return result
+
+    store_lock = _get_store_lock(store_id)
+    if not store_lock.acquire(blocking=False):
+        update_gui_status(f"'{branch_name}' mağazası tam senkronizasyonda işleniyor; stok senkronizasyonu bu döngüde atlandı.")
+        return result
+    try:
+        with profiler.span(STAGE_DB_READ, branch_name, detail="anlık görüntüler"):
+            snapshots = snapshot_repo.get_snapshots_for_store(store_id)
+        if not snapshots:
+            update_gui_status(f"'{branch_name}' için henüz gönderilmiş ürün yok; stok senkronizasyonu tam senkronizasyonu bekliyor.")
+            return result
+
+        with profiler.span(STAGE_TRANSFORM, branch_name, len(snapshots)):
+            stock_updates = _build_stock_updates(store_id, snapshots, stock_rows, int(branch.get('stock_buffer', 0)),
+                                                 pricing_rules, result)
+        if stock_updates:
+            update_gui_status(f"'{branch_name}' için {len(stock_updates)} ürünün stoğu değişmiş, gönderiliyor...")
+            _send_chunks(trendyol_api_client, stock_updates, branch_name, store_id, result, chunker, send_partial=True,
+                         profiler=profiler)
+        return result
+    finally:
+        store_lock.release()
+
+def _record_branch_metrics(branch_name, branch_result, lane):
+    PRODUCTS_PROCESSED.inc(branch_result["processed"], branch=branch_name, lane=lane)
+    PRODUCTS_SENT.inc(branch_result["sent"], branch=branch_name, lane=lane)
+    if branch_result["send_failures"]:
+        SEND_FAILURES.inc(branch_result["send_failures"], branch=branch_name, lane=lane)
+
+def _record_cycle_metrics(lane, final_status, duration, profiler):
+    """Döngünün süresini ve sonucunu, profil varsa ERP bağlantı ve sorgu sürelerini (şube bazında toplam) kaydeder."""
+    status = METRIC_CYCLE_STATUSES.get(final_status, "error")
+    SYNC_CYCLES.inc(lane=lane, status=status)
+    SYNC_CYCLE_SECONDS.observe(duration, lane=lane)
+    LAST_CYCLE_TIMESTAMP.set(time.time(), lane=lane, status=status)
+    if isinstance(profiler, CycleProfiler):
+        for row in summarize_spans(profiler.get_spans()):
+            operation = METRIC_ERP_OPERATIONS.get(row["stage"])
+            if operation:
+                ERP_QUERY_SECONDS.observe(row["total_ms"] / 1000, operation=operation, lane=lane)
+
+def _finish_cycle(sync_type, start_time_obj, start_time_ts, final_status, summary_message, totals,
+                  batch_ids, issue_records=None, profiler=NULL_PROFILER, lane=METRICS_LANE_FULL, record_history=True):
+    """
+    Döngünün sorunlarını ve geçmiş kaydını yazar, döngünün sonuç sözlüğünü döndürür. Döngü profili ve
+    gönderilen paketler geçmiş kaydının id'sine bağlanır. 'record_history' False ise geçmiş kaydı ve profil
+    yazılmaz ('history_id' None olur); metrikler yine kaydedilir.
+    """
+    history_id = None
+    with profiler.span(STAGE_DB_WRITE, item_count=len(issue_records or ()), detail="sorunlar ve geçmiş kaydı"):
+        if issue_records:
+            issue_repo.add_sync_issues_bulk(issue_records)
+        duration = round(time.time() - start_time_ts, 2)
+        if record_history:
+            history_id = history_repo.add_sync_history_entry({
+                "start_time": start_time_obj.strftime('%Y-%m-%d %H:%M:%S'), "duration_seconds": duration,
+                "sync_type": sync_type, "status": final_status, "products_processed": totals["processed"],
+                "products_sent": totals["sent"], "issues_found": totals["issues"],
+                "summary_message": summary_message, "batch_request_id": batch_ids[0][0] if batch_ids else None
+            })
+    if history_id:
+        batch_repo.attach_history([batch[0] for batch in batch_ids], history_id)
+        if isinstance(profiler, CycleProfiler):
+            profile_repo.add_spans(history_id, profiler.get_spans())
+            logger.info(f"Döngü profili ({sync_type}): {profiler.format_totals()}")
+    _record_cycle_metrics(lane, final_status, duration, profiler)
+    update_gui_status(f"Döngü tamamlandı. Durum: {final_status}")
+    return {
+        "status": final_status, "summary_message": summary_message, "duration_seconds": duration,
+        "products_processed": totals["processed"], "products_sent": totals["sent"],
+        "issues_found": totals["issues"], "batch_count": len(batch_ids), "history_id": history_id
+    }
+
+def run_single_sync_cycle(sync_type='manual', on_finish_callback=None, force_full=False):
     global unpriced_products_with_stock
     unpriced_products_with_stock = []
     start_time_obj, start_time_ts = datetime.datetime.now(), time.time()
-    Clock.schedule_once(lambda dt: _show_loading_popup(f"'{sync_type.capitalize()}' senkronizasyon başlatılıyor..."), 0)
+    profiler = CycleProfiler()
+    _run_cycle_hook(cycle_start_callback, f"'{sync_type.capitalize()}' senkronizasyon başlatılıyor...")
     update_gui_status(f"'{sync_type.capitalize()}' senkronizasyon döngüsü başlatılıyor...")
 
     total_products_processed, total_products_sent, total_issues_found = 0, 0, 0
+    total_products_unchanged, total_send_failures = 0, 0
     final_status, summary_message = "Başarısız", "Bilinmeyen bir hata oluştu."
     batch_ids = []
+    issue_records = []
+    failed_branches = []
+    extraction_plan = None
 
     try:
-        erp_handler = ERP12Handler()
-        trendyol_cfg = settings_repo.get_trendyol_config()
-        if not all(trendyol_cfg.get(k) for k in ['api_key', 'api_secret', 'supplier_id']):
-            raise ValueError("Trendyol API ayarları eksik. 'Ayarlar' bölümünü kontrol edin.")
+        settings_started = time.perf_counter()
+        erp_config = settings_repo.get_erp_config()
+        trendyol_cfg = _get_trendyol_config_or_raise()
 
-        trendyol_api_client = TrendyolGoAPI(**trendyol_cfg)
+        sync_settings = settings_repo.get_sync_settings()
+        trendyol_api_client = get_trendyol_client(trendyol_cfg, pool_size=sync_settings.get('sync_max_workers'))
+        metrics_before = trendyol_api_client.get_metrics()
+        use_delta = sync_settings.get('delta_sync_enabled', True) and not force_full
+        if not use_delta:
+            update_gui_status("Delta kontrolü kapalı: Tüm stoklu ürünler gönderilecek.")
+        chunker = _create_chunker(sync_settings)
         
-        category_rules = {str(m['erp_category_id']): m for m in category_repo.get_all_category_rules()}
+        pricing_rules = compile_pricing_rules(category_repo.get_all_category_rules(), pricing_rule_repo.get_active_rules())
         active_branches = [b for b in branch_repo.get_all_branch_mappings() if b.get('is_active', True)]
+        profiler.add_span(STAGE_SETTINGS, settings_started, time.perf_counter() - settings_started)
         
         if not active_branches: raise ValueError("Senkronize edilecek aktif şube bulunamadı.")
 
-        for branch in active_branches:
-            branch_name = branch.get("erp_branch_name")
-            store_id = branch.get("trendyol_store_id")
-
-            if not store_id:
-                update_gui_status(f"UYARI: '{branch_name}' için Mağaza ID'si tanımlanmamış. Bu şube atlanıyor.")
-                continue
-
-            update_gui_status(f"'{branch_name}' (Mağaza ID: {store_id}) için ürünler çekiliyor...")
-            erp_products = erp_handler.get_products_from_erp_for_branch(branch)
-            if not erp_products:
-                update_gui_status(f"'{branch_name}' için ERP'den stoklu ürün bulunamadı.")
-                continue
+        prefetched_by_branch = None
+        if sync_settings.get('erp_bulk_fetch_enabled', True):
+            erp_handler = _create_erp_handler(erp_config)
+            with profiler.span(STAGE_ERP_QUERY, detail="su seviyesi ve değişen ürünler"):
+                extraction_plan = plan_extraction(erp_handler, sync_settings, force_full=force_full)
+            branches_with_store = [b for b in active_branches if b.get("trendyol_store_id")]
+            if extraction_plan.incremental:
+                update_gui_status(f"Artımlı okuma: {len(extraction_plan.product_ids)} değişen ürün, "
+                                  f"{len(branches_with_store)} şube için ERP'den çekiliyor...")
+            else:
+                update_gui_status(f"{len(branches_with_store)} şubenin ürünleri ERP'den tek sorguda çekiliyor...")
+            with profiler.span(STAGE_ERP_QUERY, detail="toplu sorgu"):
+                prefetched_by_branch = erp_handler.get_products_from_erp_for_branches(
+                    branches_with_store, product_ids=extraction_plan.product_ids,
+                    batch_size=sync_settings.get('erp_fetch_batch_size')
+                )
+            _record_erp_connects(profiler, erp_handler)
+            if prefetched_by_branch is None:
+                update_gui_status("UYARI: Toplu ERP sorgusu başarısız oldu, şube bazlı sorguya geçiliyor.")
+                # Şube bazlı sorgu tüm stoklu ürünleri okur; döngü tam okuma sayılır
+                extraction_plan = extraction_plan._replace(incremental=False, product_ids=None)
+        incremental = bool(extraction_plan and extraction_plan.incremental)
 
-            products_to_send = []
-            
-            for product in erp_products:
-                total_products_processed += 1
-                barcode = str(product.get('barcode1') or '').strip()
-                if not barcode: continue
+        max_workers = max(1, min(int(sync_settings.get('sync_max_workers', 1)), len(active_branches)))
+        if max_workers > 1:
+            update_gui_status(f"{len(active_branches)} şube, {max_workers} paralel işçi ile işlenecek.")
 
-                rule = category_rules.get(str(product.get('erp_grup_kod')))
-                if not rule or not rule.get('sync_enabled', True):
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-branch") as executor:
+            futures = {
+                executor.submit(
+                    _sync_branch, branch, erp_config, trendyol_api_client, pricing_rules, use_delta,
+                    prefetched_by_branch.get(branch_product_key(branch), []) if prefetched_by_branch is not None else None,
+                    sync_settings.get('erp_fetch_batch_size'), chunker, incremental, profiler
+                ): branch
+                for branch in active_branches
+            }
+            for future in as_completed(futures):
+                branch_name = futures[future].get("erp_branch_name")
+                try:
+                    branch_result = future.result()
+                except Exception as e:
+                    logger.error(f"'{branch_name}' şubesi işlenirken hata oluştu: {e}", exc_info=True)
+                    update_gui_status(f"[color=ff3333]HATA: '{branch_name}' şubesi işlenemedi: {e}[/color]")
+                    failed_branches.append(branch_name)
                     continue
+                _record_branch_metrics(branch_name, branch_result, METRICS_LANE_FULL)
+                total_products_processed += branch_result["processed"]
+                total_products_sent += branch_result["sent"]
+                total_products_unchanged += branch_result["unchanged"]
+                total_issues_found += branch_result["issues"]
+                total_send_failures += branch_result["send_failures"]
+                batch_ids.extend(branch_result["batch_ids"])
+                unpriced_products_with_stock.extend(branch_result["unpriced"])
+                issue_records.extend(branch_result["issue_records"])
 
-                price = float(product.get('price', 0)) * (1 + float(rule.get('price_adjustment_percentage', 0.0)) / 100)
-                if price <= 0:
-                    unpriced_products_with_stock.append(product)
-                    issue_repo.add_sync_issue(product.get('erp_product_id'), barcode, branch_name, "Fiyatsız Ürün", f"Fiyat sıfır veya negatif: {price:.2f}")
-                    total_issues_found += 1
-                    continue
+        if batch_ids:
+            update_gui_status(f"Tüm paketler gönderildi. {len(batch_ids)} paketin sonucu arka planda kontrol edilecek.")
+        
+        if failed_branches and len(failed_branches) == len(active_branches):
+            raise RuntimeError(f"Hiçbir şube işlenemedi ({', '.join(map(str, failed_branches))}).")
 
-                stock = max(0, int(product.get('erp_stock_quantity', 0)) - int(branch.get('stock_buffer', 0)))
-                
-                products_to_send.append({
-                    "barcode": barcode, "quantity": stock,
-                    "sellingPrice": round(price, 2), "originalPrice": round(price, 2),
-                    "storeId": store_id
-                })
-
-            for i in range(0, len(products_to_send), 50):
-                chunk = products_to_send[i:i + 50]
-                response = trendyol_api_client.update_stock_price(chunk)
-                if response and response.get("batchRequestId"):
-                    batch_id = response["batchRequestId"]
-                    update_gui_status(f"'{branch_name}' için {len(chunk)} ürün gönderildi. Batch ID: {batch_id}")
-                    batch_ids.append((batch_id, branch_name))
-                    total_products_sent += len(chunk)
-                else:
-                    error_msg = response.get("message", "API'den bilinmeyen hata.") if response else "Boş yanıt"
-                    update_gui_status(f"HATA: '{branch_name}' için paket gönderilemedi: {error_msg}")
-                    total_issues_found += len(chunk)
+        # Başarısız paketlerin değişiklikleri, su seviyesi ilerlemediği için sonraki döngüde tekrar okunur
+        if not failed_branches and total_send_failures == 0:
+            commit_extraction(extraction_plan)
 
+        final_status = "Başarılı" if total_issues_found == 0 and not failed_branches else "Uyarılarla Tamamlandı"
+        summary_message = (f"{total_products_processed} ürün işlendi, {total_products_sent} gönderildi, "
+                           f"{total_products_unchanged} değişmediği için atlandı, {total_issues_found} sorun.")
+        if incremental:
+            summary_message += f" Artımlı okuma: {len(extraction_plan.product_ids)} değişen ürün."
         if batch_ids:
-            update_gui_status("Tüm paketler gönderildi. Sonuçlar kontrol ediliyor...")
-            for batch_id, branch_name in batch_ids:
-                total_issues_found += _process_batch_results(trendyol_api_client, batch_id, branch_name)
-        
-        final_status = "Başarılı" if total_issues_found == 0 else "Uyarılarla Tamamlandı"
-        summary_message = f"{total_products_processed} ürün işlendi, {total_products_sent} gönderildi, {total_issues_found} sorun."
+            summary_message += (f" Paket boyutu: son {chunker.size}, en fazla {chunker.peak_size} ürün."
+                                f" {len(batch_ids)} paketin sonucu arka planda takip ediliyor.")
+        api_metrics = _get_api_metrics_delta(trendyol_api_client, metrics_before)
+        if api_metrics["retries"] or api_metrics["throttled_seconds"]:
+            summary_message += (f" Hız sınırı nedeniyle {api_metrics['throttled_seconds']} sn beklendi, "
+                                f"{api_metrics['retries']} istek yeniden denendi.")
+        if failed_branches:
+            summary_message += f" İşlenemeyen şubeler: {', '.join(map(str, failed_branches))}."
 
     except Exception as e:
         final_status, summary_message = "Kritik Hata", f"Döngü durduruldu: {e}"
         update_gui_status(f"[color=ff3333]KRİTİK HATA: {summary_message}[/color]")
         traceback.print_exc()
     finally:
-        duration = time.time() - start_time_ts
-        history_repo.add_sync_history_entry({
-            "start_time": start_time_obj.strftime('%Y-%m-%d %H:%M:%S'), "duration_seconds": round(duration, 2),
-            "sync_type": sync_type, "status": final_status, "products_processed": total_products_processed,
-            "products_sent": total_products_sent, "issues_found": total_issues_found,
-            "summary_message": summary_message, "batch_request_id": batch_ids[0][0] if batch_ids else None
-        })
-        update_gui_status(f"Döngü tamamlandı. Durum: {final_status}")
-        Clock.schedule_once(lambda dt: _hide_loading_popup(), 0.5)
-        if on_finish_callback: Clock.schedule_once(lambda dt: on_finish_callback())
+        totals = {"processed": total_products_processed, "sent": total_products_sent, "issues": total_issues_found}
+        cycle_result = _finish_cycle(sync_type, start_time_obj, start_time_ts, final_status, summary_message,
+                                     totals, batch_ids, issue_records, profiler)
+        _run_cycle_hook(cycle_end_callback)
+        _run_cycle_hook(on_finish_callback)
+
+    return cycle_result
+
+def run_stock_sync_cycle(sync_type='stock', on_finish_callback=None):
+    """
+    Hızlı stok kulvarı: ERP'den yalnızca aktif lokasyonların stok miktarlarını okur ve stoğu son gönderimden
+    farklı olan ürünleri, son gönderilen fiyatlarla Trendyol'a gönderir. Sık çalıştığı için yükleniyor
+    penceresi ('cycle_start_callback') açılmaz; geçmiş kaydı tam senkronizasyonla aynı tabloya yazılır.
+    Hiçbir şey göndermeyen ve hatasız biten döngüler geçmişe yazılmaz. 'sync_type' 'stock' ile bitmelidir;
+    ana panel ve geçmiş listesi stok kulvarının kayıtlarını bununla ayırır.
+    """
+    start_time_obj, start_time_ts = datetime.datetime.now(), time.time()
+    profiler = CycleProfiler()
+    update_gui_status(f"'{sync_type.capitalize()}' stok senkronizasyonu başlatılıyor...")
+
+    totals = {"processed": 0, "sent": 0, "unchanged": 0, "issues": 0}
+    final_status, summary_message = "Başarısız", "Bilinmeyen bir hata oluştu."
+    batch_ids = []
+    failed_branches = []
+
+    try:
+        settings_started = time.perf_counter()
+        erp_config = settings_repo.get_erp_config()
+        trendyol_cfg = _get_trendyol_config_or_raise()
+        sync_settings = settings_repo.get_sync_settings()
+        trendyol_api_client = get_trendyol_client(trendyol_cfg, pool_size=sync_settings.get('sync_max_workers'))
+        metrics_before = trendyol_api_client.get_metrics()
+        chunker = _create_chunker(sync_settings)
+        # Yalnızca kategori filtresi kullanılır; fiyatlar son gönderimden alınır
+        pricing_rules = compile_pricing_rules(category_repo.get_all_category_rules())
+
+        active_branches = [b for b in branch_repo.get_all_branch_mappings()
+                           if b.get('is_active', True) and b.get("trendyol_store_id")]
+        profiler.add_span(STAGE_SETTINGS, settings_started, time.perf_counter() - settings_started)
+        if not active_branches: raise ValueError("Senkronize edilecek aktif şube bulunamadı.")
+
+        erp_handler = _create_erp_handler(erp_config)
+        with profiler.span(STAGE_ERP_QUERY, detail="stok miktarları"):
+            quantities_by_location = erp_handler.get_stock_quantities_for_branches(active_branches)
+        _record_erp_connects(profiler, erp_handler)
+        # Okuma başarısızken devam edilirse tüm ürünler stoksuz sanılıp sıfırlanır
+        if quantities_by_location is None:
+            raise RuntimeError("ERP stok miktarları okunamadı.")
+
+        max_workers = max(1, min(int(sync_settings.get('sync_max_workers', 1)), len(active_branches)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-stock") as executor:
+            futures = {
+                executor.submit(
+                    _sync_branch_stock, branch, trendyol_api_client,
+                    quantities_by_location.get(str(branch.get("erp_location_id")), {}), pricing_rules, chunker, profiler
+                ): branch
+                for branch in active_branches
+            }
+            for future in as_completed(futures):
+                branch_name = futures[future].get("erp_branch_name")
+                try:
+                    branch_result = future.result()
+                except Exception as e:
+                    logger.error(f"'{branch_name}' şubesinin stokları işlenirken hata oluştu: {e}", exc_info=True)
+                    update_gui_status(f"[color=ff3333]HATA: '{branch_name}' şubesinin stokları işlenemedi: {e}[/color]")
+                    failed_branches.append(branch_name)
+                    continue
+                _record_branch_metrics(branch_name, branch_result, METRICS_LANE_STOCK)
+                for key in totals:
+                    totals[key] += branch_result[key]
+                batch_ids.extend(branch_result["batch_ids"])
+
+        if failed_branches and len(failed_branches) == len(active_branches):
+            raise RuntimeError(f"Hiçbir şube işlenemedi ({', '.join(map(str, failed_branches))}).")
+
+        final_status = "Başarılı" if totals["issues"] == 0 and not failed_branches else "Uyarılarla Tamamlandı"
+        summary_message = (f"Stok: {totals['processed']} ürün kontrol edildi, {totals['sent']} stok güncellemesi "
+                           f"gönderildi, {totals['unchanged']} değişmedi, {totals['issues']} sorun.")
+        if batch_ids:
+            summary_message += f" {len(batch_ids)} paketin sonucu arka planda takip ediliyor."
+        api_metrics = _get_api_metrics_delta(trendyol_api_client, metrics_before)
+        if api_metrics["retries"] or api_metrics["throttled_seconds"]:
+            summary_message += (f" Hız sınırı nedeniyle {api_metrics['throttled_seconds']} sn beklendi, "
+                                f"{api_metrics['retries']} istek yeniden denendi.")
+        if failed_branches:
+            summary_message += f" İşlenemeyen şubeler: {', '.join(map(str, failed_branches))}."
+
+    except Exception as e:
+        final_status, summary_message = "Kritik Hata", f"Stok döngüsü durduruldu: {e}"
+        update_gui_status(f"[color=ff3333]KRİTİK HATA: {summary_message}[/color]")
+        logger.error(summary_message, exc_info=True)
+    finally:
+        idle = final_status == "Başarılı" and totals["sent"] == 0 and not batch_ids
+        cycle_result = _finish_cycle(sync_type, start_time_obj, start_time_ts, final_status, summary_message,
+                                     totals, batch_ids, profiler=profiler, lane=METRICS_LANE_STOCK,
+                                     record_history=not idle)
+        _run_cycle_hook(on_finish_callback)
+
+    return cycle_result
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 06:00
+# Yapılan Değişiklikler:
+# 1. Jeton kovaları istemci nesnesine değil, modül düzeyindeki ortak kayda bağlandı ('get_shared_bucket').
+#    Senkronizasyon, paket kontrol servisi ve arayüzün oluşturduğu ayrı istemciler aynı satıcı ve uç nokta
+#    için aynı kovayı paylaşır; toplam istek hızı ayarlanan sınırı aşmaz.
+
+import datetime
+import email.utils
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Saniyede 'rate' kadar jeton üreten ve en fazla 'capacity' jeton biriktiren klasik jeton kovası.
+    Her istek bir jeton harcar; jeton yoksa çağıran iş parçacığı jeton oluşana kadar bekletilir.
+    Sunucu 429 döndürdüğünde 'pause' ile kova belirtilen süre boyunca tamamen durdurulur.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = max(0.01, float(rate))
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def acquire(self, tokens=1):
+        """Bir jeton alınana kadar bekler ve beklenen toplam süreyi (saniye) döndürür."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def set_limits(self, rate, capacity):
+        """Hız ve kapasiteyi günceller (ayarlar değiştiğinde). Biriken jetonlar yeni kapasiteyi aşamaz."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(0.01, float(rate))
+            self.capacity = max(1.0, float(capacity))
+            self._tokens = min(self._tokens, self.capacity)
+
+    def pause(self, seconds):
+        """Kovayı belirtilen süre boyunca durdurur; bu sürede hiçbir istek gönderilmez."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + max(0.0, seconds))
+            self._tokens = 0.0
+
+
+_shared_buckets = {}
+_shared_buckets_lock = threading.Lock()
+
+
+def get_shared_bucket(scope, key, rate, capacity):
+    """
+    'scope' (ör. satıcı ID'si ve API adresi) ve uç nokta anahtarı için uygulama genelinde tek olan kovayı
+    döndürür; yoksa oluşturur. Sınırlar değişmişse mevcut kova yeni sınırlarla güncellenir.
+    """
+    with _shared_buckets_lock:
+        bucket = _shared_buckets.get((scope, key))
+        if bucket is None:
+            bucket = _shared_buckets[(scope, key)] = TokenBucket(rate, capacity)
+        elif bucket.rate != max(0.01, float(rate)) or bucket.capacity != max(1.0, float(capacity)):
+            bucket.set_limits(rate, capacity)
+        return bucket
+
+
+def clear_shared_buckets():
+    """Ortak kovaları siler (testler ve ayar sıfırlama için)."""
+    with _shared_buckets_lock:
+        _shared_buckets.clear()
+
+
+def parse_retry_after(value):
+    """
+    'Retry-After' başlığını saniyeye çevirir. Başlık saniye ("30") veya HTTP tarihi
+    ("Wed, 21 Oct 2026 07:28:00 GMT") biçiminde olabilir. Çözümlenemezse None döner.
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
@@ -1,27 +1,53 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 05:50
+# Güncelleme Tarihi: 19.10.2026 06:00
 # Yapılan Değişiklikler:
-# 1. 'AttributeError' hatasını çözmek için eksik olan 'get_trendyol_categories' ve 'get_trendyol_brands' fonksiyonları eklendi.
-# 2. Bu dosya, dökümanlara uygun olarak Trendyol GO API'si ile tam uyumlu hale getirilmiştir.
+# 1. Uç nokta hız sınırlayıcıları her istemcide yeniden oluşturulmuyor; satıcı ID'si ve API adresine göre
+#    ortak kovalardan alınıyor. Böylece aynı anda çalışan istemcilerin toplam hızı TRENDYOL_RATE_LIMITS'i aşmaz.
 
 import json
 import logging
+import random
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from .. import config
+from ..core.metrics import TRENDYOL_REQUEST_SECONDS
+from .rate_limiter import get_shared_bucket, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_SIZE = 4
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# İdempotent istekler bu durum kodlarında yeniden denenir
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# İdempotent olmayan (POST) istekler yalnızca sunucunun isteği hiç işlemediği bu durumlarda tekrarlanır
+NON_IDEMPOTENT_RETRYABLE_STATUS_CODES = {429, 503}
+# Metrik etiketi olarak kullanılan uç nokta adları; istek yolunda ilk eşleşen kullanılır, yoksa 'other'
+METRIC_ENDPOINT_NAMES = ("price-and-inventory", "batch-requests", "warehouses", "categories", "brands")
+
+
+def _metric_endpoint_name(endpoint):
+    return next((name for name in METRIC_ENDPOINT_NAMES if name in endpoint), "other")
+
 
 class TrendyolGoAPI:
     """
     Trendyol GO (Hızlı Market) API'si ile iletişim kurmak için yazılmış sınıftır.
     """
     def __init__(self, supplier_id, api_key, api_secret, base_url,
-                 test_mode_enabled=False):
+                 test_mode_enabled=False, pool_size=DEFAULT_POOL_SIZE, rate_limits=None, retry_settings=None,
+                 base_url_override=None):
         self.supplier_id = supplier_id
         self.api_key = api_key
         self.api_secret = api_secret
         
-        self.base_url = "https://stageapi.tgoapis.com" if test_mode_enabled else "https://api.tgoapis.com"
+        if base_url_override:
+            self.base_url = base_url_override.rstrip("/")
+        else:
+            self.base_url = "https://stageapi.tgoapis.com" if test_mode_enabled else "https://api.tgoapis.com"
         self.test_mode_enabled = test_mode_enabled
 
         self.headers = {
@@ -29,30 +55,152 @@ class TrendyolGoAPI:
             "User-Agent": "SonTechBot/1.8.0", "api-key": self.api_key,
             "x-api-secret-key": self.api_secret
         }
+
+        # Tüm istekler (fiyat/stok POST'ları, batch sorguları, sayfalı listeler) aynı oturum üzerinden,
+        # açık tutulan (keep-alive) bağlantılar yeniden kullanılarak yapılır.
+        self.pool_size = max(1, int(pool_size or DEFAULT_POOL_SIZE))
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size, max_retries=0, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Uç nokta bazlı hız sınırlayıcılar ve yeniden deneme ayarları. Kovalar aynı satıcı ve API adresini
+        # kullanan tüm istemcilerce (senkronizasyon, paket kontrolü, arayüz) paylaşılır.
+        self.rate_limits = rate_limits or config.TRENDYOL_RATE_LIMITS
+        bucket_scope = (str(self.supplier_id), self.base_url)
+        self._buckets = {
+            key: get_shared_bucket(bucket_scope, key, limit.get("rate", 5), limit.get("burst", 10))
+            for key, limit in self.rate_limits.items()
+        }
+        retry_cfg = {**config.TRENDYOL_RETRY_SETTINGS, **(retry_settings or {})}
+        self.max_retries = int(retry_cfg.get("max_retries", 4))
+        self.backoff_base = float(retry_cfg.get("backoff_base_seconds", 1.0))
+        self.backoff_max = float(retry_cfg.get("backoff_max_seconds", 30.0))
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "requests": 0, "retries": 0, "throttled_responses": 0,
+            "rate_limit_wait_seconds": 0.0, "retry_wait_seconds": 0.0
+        }
+        self._local = threading.local()
         logger.info(
             f"TrendyolGoAPI başlatıldı. Supplier ID: {self.supplier_id}, "
-            f"Base URL: {self.base_url}"
+            f"Base URL: {self.base_url}, Bağlantı Havuzu: {self.pool_size}"
         )
 
+    def close(self):
+        """Oturumu ve havuzdaki açık bağlantıları kapatır."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _get_bucket(self, endpoint):
+        """İstek yoluna uyan hız sınırlayıcıyı döndürür; eşleşme yoksa 'default' kovası kullanılır."""
+        for key, bucket in self._buckets.items():
+            if key != "default" and key in endpoint:
+                return bucket
+        return self._buckets.get("default")
+
+    def _add_metric(self, key, value):
+        with self._metrics_lock:
+            self._metrics[key] += value
+
+    def get_metrics(self):
+        """İstemcinin oluşturulduğu andan itibaren biriken istek, yeniden deneme ve bekleme istatistiklerini döndürür."""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics["throttled_seconds"] = round(metrics["rate_limit_wait_seconds"] + metrics["retry_wait_seconds"], 2)
+        return metrics
+
+    def get_last_request_stats(self):
+        """Bu iş parçacığında yapılan son isteğin bekleme süresi ve yeniden deneme sayısını döndürür."""
+        return dict(getattr(self._local, "last_request_stats", {"wait_seconds": 0.0, "retries": 0}))
+
+    def _backoff_delay(self, attempt):
+        """Üstel bekleme süresini 'full jitter' yöntemiyle (0 ile üst sınır arasında rastgele) hesaplar."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _should_retry(self, method, status_code):
+        if method.upper() in IDEMPOTENT_METHODS:
+            return status_code in RETRYABLE_STATUS_CODES
+        return status_code in NON_IDEMPOTENT_RETRYABLE_STATUS_CODES
+
+    def _wait(self, seconds, metric_key):
+        if seconds > 0:
+            time.sleep(seconds)
+            self._add_metric(metric_key, seconds)
+        return seconds
+
     def _make_request(self, method, endpoint, params=None, data=None):
-        """Tüm Trendyol API isteklerini yapan ve ağ hatalarını yöneten merkezi fonksiyondur."""
+        """
+        Tüm Trendyol API isteklerini yapan ve ağ hatalarını yöneten merkezi fonksiyondur.
+        İstekler uç noktanın jeton kovasından geçer; 429 ve geçici hatalarda kurallara göre yeniden denenir.
+        """
         url = f"{self.base_url}{endpoint}"
         logger.debug(f"API Request: {method.upper()} {url}")
         if data: logger.debug(f"Payload: {json.dumps(data, indent=2)}")
-        try:
-            response = requests.request(method, url, params=params, json=data, headers=self.headers, timeout=45)
+        bucket = self._get_bucket(endpoint)
+        metric_endpoint = _metric_endpoint_name(endpoint)
+        attempt, total_wait = 0, 0.0
+
+        while True:
+            if bucket:
+                waited = bucket.acquire()
+                if waited:
+                    self._add_metric("rate_limit_wait_seconds", waited)
+                    total_wait += waited
+            self._add_metric("requests", 1)
+            self._local.last_request_stats = {"wait_seconds": total_wait, "retries": attempt}
+            request_started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=params, json=data, timeout=45)
+            except requests.exceptions.RequestException as e:
+                TRENDYOL_REQUEST_SECONDS.observe(time.perf_counter() - request_started,
+                                                 endpoint=metric_endpoint, status_code="error")
+                if method.upper() in IDEMPOTENT_METHODS and attempt < self.max_retries:
+                    attempt += 1
+                    self._add_metric("retries", 1)
+                    delay = self._backoff_delay(attempt)
+                    logger.warning(f"API bağlantı hatası, {delay:.1f} sn sonra yeniden denenecek ({attempt}/{self.max_retries}): {e}")
+                    total_wait += self._wait(delay, "retry_wait_seconds")
+                    continue
+                user_friendly_message = "Ağ Hatası: Sunucuya ulaşılamadı. İnternet/DNS ayarlarınızı veya Güvenlik Duvarı'nı kontrol edin."
+                logger.error(f"API bağlantı hatası: {e}", exc_info=True)
+                return {"status": "error", "message": user_friendly_message}
+
+            TRENDYOL_REQUEST_SECONDS.observe(time.perf_counter() - request_started,
+                                             endpoint=metric_endpoint, status_code=response.status_code)
             logger.debug(f"Response Status: {response.status_code}")
+            if self._should_retry(method, response.status_code) and attempt < self.max_retries:
+                attempt += 1
+                self._add_metric("retries", 1)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+                delay = min(delay, self.backoff_max * 4)
+                if response.status_code == 429:
+                    self._add_metric("throttled_responses", 1)
+                    # Aynı uç noktaya istek atan diğer iş parçacıkları da bu süre boyunca bekletilir
+                    if bucket:
+                        bucket.pause(delay)
+                logger.warning(f"HTTP {response.status_code} alındı, {delay:.1f} sn sonra yeniden denenecek "
+                               f"({attempt}/{self.max_retries}): {method.upper()} {endpoint}")
+                total_wait += self._wait(delay, "retry_wait_seconds")
+                continue
+
+            self._local.last_request_stats = {"wait_seconds": total_wait, "retries": attempt}
             try:
                 json_response = response.json()
                 if not response.ok:
-                    return {"status": "error", "message": f"HTTP Hatası: {response.status_code}", "details": json_response}
+                    return {"status": "error", "message": f"HTTP Hatası: {response.status_code}",
+                            "status_code": response.status_code, "details": json_response}
                 return json_response
             except json.JSONDecodeError:
-                return {"status": "error", "message": f"JSON olmayan yanıt (HTTP {response.status_code})", "details": response.text}
-        except requests.exceptions.RequestException as e:
-            user_friendly_message = "Ağ Hatası: Sunucuya ulaşılamadı. İnternet/DNS ayarlarınızı veya Güvenlik Duvarı'nı kontrol edin."
-            logger.error(f"API bağlantı hatası: {e}", exc_info=True)
-            return {"status": "error", "message": user_friendly_message}
+                return {"status": "error", "message": f"JSON olmayan yanıt (HTTP {response.status_code})",
+                        "status_code": response.status_code, "details": response.text}
 
     def test_connection(self):
         """API bağlantısını test etmek için dökümandaki yapıya uygun bir endpoint kullanır."""
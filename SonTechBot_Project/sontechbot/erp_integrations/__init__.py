@@ -1,3 +1,3 @@
-from .erp12_handler import ERP12Handler
+from .erp12_handler import ERP12Handler, ERPStockRow, branch_product_key
 
-__all__ = ['ERP12Handler']
\ No newline at end of file
+__all__ = ['ERP12Handler', 'ERPStockRow', 'branch_product_key']
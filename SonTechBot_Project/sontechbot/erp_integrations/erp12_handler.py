@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 05:30
+# Güncelleme Tarihi: 19.10.2026 07:00
 # Yapılan Değişiklikler:
-# 1. Ayarlar ekranındaki marka eşleştirme özelliği için, ERP'den tüm marka adlarını çeken 'get_all_erp_brands' fonksiyonu eklendi.
-# 2. Kodun okunabilirliği ve hata yönetimi iyileştirildi.
+# 1. Stok kulvarının miktar sorgusu her barkodun grup kodunu da döndürüyor ('ERPStockRow'); böylece
+#    senkronizasyonu sonradan kapatılan kategorilerin ürünleri stok kulvarında güncellenmez.
 
 import datetime
 import logging
+import re
+import time
 import traceback
+from collections import namedtuple
 
 import pyodbc
 
@@ -14,6 +17,86 @@ from ..repositories import settings_repo
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_FETCH_BATCH_SIZE = 5000
+
+INCREMENTAL_MODE_OFF = "off"
+INCREMENTAL_MODE_CHANGE_TRACKING = "change_tracking"
+INCREMENTAL_MODE_ROWVERSION = "rowversion"
+INCREMENTAL_MODE_MODIFIED_SINCE = "modified_since"
+INCREMENTAL_MODES = (INCREMENTAL_MODE_OFF, INCREMENTAL_MODE_CHANGE_TRACKING,
+                     INCREMENTAL_MODE_ROWVERSION, INCREMENTAL_MODE_MODIFIED_SINCE)
+# Ayarlardan gelen sütun adları sorguya doğrudan yazıldığı için yalnızca düz tanımlayıcılara izin verilir
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Ürün sorgularının döndürdüğü satır. Alan sırası, sorgulardaki sütun sırasıyla aynıdır.
+ERPProductRow = namedtuple('ERPProductRow', [
+    'erp_product_id', 'stok_kod', 'name', 'barcode1', 'unit', 'vat_rate',
+    'erp_grup_kod', 'erp_marka_adi', 'web_publish_flag', 'erp_stock_quantity', 'price'
+])
+
+# Stok kulvarının miktar sorgusunun barkod başına döndürdüğü kayıt.
+ERPStockRow = namedtuple('ERPStockRow', ['quantity', 'erp_grup_kod'])
+
+# Şube bazlı ve toplu ürün sorgularının ortak katalog sütunları.
+_CATALOG_COLUMNS = """
+            s.ID AS erp_product_id, s.KOD AS stok_kod, s.AD AS name,
+            bk.barcode1, brm.AD AS unit, CAST(ISNULL(v.KDV_PAREKENDE, 0) AS INT) AS vat_rate,
+            sg.AD AS erp_grup_kod,
+            smk.AD AS erp_marka_adi,
+            s.WEBDEYAYINLANIRMI AS web_publish_flag"""
+
+# Varsayılan birimin barkodu, satır başına alt sorgu yerine tek seferde gruplanarak hesaplanır.
+_BARCODE_SUBQUERY = """(
+            SELECT ssb_b1.STOK, MIN(sb.BARKOD) AS barcode1
+            FROM dbo.STOK_BARKOD sb
+            INNER JOIN dbo.STOK_STOK_BIRIM ssb_b1 ON sb.STOK_STOK_BIRIM = ssb_b1.ID AND ssb_b1.VARSAYILAN = 1
+            GROUP BY ssb_b1.STOK
+        )"""
+
+_CATALOG_JOINS = f"""
+        LEFT JOIN dbo.STOK_STOK_BIRIM ssb ON s.ID = ssb.STOK AND ssb.VARSAYILAN = 1
+        LEFT JOIN dbo.STOK_BIRIM brm ON ssb.STOK_BIRIM = brm.ID
+        LEFT JOIN dbo.STOK_VERGI v ON s.STOK_VERGI = v.ID
+        LEFT JOIN dbo.STOGRUPSEFC sg ON s.STOK_GRUP = sg.ID
+        LEFT JOIN dbo.STOK_MARKA smk ON s.STOK_MARKA = smk.ID
+        LEFT JOIN {_BARCODE_SUBQUERY} bk ON bk.STOK = s.ID"""
+
+# Parametreler: (lokasyon ID, fiyat listesi ID)
+PRODUCTS_FOR_BRANCH_QUERY = f"""
+        WITH lokasyon_stok AS (
+            SELECT smiktar.STOK, MAX(smiktar.MIKTAR) AS MIKTAR
+            FROM dbo.STOK_MIKTAR smiktar
+            WHERE smiktar.LOKASYON = ?
+            GROUP BY smiktar.STOK
+        ),
+        liste_fiyat AS (
+            SELECT ssb_fiyat.STOK, MAX(fiyat.FIYAT) AS FIYAT
+            FROM dbo.STOK_STOK_BIRIM_FIYAT fiyat
+            INNER JOIN dbo.STOK_STOK_BIRIM ssb_fiyat ON fiyat.STOK_STOK_BIRIM = ssb_fiyat.ID AND ssb_fiyat.VARSAYILAN = 1
+            WHERE fiyat.STOK_FIYAT_AD = ?
+            GROUP BY ssb_fiyat.STOK
+        )
+        SELECT{_CATALOG_COLUMNS},
+            ls.MIKTAR AS erp_stock_quantity,
+            ISNULL(lf.FIYAT, 0) AS price
+        FROM dbo.STOK s
+        INNER JOIN lokasyon_stok ls ON ls.STOK = s.ID AND ls.MIKTAR > 0{_CATALOG_JOINS}
+        LEFT JOIN liste_fiyat lf ON lf.STOK = s.ID
+        WHERE s.WEBDEYAYINLANIRMI = 1
+        ORDER BY s.ID;
+        """
+
+
+def branch_product_key(branch_map):
+    """
+    Toplu ürün sorgusunun sonucunda şubenin ürün listesinin anahtarı: (lokasyon ID, fiyat listesi ID).
+    Stok lokasyona, fiyat fiyat listesine bağlı olduğu için ikisi birlikte kullanılır. ID'ler geçersizse None döner.
+    """
+    try:
+        return int(branch_map.get("erp_location_id")), int(branch_map.get("erp_price_list_id"))
+    except (ValueError, TypeError):
+        return None
+
 
 class ERP12Handler:
     def _find_best_sql_driver(self):
@@ -37,6 +120,8 @@ class ERP12Handler:
     def __init__(self, erp_config_override=None):
         self.conn = None
         self.cursor = None
+        # (time.perf_counter() başlangıcı, süre sn) çiftleri
+        self.connect_timings = []
         self.erp_config = erp_config_override or settings_repo.get_erp_config()
         logger.info(f"ERP Config yüklendi: Server={self.erp_config.get('server')}, DB={self.erp_config.get('database')}")
         try:
@@ -109,6 +194,7 @@ class ERP12Handler:
             logger.error("ERP bağlantı ayarlarında eksik bilgi var (Server, Database).")
             return False
 
+        started = time.perf_counter()
         try:
             self.conn = pyodbc.connect(self.db_connection_string, timeout=10)
             self.cursor = self.conn.cursor()
@@ -123,6 +209,8 @@ class ERP12Handler:
             self.conn = None
             self.cursor = None
             return False
+        finally:
+            self.connect_timings.append((started, time.perf_counter() - started))
 
     def _close_erp_db(self):
         if self.cursor:
@@ -134,68 +222,351 @@ class ERP12Handler:
             except Exception: pass
             self.conn = None
 
-    def get_products_from_erp_for_branch(self, branch_map):
-        if not self._connect_erp_db():
-            logger.error("ERP bağlantısı kurulamadığı için ürün çekilemedi.")
-            return []
-
+    def iter_product_batches_for_branch(self, branch_map, batch_size=None):
+        """
+        Şubenin stoklu ürünlerini 'fetchmany' ile en fazla 'batch_size' satırlık parçalar halinde üretir.
+        Her parça 'ERPProductRow' kayıtlarından oluşan bir listedir. Bağlantı, generator tüketilene
+        (veya kapatılana) kadar açık kalır.
+        Bağlantı kurulamazsa veya şube ID'leri geçersizse hiç parça üretmez. Okuma sırasında oluşan
+        SQL hataları ise loglanıp yeniden fırlatılır; böylece yarım kalan bir sonuç tam sanılmaz.
+        """
         location_id_str = branch_map.get("erp_location_id")
         price_list_id_str = branch_map.get("erp_price_list_id")
 
         if not location_id_str or not price_list_id_str:
             logger.warning("Şube lokasyon veya fiyat listesi ID'si eksik.")
-            self._close_erp_db()
-            return []
+            return
 
         try:
             param_location_id = int(location_id_str)
             param_price_list_id = int(price_list_id_str)
         except (ValueError, TypeError) as ve:
             logger.error(f"ID'ler ({location_id_str}, {price_list_id_str}) tamsayıya çevrilemedi: {ve}")
+            return
+
+        if not self._connect_erp_db():
+            logger.error("ERP bağlantısı kurulamadığı için ürün çekilemedi.")
+            return
+
+        batch_size = int(batch_size or DEFAULT_FETCH_BATCH_SIZE)
+        logger.info(f"Lokasyon ID: {location_id_str}, Fiyat Liste ID: {price_list_id_str} için STOKLU ürünler "
+                    f"{batch_size} satırlık parçalar halinde çekiliyor...")
+
+        total_rows = 0
+        try:
+            self.cursor.arraysize = batch_size
+            self.cursor.execute(PRODUCTS_FOR_BRANCH_QUERY, param_location_id, param_price_list_id)
+            while True:
+                rows = self.cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                total_rows += len(rows)
+                yield [ERPProductRow._make(r) for r in rows]
+            logger.info(f"{total_rows} adet STOKLU ürün çekildi.")
+        except pyodbc.Error as ex:
+            branch_name = branch_map.get('erp_branch_name')
+            logger.error(f"ERP'den '{branch_name}' için veri çekerken SQL HATA: {ex}", exc_info=True)
+            raise
+        finally:
             self._close_erp_db()
+
+    def get_products_from_erp_for_branch(self, branch_map):
+        """Şubenin tüm stoklu ürünlerini 'ERPProductRow' listesi olarak döndürür. Hata durumunda boş liste döner."""
+        try:
+            return [row for batch in self.iter_product_batches_for_branch(branch_map) for row in batch]
+        except pyodbc.Error:
             return []
 
-        logger.info(f"Lokasyon ID: {location_id_str}, Fiyat Liste ID: {price_list_id_str} için STOKLU ürünler çekiliyor...")
+    def get_products_from_erp_for_branches(self, branch_maps, product_ids=None, batch_size=None):
+        """
+        Verilen tüm şubeler için stoklu ürünleri tek bir veritabanı turunda çeker.
+        Sorgu üç sonuç kümesi döndürür: ürün kataloğu (bir kez), fiyat listesi bazlı fiyatlar ve
+        lokasyon bazlı stoklar. Sonuç kümeleri 'fetchmany' ile 'batch_size' satırlık parçalarla okunur; ancak
+        tüm şubelerin ürün listeleri döngü boyunca bellekte kalır. Bellek kullanımının şube başına bir parçayla
+        sınırlı kalması gerekiyorsa toplu okuma kapatılıp ('erp_bulk_fetch_enabled') şube bazlı
+        'iter_product_batches_for_branch' kullanılmalıdır. Sonuç, 'branch_product_key(şube)' -> 'ERPProductRow' listesi sözlüğüdür;
+        aynı lokasyonu farklı fiyat listeleriyle kullanan şubelerin her birinin kendi listesi olur.
+        'product_ids' verilirse (artımlı okuma) yalnızca bu ürünler okunur ve stoğu 0 olanlar da döndürülür.
+        Bağlantı veya SQL hatasında None döner; çağıran taraf şube bazlı sorguya geri dönebilir.
+        """
+        branch_keys = set()
+        for branch_map in branch_maps:
+            branch_key = branch_product_key(branch_map)
+            if branch_key is None:
+                logger.warning(f"'{branch_map.get('erp_branch_name')}' şubesinin lokasyon/fiyat listesi ID'si geçersiz, toplu sorgudan çıkarıldı.")
+            else:
+                branch_keys.add(branch_key)
+
+        if not branch_keys:
+            return {}
+        if product_ids is not None and not product_ids:
+            return {branch_key: [] for branch_key in branch_keys}
+        if not self._connect_erp_db():
+            logger.error("ERP bağlantısı kurulamadığı için toplu ürün sorgusu yapılamadı.")
+            return None
 
-        sql_query = """
-        SELECT
-            s.ID AS erp_product_id, s.KOD AS stok_kod, s.AD AS name,
-            (SELECT MIN(sb.BARKOD) FROM dbo.STOK_BARKOD sb
-             INNER JOIN dbo.STOK_STOK_BIRIM ssb_b1 ON sb.STOK_STOK_BIRIM = ssb_b1.ID
-             WHERE ssb_b1.STOK = s.ID AND ssb_b1.VARSAYILAN = 1) AS barcode1,
-            brm.AD AS unit, CAST(ISNULL(v.KDV_PAREKENDE, 0) AS INT) AS vat_rate,
-            sg.AD AS erp_grup_kod,
-            smk.AD AS erp_marka_adi,
-            s.WEBDEYAYINLANIRMI AS web_publish_flag,
-            ISNULL((SELECT TOP 1 smiktar.MIKTAR FROM dbo.STOK_MIKTAR smiktar
-                    WHERE smiktar.STOK = s.ID AND smiktar.LOKASYON = ?), 0) AS erp_stock_quantity,
-            ISNULL((SELECT TOP 1 fiyat.FIYAT FROM dbo.STOK_STOK_BIRIM_FIYAT fiyat
-                    INNER JOIN dbo.STOK_STOK_BIRIM ssb_fiyat ON fiyat.STOK_STOK_BIRIM = ssb_fiyat.ID
-                    WHERE ssb_fiyat.STOK = s.ID AND ssb_fiyat.VARSAYILAN = 1 AND fiyat.STOK_FIYAT_AD = ?), 0) AS price
+        location_ids = sorted({location_id for location_id, _ in branch_keys})
+        price_list_ids = sorted({price_list_id for _, price_list_id in branch_keys})
+        location_placeholders = ", ".join("?" * len(location_ids))
+        price_list_placeholders = ", ".join("?" * len(price_list_ids))
+
+        if product_ids is None:
+            logger.info(f"{len(location_ids)} lokasyon ve {len(price_list_ids)} fiyat listesi için STOKLU ürünler tek sorguda çekiliyor...")
+            changed_join, stock_filter = "", "HAVING MAX(smiktar.MIKTAR) > 0"
+        else:
+            logger.info(f"{len(location_ids)} lokasyon ve {len(price_list_ids)} fiyat listesi için "
+                        f"{len(product_ids)} değişen ürün tek sorguda çekiliyor...")
+            # Stoğu sıfıra düşen ürünlerin de gönderilebilmesi için miktar filtresi uygulanmaz
+            changed_join, stock_filter = "INNER JOIN #degisen_urunler du ON du.STOK = smiktar.STOK", ""
+
+        sql_query = f"""
+        SET NOCOUNT ON;
+        IF OBJECT_ID('tempdb..#stoklu_urunler') IS NOT NULL DROP TABLE #stoklu_urunler;
+
+        SELECT smiktar.STOK, smiktar.LOKASYON, MAX(smiktar.MIKTAR) AS MIKTAR
+        INTO #stoklu_urunler
+        FROM dbo.STOK_MIKTAR smiktar
+        INNER JOIN dbo.STOK s ON s.ID = smiktar.STOK AND s.WEBDEYAYINLANIRMI = 1
+        {changed_join}
+        WHERE smiktar.LOKASYON IN ({location_placeholders})
+        GROUP BY smiktar.STOK, smiktar.LOKASYON
+        {stock_filter};
+
+        SELECT{_CATALOG_COLUMNS}
         FROM dbo.STOK s
-        LEFT JOIN dbo.STOK_STOK_BIRIM ssb ON s.ID = ssb.STOK AND ssb.VARSAYILAN = 1
-        LEFT JOIN dbo.STOK_BIRIM brm ON ssb.STOK_BIRIM = brm.ID
-        LEFT JOIN dbo.STOK_VERGI v ON s.STOK_VERGI = v.ID
-        LEFT JOIN dbo.STOGRUPSEFC sg ON s.STOK_GRUP = sg.ID
-        LEFT JOIN dbo.STOK_MARKA smk ON s.STOK_MARKA = smk.ID
-        WHERE
-            s.WEBDEYAYINLANIRMI = 1
-            AND ISNULL((SELECT TOP 1 smiktar.MIKTAR FROM dbo.STOK_MIKTAR smiktar WHERE smiktar.STOK = s.ID AND smiktar.LOKASYON = ?), 0) > 0
+        INNER JOIN (SELECT DISTINCT STOK FROM #stoklu_urunler) su ON su.STOK = s.ID{_CATALOG_JOINS}
         ORDER BY s.ID;
+
+        SELECT ssb_fiyat.STOK, fiyat.STOK_FIYAT_AD, MAX(fiyat.FIYAT) AS FIYAT
+        FROM dbo.STOK_STOK_BIRIM_FIYAT fiyat
+        INNER JOIN dbo.STOK_STOK_BIRIM ssb_fiyat ON fiyat.STOK_STOK_BIRIM = ssb_fiyat.ID AND ssb_fiyat.VARSAYILAN = 1
+        INNER JOIN (SELECT DISTINCT STOK FROM #stoklu_urunler) su ON su.STOK = ssb_fiyat.STOK
+        WHERE fiyat.STOK_FIYAT_AD IN ({price_list_placeholders})
+        GROUP BY ssb_fiyat.STOK, fiyat.STOK_FIYAT_AD;
+
+        SELECT STOK, LOKASYON, MIKTAR FROM #stoklu_urunler ORDER BY STOK;
+
+        DROP TABLE #stoklu_urunler;
         """
+        batch_size = int(batch_size or DEFAULT_FETCH_BATCH_SIZE)
         try:
-            self.cursor.execute(sql_query, param_location_id, param_price_list_id, param_location_id)
-            rows = self.cursor.fetchall()
-            if rows:
-                columns = [column[0] for column in self.cursor.description]
-                fetched_data = [dict(zip(columns, r)) for r in rows]
-                logger.info(f"{len(fetched_data)} adet STOKLU ürün çekildi.")
-                return fetched_data
-            return []
+            if product_ids is not None:
+                self._load_temp_product_ids("#degisen_urunler", product_ids)
+            self.cursor.arraysize = batch_size
+            self.cursor.execute(sql_query, *location_ids, *price_list_ids)
+
+            catalog = {row[0]: tuple(row) for row in self._iter_result_set(batch_size)}
+            self.cursor.nextset()
+            prices = {(row[0], row[1]): row[2] for row in self._iter_result_set(batch_size)}
+            self.cursor.nextset()
+
+            # Aynı lokasyondaki her şube, stok satırlarını kendi fiyat listesiyle fiyatlandırır. Stok satırları
+            # parça parça okunup doğrudan şube listelerine dağıtılır; ham sonuç ayrıca bellekte tutulmaz.
+            price_lists_by_location = {}
+            for location_id, price_list_id in branch_keys:
+                price_lists_by_location.setdefault(location_id, []).append(price_list_id)
+            products_by_branch = {branch_key: [] for branch_key in branch_keys}
+            stock_row_count = 0
+            for stock_id, location_id, quantity in self._iter_result_set(batch_size):
+                stock_row_count += 1
+                catalog_row = catalog.get(stock_id)
+                if catalog_row is None:
+                    continue
+                for price_list_id in price_lists_by_location.get(location_id, ()):
+                    price = prices.get((stock_id, price_list_id), 0) or 0
+                    products_by_branch[(location_id, price_list_id)].append(ERPProductRow(*catalog_row, quantity, price))
+
+            logger.info(f"Toplu sorgu: {len(catalog)} farklı ürün, {stock_row_count} lokasyon-stok satırı çekildi.")
+            return products_by_branch
         except pyodbc.Error as ex:
-            branch_name = branch_map.get('erp_branch_name')
-            logger.error(f"ERP'den '{branch_name}' için veri çekerken SQL HATA: {ex}", exc_info=True)
-            return []
+            logger.error(f"ERP'den toplu ürün verisi çekerken SQL HATA: {ex}", exc_info=True)
+            return None
+        finally:
+            self._close_erp_db()
+
+    def _iter_result_set(self, batch_size):
+        """İmlecin o anki sonuç kümesinin satırlarını 'fetchmany' ile en fazla 'batch_size' satırlık parçalarla üretir."""
+        while True:
+            rows = self.cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def _load_temp_product_ids(self, table_name, product_ids):
+        """Ürün ID'lerini, aynı bağlantıdaki sonraki sorgularda birleştirilmek üzere geçici bir tabloya yazar."""
+        self.cursor.execute(f"IF OBJECT_ID('tempdb..{table_name}') IS NOT NULL DROP TABLE {table_name}; "
+                            f"CREATE TABLE {table_name} (STOK INT PRIMARY KEY);")
+        self.cursor.fast_executemany = True
+        self.cursor.executemany(f"INSERT INTO {table_name} (STOK) VALUES (?)", [(int(i),) for i in product_ids])
+        self.cursor.fast_executemany = False
+
+    @staticmethod
+    def _validate_change_columns(mode, stock_column, price_column):
+        if mode == INCREMENTAL_MODE_CHANGE_TRACKING:
+            return True
+        for column in (stock_column, price_column):
+            if not column or not _IDENTIFIER_PATTERN.match(column):
+                logger.error(f"Artımlı okuma için geçersiz sütun adı: '{column}'. Tam okuma yapılacak.")
+                return False
+        return True
+
+    def get_change_watermark(self, mode):
+        """
+        Artımlı okuma için veritabanının o anki su seviyesini metin olarak döndürür. Veri okunmadan ÖNCE
+        alınmalıdır; böylece okuma sırasında değişen satırlar bir sonraki döngüde tekrar ele alınır.
+          - change_tracking: CHANGE_TRACKING_CURRENT_VERSION()
+          - rowversion:      MIN_ACTIVE_ROWVERSION() - 1 (henüz onaylanmamış işlemlerin satırları kaçırılmaz)
+          - modified_since:  Sunucunun o anki zamanı
+        Kip desteklenmiyorsa (ör. Change Tracking kapalı) veya bağlantı/SQL hatasında None döner.
+        """
+        queries = {
+            INCREMENTAL_MODE_CHANGE_TRACKING: "SELECT CHANGE_TRACKING_CURRENT_VERSION()",
+            INCREMENTAL_MODE_ROWVERSION: "SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) - 1",
+            INCREMENTAL_MODE_MODIFIED_SINCE: "SELECT CONVERT(VARCHAR(27), SYSDATETIME(), 121)",
+        }
+        if mode not in queries:
+            return None
+        if not self._connect_erp_db():
+            return None
+        try:
+            row = self.cursor.execute(queries[mode]).fetchone()
+            if not row or row[0] is None:
+                logger.warning(f"ERP veritabanı '{mode}' artımlı okuma kipini desteklemiyor (ör. Change Tracking kapalı).")
+                return None
+            return str(row[0])
+        except pyodbc.Error as ex:
+            logger.error(f"ERP su seviyesi okunamadı ({mode}): {ex}", exc_info=True)
+            return None
+        finally:
+            self._close_erp_db()
+
+    def get_changed_product_ids(self, mode, since, stock_column=None, price_column=None):
+        """
+        'since' su seviyesinden bu yana stok miktarı ('STOK_MIKTAR') veya fiyatı ('STOK_STOK_BIRIM_FIYAT')
+        değişen ürünlerin ('STOK.ID') kümesini döndürür. Silinen satırlar ve katalog değişiklikleri bu
+        yöntemle yakalanmaz; bunlar periyodik tam okumada güncellenir.
+        Su seviyesi artık geçerli değilse (Change Tracking saklama süresi dolmuşsa), sütun adları geçersizse
+        veya bağlantı/SQL hatasında None döner; çağıran taraf tam okumaya geçmelidir.
+        """
+        if not self._validate_change_columns(mode, stock_column, price_column):
+            return None
+
+        if mode == INCREMENTAL_MODE_CHANGE_TRACKING:
+            validity_query = """
+            SELECT CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID('dbo.STOK_MIKTAR')),
+                   CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID('dbo.STOK_STOK_BIRIM_FIYAT'))
+            """
+            sql_query = """
+            SELECT smiktar.STOK
+            FROM CHANGETABLE(CHANGES dbo.STOK_MIKTAR, ?) ct
+            INNER JOIN dbo.STOK_MIKTAR smiktar ON smiktar.ID = ct.ID
+            UNION
+            SELECT ssb.STOK
+            FROM CHANGETABLE(CHANGES dbo.STOK_STOK_BIRIM_FIYAT, ?) ct
+            INNER JOIN dbo.STOK_STOK_BIRIM_FIYAT fiyat ON fiyat.ID = ct.ID
+            INNER JOIN dbo.STOK_STOK_BIRIM ssb ON ssb.ID = fiyat.STOK_STOK_BIRIM
+            """
+            params = (int(since), int(since))
+        elif mode == INCREMENTAL_MODE_ROWVERSION:
+            validity_query = None
+            sql_query = f"""
+            SELECT smiktar.STOK FROM dbo.STOK_MIKTAR smiktar
+            WHERE smiktar.{stock_column} > CAST(CAST(? AS BIGINT) AS BINARY(8))
+            UNION
+            SELECT ssb.STOK FROM dbo.STOK_STOK_BIRIM_FIYAT fiyat
+            INNER JOIN dbo.STOK_STOK_BIRIM ssb ON ssb.ID = fiyat.STOK_STOK_BIRIM
+            WHERE fiyat.{price_column} > CAST(CAST(? AS BIGINT) AS BINARY(8))
+            """
+            params = (int(since), int(since))
+        elif mode == INCREMENTAL_MODE_MODIFIED_SINCE:
+            validity_query = None
+            # Aynı zaman damgalı satırlar kaçırılmasın diye eşitlik de dahil edilir; tekrar okunan ürünler delta
+            # kontrolünde elenir
+            sql_query = f"""
+            SELECT smiktar.STOK FROM dbo.STOK_MIKTAR smiktar
+            WHERE smiktar.{stock_column} >= CONVERT(DATETIME2, ?, 121)
+            UNION
+            SELECT ssb.STOK FROM dbo.STOK_STOK_BIRIM_FIYAT fiyat
+            INNER JOIN dbo.STOK_STOK_BIRIM ssb ON ssb.ID = fiyat.STOK_STOK_BIRIM
+            WHERE fiyat.{price_column} >= CONVERT(DATETIME2, ?, 121)
+            """
+            params = (since, since)
+        else:
+            return None
+
+        if not self._connect_erp_db():
+            return None
+        try:
+            if validity_query:
+                min_valid_versions = self.cursor.execute(validity_query).fetchone()
+                if any(v is None or int(since) < v for v in min_valid_versions):
+                    logger.warning("Change Tracking su seviyesi artık geçerli değil (saklama süresi dolmuş veya takip kapalı).")
+                    return None
+            self.cursor.execute(sql_query, *params)
+            product_ids = set()
+            while True:
+                rows = self.cursor.fetchmany(DEFAULT_FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                product_ids.update(row[0] for row in rows)
+            logger.info(f"Artımlı okuma ({mode}): son su seviyesinden bu yana {len(product_ids)} ürün değişmiş.")
+            return product_ids
+        except (pyodbc.Error, ValueError, TypeError) as ex:
+            logger.error(f"ERP'den değişen ürünler okunamadı ({mode}): {ex}", exc_info=True)
+            return None
+        finally:
+            self._close_erp_db()
+
+    def get_stock_quantities_for_branches(self, branch_maps):
+        """
+        Verilen şubelerin lokasyonlarındaki stoklu ürünlerin miktarlarını tek sorguda çeker. Yalnızca
+        'STOK_MIKTAR', barkod eşlemesi ve kategori filtresi için grup adı okunur; fiyat tablolarına gidilmez.
+        Sonuç, 'erp_location_id' -> {barkod: ERPStockRow} sözlüğüdür. Listede olmayan barkodların stoğu yoktur.
+        Bağlantı veya SQL hatasında None döner.
+        """
+        location_keys = {}
+        for branch_map in branch_maps:
+            try:
+                location_keys[int(branch_map.get("erp_location_id"))] = str(branch_map.get("erp_location_id"))
+            except (ValueError, TypeError):
+                logger.warning(f"'{branch_map.get('erp_branch_name')}' şubesinin lokasyon ID'si geçersiz, stok sorgusundan çıkarıldı.")
+
+        if not location_keys:
+            return {}
+        if not self._connect_erp_db():
+            logger.error("ERP bağlantısı kurulamadığı için stok miktarları çekilemedi.")
+            return None
+
+        location_ids = sorted(location_keys)
+        location_placeholders = ", ".join("?" * len(location_ids))
+        sql_query = f"""
+        SELECT smiktar.LOKASYON, bk.barcode1, MAX(smiktar.MIKTAR) AS MIKTAR, sg.AD AS erp_grup_kod
+        FROM dbo.STOK_MIKTAR smiktar
+        INNER JOIN dbo.STOK s ON s.ID = smiktar.STOK AND s.WEBDEYAYINLANIRMI = 1
+        INNER JOIN {_BARCODE_SUBQUERY} bk ON bk.STOK = smiktar.STOK
+        LEFT JOIN dbo.STOGRUPSEFC sg ON s.STOK_GRUP = sg.ID
+        WHERE smiktar.LOKASYON IN ({location_placeholders})
+        GROUP BY smiktar.LOKASYON, smiktar.STOK, bk.barcode1, sg.AD
+        HAVING MAX(smiktar.MIKTAR) > 0;
+        """
+        try:
+            self.cursor.execute(sql_query, *location_ids)
+            quantities_by_location = {location_key: {} for location_key in location_keys.values()}
+            row_count = 0
+            while True:
+                rows = self.cursor.fetchmany(DEFAULT_FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                row_count += len(rows)
+                for location_id, barcode, quantity, group_code in rows:
+                    barcode = str(barcode or '').strip()
+                    if barcode and location_id in location_keys:
+                        quantities_by_location[location_keys[location_id]][barcode] = ERPStockRow(quantity, group_code)
+            logger.info(f"{len(location_ids)} lokasyon için {row_count} stok satırı çekildi.")
+            return quantities_by_location
+        except pyodbc.Error as ex:
+            logger.error(f"ERP'den stok miktarları çekerken SQL HATA: {ex}", exc_info=True)
+            return None
         finally:
             self._close_erp_db()
 
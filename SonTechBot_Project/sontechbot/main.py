@@ -1,11 +1,7 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 06.07.2025 06:03
+# Güncelleme Tarihi: 19.10.2026 02:15
 # Yapılan Değişiklikler:
-# 1. Geliştirme ve test sürecini kolaylaştırmak için "Geliştirici Modu" eklendi.
-# 2. config.py dosyasında 'DEV_MODE = True' ayarı varsa, program online lisans kontrolünü atlayarak direkt başlar.
-# 3. 'run_license_check' fonksiyonu, DEV_MODE anahtarını kontrol edecek şekilde güncellendi.
-# 4. Kod içindeki import yapısı, yeni ayarı okuyabilmek için daha esnek hale getirildi.
-# 5. İlgili yerlere geliştirici modu hakkında bilgilendirici log mesajları eklendi.
+# 1. Ayarlarda açıksa senkronizasyon metrikleri (Prometheus/OpenMetrics) uygulama açıkken yayınlanır.
 
 import logging
 import os
@@ -31,10 +27,15 @@ from kivymd.uix.button import MDRaisedButton
 # DÜZELTME: config dosyasını direkt import ederek daha esnek bir yapı sağlıyoruz.
 from sontechbot import config
 from sontechbot.core import licensing_handler, synchronizer, update_handler
+from sontechbot.core.batch_poller import batch_poller
+from sontechbot.core.maintenance import maintenance_scheduler
+from sontechbot.core.metrics_exporter import metrics_exporter
+from sontechbot.core.scheduler import restore_auto_sync, sync_scheduler
 from sontechbot.repositories import (close_database_connection,
                                      initialize_database, settings_repo)
 from sontechbot.ui.helpers import (LoadingPopup, RENK_ANA_ARKA_PLAN,
-                                   RENK_PRIMARY)
+                                   RENK_PRIMARY, hide_sync_loading_popup,
+                                   show_sync_loading_popup)
 from sontechbot.ui.popups.license_activation_popup import \
     LicenseActivationPopup
 from sontechbot.ui.popups.update_notification_popup import \
@@ -192,6 +193,15 @@ class SonTechBotGUIApp(MDApp):
         
         dashboard = root.screen_manager.get_screen('dashboard_screen')
         synchronizer.set_gui_status_updater(dashboard.add_log_message)
+        synchronizer.set_cycle_hooks(on_cycle_start=show_sync_loading_popup, on_cycle_end=hide_sync_loading_popup)
+        # Önceki oturumdan sonucu beklenen paketler varsa takibine devam edilir
+        batch_poller.start()
+        # Eski kayıtların arşivlenmesi ve veritabanı sıkıştırması arka planda periyodik olarak yapılır
+        maintenance_scheduler.start()
+        # Merkezi izleme için metrik uç noktası / dosyası (ayarlarda açıksa)
+        metrics_exporter.start()
+        if restore_auto_sync(on_finish_callback=dashboard.update_dashboard_data):
+            dashboard.add_log_message("Otomatik senkronizasyon önceki oturumdaki planıyla sürdürülüyor.")
         
         Window.bind(on_keyboard=self.on_key)
         logger.info(f"Uygulama arayüzü başarıyla başlatıldı. Lisans Durumu: {license_result.get('status')}")
@@ -209,6 +219,11 @@ class SonTechBotGUIApp(MDApp):
     def on_stop(self):
         """Uygulama kapatılırken çalışan son fonksiyondur."""
         logger.info("Uygulama kapatılıyor...")
+        sync_scheduler.stop()
+        synchronizer.close_trendyol_client()
+        batch_poller.stop()
+        maintenance_scheduler.stop()
+        metrics_exporter.stop()
         close_database_connection()
         logger.info("Veritabanı bağlantısı kapatıldı. Çıkış yapıldı.")
 
@@ -1,20 +1,24 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 09:15
+# Güncelleme Tarihi: 19.10.2026 03:45
 # Yapılan Değişiklikler:
-# 1. Kullanıcının isteği üzerine, 'brand_mappings' tablosu ve 'brand_repo' referansı kaldırıldı.
-# 2. 'branch_mappings' tablosundaki 'trendyol_store_id' sütunu korundu.
-# 3. Kategori kuralları tablosu ('category_rules') korundu.
+# 1. Şube/marka/kategori/barkod bazlı fiyat kuralları için 'pricing_rule_repo' eklendi.
 
 import logging
 
 from .base_repository import BaseRepository
+from .batch_repository import BatchRepository
 from .branch_repository import BranchRepository
 from .category_repository import CategoryRepository
 from .dashboard_repository import DashboardRepository
 from .history_repository import HistoryRepository
 from .issue_repository import IssueRepository
+from .maintenance_repository import MaintenanceRepository
+from .migrations import run_migrations
+from .pricing_rule_repository import PricingRuleRepository
 from .product_repository import ProductRepository
+from .profile_repository import ProfileRepository
 from .settings_repository import SettingsRepository
+from .snapshot_repository import SnapshotRepository
 # from .brand_repository import BrandRepository # Marka repository artık kullanılmıyor
 
 logger = logging.getLogger(__name__)
@@ -28,17 +32,15 @@ category_repo = CategoryRepository()
 product_repo = ProductRepository()
 history_repo = HistoryRepository()
 dashboard_repo = DashboardRepository()
+snapshot_repo = SnapshotRepository()
+batch_repo = BatchRepository()
+maintenance_repo = MaintenanceRepository()
+profile_repo = ProfileRepository()
+pricing_rule_repo = PricingRuleRepository()
 
 
-def initialize_database():
-    """
-    Uygulamanın ihtiyaç duyduğu tüm veritabanı tablolarını oluşturur.
-    """
-    logger.info("Veritabanı tabloları başlatılıyor...")
-    base = BaseRepository()
-
-    # Tüm tabloları oluşturan ana SQL betiği
-    create_script = """
+# Tüm tabloları oluşturan ana SQL betiği. İndeksler ve sonraki şema değişiklikleri 'migrations.py' içindedir.
+CREATE_TABLES_SCRIPT = """
     CREATE TABLE IF NOT EXISTS products (
         id INTEGER PRIMARY KEY AUTOINCREMENT, erp_product_id TEXT UNIQUE NOT NULL, stok_kod TEXT, name TEXT NOT NULL, barcode1 TEXT,
         barcode2 TEXT, unit TEXT, vat_rate INTEGER, erp_grup_kod TEXT, erp_marka_adi TEXT, web_publish_flag INTEGER DEFAULT 1,
@@ -75,15 +77,53 @@ def initialize_database():
         platform_content_id TEXT, platform_product_id TEXT, last_sync_date DATETIME, last_sync_status TEXT,
         UNIQUE (platform_name, erp_product_id), UNIQUE (platform_name, erp_barcode)
     );
+    CREATE TABLE IF NOT EXISTS sync_snapshots (
+        store_id TEXT NOT NULL,
+        barcode TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        selling_price REAL NOT NULL,
+        original_price REAL NOT NULL,
+        content_hash TEXT NOT NULL, -- Son gönderilen stok/fiyat bilgisinin özeti
+        last_pushed_at DATETIME,
+        PRIMARY KEY (store_id, barcode)
+    );
+    CREATE TABLE IF NOT EXISTS pending_batches (
+        batch_request_id TEXT PRIMARY KEY,
+        erp_branch_name TEXT,
+        store_id TEXT,
+        item_count INTEGER DEFAULT 0,
+        barcodes_json TEXT, -- Paket sonucu alınamazsa bu barkodların anlık görüntüleri silinir
+        submitted_at DATETIME,
+        next_check_at DATETIME,
+        last_checked_at DATETIME,
+        attempts INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'PENDING', -- PENDING, COMPLETED, EXPIRED
+        last_status TEXT, -- Trendyol'dan dönen son paket durumu
+        failed_count INTEGER DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_pending_batches_due ON pending_batches (status, next_check_at);
+    """
+
+
+def initialize_database():
+    """
+    Uygulamanın ihtiyaç duyduğu tüm veritabanı tablolarını oluşturur.
     """
-    base._execute(create_script, script=True, commit=True)
+    logger.info("Veritabanı tabloları başlatılıyor...")
+    base = BaseRepository()
+
+    base._execute(CREATE_TABLES_SCRIPT, script=True, commit=True)
     logger.info("Veritabanı tabloları başarıyla kontrol edildi/oluşturuldu.")
 
+    # İndeksler ve sonraki şema değişiklikleri sürüm sırasıyla, yalnızca bir kez uygulanır
+    conn = base._get_connection()
+    if conn:
+        with BaseRepository._write_lock:
+            run_migrations(conn)
+
 
 def close_database_connection():
-    """Uygulama kapatılırken veritabanı bağlantısını güvenli bir şekilde sonlandırır."""
-    base = BaseRepository()
-    if getattr(base, '_conn', None):
-        base._conn.close()
-        base._conn = None
-        logger.info("Merkezi veritabanı bağlantısı kapatıldı.")
+    """Uygulama kapatılırken tüm veritabanı bağlantılarını güvenli bir şekilde sonlandırır."""
+    closed_count = BaseRepository.close_all_connections()
+    if closed_count:
+        logger.info(f"{closed_count} veritabanı bağlantısı kapatıldı.")
@@ -1,22 +1,36 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 10:10
+# Güncelleme Tarihi: 19.10.2026 02:15
 # Yapılan Değişiklikler:
-# 1. Veritabanı dosyası bulunamadı hatasını çözmek için __init__ metoduna _ensure_db_folder fonksiyonu eklendi.
-# 2. Bu fonksiyon, veritabanı dosyasının kaydedileceği klasörün (örn: C:\Users\kullanici\AppData\Local\SonTech\SonTechBot) var olup olmadığını kontrol eder ve yoksa oluşturur.
+# 1. Yazma işlemlerinin (yazma kilidini bekleme dahil) süresi 'sontechbot_sqlite_write_duration_seconds'
+#    metriğine işlem türüne göre (execute, script, executemany, transaction) kaydediliyor.
 
+import contextlib
 import logging
 import os
 import sqlite3
+import threading
+import time
 
 from ..config import GENERAL_SETTINGS_DEFAULT
+from ..core.metrics import SQLITE_WRITE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+SQLITE_BUSY_TIMEOUT_SECONDS = 10
+SQLITE_CACHE_SIZE_KB = 20000              # Bağlantı başına yaklaşık 20 MB sayfa önbelleği
+SQLITE_MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
 
 class BaseRepository:
-    _conn = None
     db_path = GENERAL_SETTINGS_DEFAULT.get("database_file_path")
 
+    # Bağlantılar iş parçacığı bazında tutulur; '_connections' kapanışta hepsini kapatabilmek içindir.
+    _local = threading.local()
+    _connections = {}
+    _connections_lock = threading.Lock()
+    # Tüm yazma işlemleri bu kilit ile sıraya alınır (tek yazıcı)
+    _write_lock = threading.RLock()
+
     def __init__(self):
         """
         Sınıf başlatıldığında, veritabanı klasörünün mevcut olduğundan emin olur.
@@ -36,45 +50,138 @@ class BaseRepository:
             except OSError as e:
                 logger.error(f"Veritabanı klasörü oluşturulamadı: {e}", exc_info=True)
 
+    def _open_connection(self):
+        """Yeni bir SQLite bağlantısı açar ve performans ayarlarını (PRAGMA) uygular."""
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB};")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE_BYTES};")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
     def _get_connection(self):
-        if BaseRepository._conn is None:
+        """Çağıran iş parçacığına ait bağlantıyı döndürür; yoksa yeni bir bağlantı açar."""
+        conn = getattr(BaseRepository._local, "conn", None)
+        if conn is not None:
+            return conn
+        try:
+            conn = self._open_connection()
+        except sqlite3.Error as e:
+            logger.error(f"Veritabanı bağlantısı oluşturulamadı: {e}", exc_info=True)
+            return None
+        BaseRepository._local.conn = conn
+        with BaseRepository._connections_lock:
+            BaseRepository._close_dead_thread_connections()
+            BaseRepository._connections[threading.get_ident()] = conn
+        logger.info(f"Yeni veritabanı bağlantısı oluşturuldu: {self.db_path} ({threading.current_thread().name})")
+        return conn
+
+    @staticmethod
+    def _close_dead_thread_connections():
+        """Sonlanmış iş parçacıklarından (ör. kapanmış iş havuzları) kalan bağlantıları kapatır."""
+        alive_idents = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in BaseRepository._connections if i not in alive_idents]:
             try:
-                BaseRepository._conn = sqlite3.connect(
-                    self.db_path, timeout=10, check_same_thread=False
-                )
-                BaseRepository._conn.row_factory = sqlite3.Row
-                BaseRepository._conn.execute("PRAGMA foreign_keys = ON;")
-                logger.info(f"Yeni veritabanı bağlantısı oluşturuldu: {self.db_path}")
-            except sqlite3.Error as e:
-                logger.error(f"Veritabanı bağlantısı oluşturulamadı: {e}", exc_info=True)
-                return None
-        return BaseRepository._conn
+                BaseRepository._connections.pop(ident).close()
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def close_all_connections():
+        """Açık olan tüm iş parçacığı bağlantılarını kapatır ve kapatılan bağlantı sayısını döndürür."""
+        with BaseRepository._connections_lock:
+            for conn in BaseRepository._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.warning(f"Veritabanı bağlantısı kapatılırken hata: {e}")
+            closed_count = len(BaseRepository._connections)
+            BaseRepository._connections.clear()
+            BaseRepository._local = threading.local()
+        return closed_count
+
+    @contextlib.contextmanager
+    def _write_transaction(self):
+        """
+        Birden fazla yazma sorgusunu yazma kilidi altında tek bir işlemde çalıştırmak için kullanılır.
+        Blok hatasız biterse commit, hata olursa rollback yapılır. Bağlantı yoksa None verir.
+        """
+        conn = self._get_connection()
+        if not conn:
+            yield None
+            return
+        started = time.perf_counter()
+        with BaseRepository._write_lock:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                SQLITE_WRITE_SECONDS.observe(time.perf_counter() - started, operation="transaction")
 
     def _execute(self, query, params=(), fetch=None, commit=False, script=False):
         conn = self._get_connection()
         if not conn:
             return None
-        try:
-            cursor = conn.cursor()
-            if script:
-                cursor.executescript(query)
-            else:
-                cursor.execute(query, params)
-
-            if fetch == 'one':
-                result = cursor.fetchone()
-            elif fetch == 'all':
-                result = cursor.fetchall()
-            else:
-                result = cursor.lastrowid
-
-            if commit:
-                conn.commit()
+        # Yazma işlemleri sıraya alınır; salt okunur sorgular kilit beklemeden çalışır.
+        is_write = commit or script
+        lock = BaseRepository._write_lock if is_write else contextlib.nullcontext()
+        started = time.perf_counter()
+        with lock:
+            try:
+                cursor = conn.cursor()
+                if script:
+                    cursor.executescript(query)
+                else:
+                    cursor.execute(query, params)
 
-            return result
-        except sqlite3.Error as e:
-            query_preview = query.splitlines()[0] if query else "EMPTY_QUERY"
-            logger.error(f"Sorgu hatası: {query_preview}... - Hata: {e}")
-            if commit:
-                conn.rollback()
+                if fetch == 'one':
+                    result = cursor.fetchone()
+                elif fetch == 'all':
+                    result = cursor.fetchall()
+                else:
+                    result = cursor.lastrowid
+
+                if commit:
+                    conn.commit()
+
+                return result
+            except sqlite3.Error as e:
+                query_preview = query.splitlines()[0] if query else "EMPTY_QUERY"
+                logger.error(f"Sorgu hatası: {query_preview}... - Hata: {e}")
+                if commit:
+                    conn.rollback()
+                return None
+            finally:
+                if is_write:
+                    SQLITE_WRITE_SECONDS.observe(time.perf_counter() - started,
+                                                 operation="script" if script else "execute")
+
+    def _executemany(self, query, seq_of_params, commit=True):
+        """Aynı sorguyu birden fazla parametre seti için tek seferde çalıştırır."""
+        conn = self._get_connection()
+        if not conn:
             return None
+        started = time.perf_counter()
+        with BaseRepository._write_lock:
+            try:
+                cursor = conn.cursor()
+                cursor.executemany(query, seq_of_params)
+                if commit:
+                    conn.commit()
+                return cursor.rowcount
+            except sqlite3.Error as e:
+                query_preview = query.strip().splitlines()[0] if query else "EMPTY_QUERY"
+                logger.error(f"Toplu sorgu hatası: {query_preview}... - Hata: {e}")
+                if commit:
+                    conn.rollback()
+                return None
+            finally:
+                # commit=False çağrıları bir '_write_transaction' içindedir; süreleri o işlemde sayılır
+                if commit:
+                    SQLITE_WRITE_SECONDS.observe(time.perf_counter() - started, operation="executemany")
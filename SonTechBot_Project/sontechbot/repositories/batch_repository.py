@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 01:30
+# Yapılan Değişiklikler:
+# 1. Paketler, gönderildikleri döngünün başlangıç zamanıyla kaydedilir ve 'attach_history' ile döngünün geçmiş
+#    kaydına bağlanır (paket sonucu kontrolleri döngü profiline yazılabilsin diye).
+
+import datetime
+import json
+import logging
+import sqlite3
+
+from .base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class BatchRepository(BaseRepository):
+    """
+    Sonucu arka planda kontrol edilecek Trendyol paketlerinin (batch) veritabanı işlemlerini yöneten sınıf.
+    Kayıtlar SQLite'ta tutulduğu için, program kapanıp açılsa bile bekleyen paketlerin takibi devam eder.
+    """
+
+    def add_pending_batch(self, batch_request_id, erp_branch_name, store_id, barcodes, first_check_delay=5,
+                          cycle_started_at=None):
+        """
+        Gönderilen bir paketi, ilk kontrolü 'first_check_delay' saniye sonra yapılacak şekilde kaydeder.
+        'cycle_started_at', paketi gönderen döngünün başlangıcıdır (time.time()).
+        """
+        now = datetime.datetime.now()
+        next_check = now + datetime.timedelta(seconds=first_check_delay)
+        sql = """
+            INSERT OR IGNORE INTO pending_batches (
+                batch_request_id, erp_branch_name, store_id, item_count,
+                barcodes_json, submitted_at, next_check_at, attempts, status, cycle_started_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0, 'PENDING', ?)
+        """
+        params = (
+            str(batch_request_id), erp_branch_name, str(store_id), len(barcodes),
+            json.dumps(list(barcodes), ensure_ascii=False),
+            now.strftime(DATETIME_FORMAT), next_check.strftime(DATETIME_FORMAT), cycle_started_at
+        )
+        return self._execute(sql, params, commit=True)
+
+    def get_due_batches(self, limit=20):
+        """Kontrol zamanı gelmiş bekleyen paketleri, en eski kontrol zamanından başlayarak döndürür."""
+        query = """
+            SELECT * FROM pending_batches
+            WHERE status = 'PENDING' AND next_check_at <= ?
+            ORDER BY next_check_at LIMIT ?
+        """
+        now_str = datetime.datetime.now().strftime(DATETIME_FORMAT)
+        rows = self._execute(query, (now_str, limit), fetch='all')
+        return [dict(row) for row in rows] if rows else []
+
+    def attach_history(self, batch_request_ids, history_id):
+        """
+        Döngüde gönderilen paketleri ve döngü bitmeden yapılmış kontrollerinin profil adımlarını,
+        döngünün geçmiş kaydına tek işlemde bağlar.
+        """
+        if not batch_request_ids or not history_id:
+            return 0
+        params = [(history_id, str(batch_id)) for batch_id in batch_request_ids]
+        try:
+            with self._write_transaction() as conn:
+                if conn is None:
+                    return 0
+                conn.executemany("UPDATE pending_batches SET history_id = ? WHERE batch_request_id = ?", params)
+                conn.executemany(
+                    "UPDATE sync_cycle_spans SET history_id = ? WHERE history_id IS NULL AND batch_request_id = ?", params
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Paketler döngü kaydına bağlanamadı: {e}")
+            return 0
+        return len(params)
+
+    def get_next_check_time(self):
+        """Bekleyen paketler arasındaki en yakın kontrol zamanını döndürür. Bekleyen paket yoksa None döner."""
+        row = self._execute(
+            "SELECT MIN(next_check_at) AS next_check_at FROM pending_batches WHERE status = 'PENDING'",
+            fetch='one'
+        )
+        if not row or not row['next_check_at']:
+            return None
+        return datetime.datetime.strptime(row['next_check_at'], DATETIME_FORMAT)
+
+    def count_pending_batches(self):
+        row = self._execute("SELECT COUNT(*) AS total FROM pending_batches WHERE status = 'PENDING'", fetch='one')
+        return row['total'] if row else 0
+
+    def reschedule_batch(self, batch_request_id, delay_seconds, last_status=None):
+        """Sonucu henüz hazır olmayan paketin deneme sayısını artırır ve bir sonraki kontrol zamanını erteler."""
+        now = datetime.datetime.now()
+        next_check = now + datetime.timedelta(seconds=delay_seconds)
+        sql = """
+            UPDATE pending_batches
+            SET attempts = attempts + 1, next_check_at = ?, last_checked_at = ?, last_status = ?
+            WHERE batch_request_id = ?
+        """
+        params = (next_check.strftime(DATETIME_FORMAT), now.strftime(DATETIME_FORMAT),
+                  last_status, str(batch_request_id))
+        return self._execute(sql, params, commit=True)
+
+    def complete_batch(self, batch_request_id, status, failed_count=0, last_status=None):
+        """
+        Paketin takibini sonlandırır. 'status' değeri 'COMPLETED' (sonuç alındı) veya
+        'EXPIRED' (deneme hakkı bitti) olabilir.
+        """
+        sql = """
+            UPDATE pending_batches
+            SET status = ?, failed_count = ?, last_checked_at = ?, last_status = ?, attempts = attempts + 1
+            WHERE batch_request_id = ?
+        """
+        now_str = datetime.datetime.now().strftime(DATETIME_FORMAT)
+        return self._execute(sql, (status, failed_count, now_str, last_status, str(batch_request_id)), commit=True)
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 05:20
+# Güncelleme Tarihi: 19.10.2026 00:45
 # Yapılan Değişiklikler:
-# 1. 'add_or_update_branch_mapping' fonksiyonu, artık 'trendyol_store_id' alanını da kaydedecek şekilde güncellendi.
-# 2. SQL sorguları ve parametreler, yeni veritabanı şemasıyla uyumlu hale getirildi.
+# 1. 'get_all_branch_mappings', tabloda bulunmayan eski JSON sütunları ('categories_to_sync_json',
+#    'excluded_categories_json') yüzünden IndexError verip senkronizasyonu durduruyordu; sütunlar artık
+#    isteğe bağlı okunuyor.
 
 import json
 import logging
@@ -30,8 +31,8 @@ class BranchRepository(BaseRepository):
             mapping_dict = dict(row)
             try:
                 # JSON verilerini Python listelerine dönüştür
-                mapping_dict['categories_to_sync'] = json.loads(row['categories_to_sync_json'] or '[]')
-                mapping_dict['excluded_categories'] = json.loads(row['excluded_categories_json'] or '[]')
+                mapping_dict['categories_to_sync'] = json.loads(mapping_dict.get('categories_to_sync_json') or '[]')
+                mapping_dict['excluded_categories'] = json.loads(mapping_dict.get('excluded_categories_json') or '[]')
                 mapping_dict['is_active_for_sync'] = bool(row['is_active'])
             except (json.JSONDecodeError, TypeError):
                 logger.warning(f"ID'si {row['id']} olan şube için JSON verisi bozuk, varsayılanlar kullanılıyor.")
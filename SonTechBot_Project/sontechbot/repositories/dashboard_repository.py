@@ -1,7 +1,13 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 08:00
+# Yapılan Değişiklikler:
+# 1. "Son senkronizasyon" özeti stok kulvarının döngülerini atlayıp en son tam senkronizasyonu gösteriyor.
+
 import datetime
 import logging
 
 from .base_repository import BaseRepository
+from .history_repository import STOCK_SYNC_TYPE_PATTERN
 
 logger = logging.getLogger(__name__)
 
@@ -22,26 +28,26 @@ class DashboardRepository(BaseRepository):
             return stats
 
         try:
-            twenty_four_hours_ago = (datetime.datetime.now() - datetime.timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
-            history_query = "SELECT status FROM sync_history WHERE start_time >= ?"
-            history_rows = self._execute(history_query, (twenty_four_hours_ago,), fetch='all')
-            if history_rows:
-                total_syncs = len(history_rows)
-                successful_syncs = sum(1 for row in history_rows if row['status'] in ['Başarılı', 'Uyarılarla Tamamlandı'])
-                stats['health_score'] = round((successful_syncs / total_syncs * 100) if total_syncs > 0 else 100)
-
-            issue_query = "SELECT issue_type, COUNT(*) as count FROM sync_issues WHERE is_resolved = 0 GROUP BY issue_type"
+            # Sağlık puanı, saatlik sayaç kovalarından okunur (en fazla 25 satır).
+            # Pencere saat başına yuvarlandığı için son 24-25 saati kapsar.
+            window_start = (datetime.datetime.now() - datetime.timedelta(hours=24)).strftime('%Y-%m-%d %H:00:00')
+            health_query = "SELECT SUM(total) AS total, SUM(successful) AS successful FROM sync_health_buckets WHERE bucket_hour >= ?"
+            health_row = self._execute(health_query, (window_start,), fetch='one')
+            if health_row and health_row['total']:
+                stats['health_score'] = round(health_row['successful'] / health_row['total'] * 100)
+
+            # Sorun sayıları, tetikleyicilerle güncel tutulan sayaç tablosundan okunur
+            issue_query = "SELECT issue_type, count FROM issue_counters WHERE is_resolved = 0 AND count > 0"
             issue_rows = self._execute(issue_query, fetch='all')
             if issue_rows:
                 stats['issue_counts'] = {row['issue_type']: row['count'] for row in issue_rows}
+                stats['total_unresolved_issues'] = sum(stats['issue_counts'].values())
 
-            total_issues_query = "SELECT COUNT(*) as count FROM sync_issues WHERE is_resolved = 0"
-            total_issues_row = self._execute(total_issues_query, fetch='one')
-            if total_issues_row:
-                stats['total_unresolved_issues'] = total_issues_row['count']
-
-            last_sync_query = "SELECT duration_seconds, summary_message FROM sync_history ORDER BY start_time DESC LIMIT 1"
-            last_sync_row = self._execute(last_sync_query, fetch='one')
+            last_sync_query = """
+                SELECT duration_seconds, summary_message FROM sync_history
+                WHERE sync_type NOT LIKE ? ORDER BY start_time DESC LIMIT 1
+            """
+            last_sync_row = self._execute(last_sync_query, (STOCK_SYNC_TYPE_PATTERN,), fetch='one')
             if last_sync_row:
                 stats['last_sync_duration'] = f"{last_sync_row['duration_seconds']:.2f} saniye"
                 stats['last_sync_summary'] = last_sync_row['summary_message']
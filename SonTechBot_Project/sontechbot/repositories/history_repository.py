@@ -1,3 +1,8 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 08:00
+# Yapılan Değişiklikler:
+# 1. 'get_sync_history' stok kulvarının döngülerini varsayılan olarak listelemiyor ('include_stock').
+
 import json
 import logging
 
@@ -5,6 +10,10 @@ from .base_repository import BaseRepository
 
 logger = logging.getLogger(__name__)
 
+# Stok kulvarının geçmiş kayıtlarının 'sync_type' değeri 'stock' ile biter ('stock', 'auto-stock', 'cli-stock').
+# Ana panel özeti, sağlık puanı ve geçmiş listesi bu kayıtları içermez.
+STOCK_SYNC_TYPE_PATTERN = "%stock"
+
 
 class HistoryRepository(BaseRepository):
 
@@ -31,7 +40,12 @@ class HistoryRepository(BaseRepository):
         )
         return self._execute(sql, params, commit=True)
 
-    def get_sync_history(self, limit=50):
-        query = "SELECT * FROM sync_history ORDER BY start_time DESC LIMIT ?"
-        rows = self._execute(query, (limit,), fetch='all')
+    def get_sync_history(self, limit=50, include_stock=False):
+        """Son geçmiş kayıtlarını yeniden eskiye döndürür. 'include_stock' False ise stok kulvarı kayıtları atlanır."""
+        if include_stock:
+            query, params = "SELECT * FROM sync_history ORDER BY start_time DESC LIMIT ?", (limit,)
+        else:
+            query = "SELECT * FROM sync_history WHERE sync_type NOT LIKE ? ORDER BY start_time DESC LIMIT ?"
+            params = (STOCK_SYNC_TYPE_PATTERN, limit)
+        rows = self._execute(query, params, fetch='all')
         return [dict(row) for row in rows] if rows else []
\ No newline at end of file
@@ -1,3 +1,10 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 20:00
+# Yapılan Değişiklikler:
+# 1. Raporlar ekranı için sayfalı ve filtrelenebilir 'get_issues_page' fonksiyonu eklendi. Sayfalama OFFSET yerine
+#    son satırın (zaman, id) değerinden devam eder (keyset); böylece her sayfa, kaçıncı sayfa olursa olsun aynı sürede okunur.
+# 2. Filtre seçenekleri için 'get_issue_types' fonksiyonu eklendi.
+
 import json
 import logging
 
@@ -10,31 +17,83 @@ class IssueRepository(BaseRepository):
 
     def add_sync_issue(self, erp_product_id, barcode, erp_branch_name,
                        issue_type, message, details_dict=None):
-        check_sql = """
-            SELECT id FROM sync_issues
-            WHERE erp_product_id = ? AND erp_branch_name = ?
-            AND issue_type = ? AND is_resolved = 0
-        """
-        product_id = str(erp_product_id or '')
-        branch_name = str(erp_branch_name or '')
+        """Tek bir sorun kaydı ekler. Aynı ürün/şube/tür için çözülmemiş kayıt varsa yenisi eklenmez."""
+        return self.add_sync_issues_bulk([{
+            "erp_product_id": erp_product_id, "barcode": barcode, "erp_branch_name": erp_branch_name,
+            "issue_type": issue_type, "message": message, "details": details_dict
+        }])
 
-        existing = self._execute(check_sql, (product_id, branch_name, issue_type), fetch='one')
-        if existing:
-            return None
+    def add_sync_issues_bulk(self, issues):
+        """
+        Çok sayıda sorun kaydını tek sorgu ve tek commit ile ekler.
+        'issues' listesindeki her eleman 'erp_product_id', 'barcode', 'erp_branch_name', 'issue_type',
+        'message' ve isteğe bağlı 'details' anahtarlarını içeren bir sözlüktür.
+        Aynı liste içindeki tekrarlar bellekte elenir; veritabanında zaten çözülmemiş olarak bulunan
+        kayıtlar ise kısmi benzersiz indeks sayesinde sessizce atlanır. Eklenen kayıt sayısını döndürür.
+        """
+        params, seen_keys = [], set()
+        for issue in issues:
+            key = (
+                str(issue.get('erp_product_id') or ''), str(issue.get('barcode') or ''),
+                str(issue.get('erp_branch_name') or ''), str(issue.get('issue_type'))
+            )
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            details = issue.get('details')
+            details_json_str = json.dumps(details, ensure_ascii=False) if details else None
+            params.append(key + (str(issue.get('message')), details_json_str))
 
-        details_json_str = json.dumps(details_dict, ensure_ascii=False) if details_dict else None
-        insert_sql = """
+        if not params:
+            return 0
+        sql = """
             INSERT INTO sync_issues (
                 erp_product_id, barcode, erp_branch_name,
                 issue_type, message, details_json
             )
             VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (erp_product_id, barcode, erp_branch_name, issue_type) WHERE is_resolved = 0
+            DO NOTHING
         """
-        params = (
-            product_id, str(barcode or ''), branch_name,
-            str(issue_type), str(message), details_json_str
-        )
-        return self._execute(insert_sql, params, commit=True)
+        return self._executemany(sql, params, commit=True)
+
+    def get_issues_page(self, is_resolved=None, issue_type=None, branch_name=None, barcode=None,
+                        cursor=None, limit=200):
+        """
+        Sorunları en yeniden eskiye doğru sayfa sayfa döndürür. Geriye (kayıtlar, sonraki_sayfa_imleci) döner.
+        'cursor', bir önceki sayfanın son kaydının (timestamp, id) değeridir; ilk sayfa için None verilir.
+        Son sayfada imleç None döner. 'barcode' filtresi barkodun başıyla eşleşir.
+        """
+        conditions, params = [], []
+        if is_resolved is not None:
+            conditions.append("is_resolved = ?")
+            params.append(1 if is_resolved else 0)
+        if issue_type:
+            conditions.append("issue_type = ?")
+            params.append(issue_type)
+        if branch_name:
+            conditions.append("erp_branch_name = ?")
+            params.append(branch_name)
+        if barcode:
+            conditions.append("barcode LIKE ? ESCAPE '\\'")
+            escaped = str(barcode).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(escaped + '%')
+        if cursor:
+            conditions.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT * FROM sync_issues {where_clause} ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(int(limit))
+        rows = self._execute(query, tuple(params), fetch='all')
+        issues = [dict(row) for row in rows] if rows else []
+        next_cursor = (issues[-1]['timestamp'], issues[-1]['id']) if len(issues) == limit else None
+        return issues, next_cursor
+
+    def get_issue_types(self):
+        """Veritabanında en az bir kaydı bulunan sorun türlerini döndürür (sayaç tablosundan okunur)."""
+        rows = self._execute("SELECT DISTINCT issue_type FROM issue_counters WHERE count > 0 ORDER BY issue_type", fetch='all')
+        return [row['issue_type'] for row in rows] if rows else []
 
     def get_all_unresolved_issues(self):
         query = "SELECT * FROM sync_issues WHERE is_resolved = 0 ORDER BY timestamp DESC"
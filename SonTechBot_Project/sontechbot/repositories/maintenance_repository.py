@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 19:15
+# Yapılan Değişiklikler:
+# 1. Eski kayıtların okunup silinmesi, boş sayfaların geri kazanılması (incremental vacuum) ve veritabanı
+#    boyut bilgisinin okunması gibi bakım işlemlerini yöneten repository sınıfı oluşturuldu.
+
+import logging
+
+from .base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+# Bakım işinin kayıt silebileceği tablolar
+ARCHIVABLE_TABLES = {"sync_issues", "sync_history"}
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class MaintenanceRepository(BaseRepository):
+    """Veritabanı saklama süresi, arşivleme ve sıkıştırma işlemlerinin veritabanı tarafını yönetir."""
+
+    def get_archivable_issues(self, cutoff, after_id=0, limit=5000):
+        """'cutoff' tarihinden eski, ÇÖZÜLMÜŞ sorun kayıtlarını id sırasıyla parça parça döndürür."""
+        query = """
+            SELECT * FROM sync_issues
+            WHERE is_resolved = 1 AND timestamp < ? AND id > ?
+            ORDER BY id LIMIT ?
+        """
+        rows = self._execute(query, (cutoff, after_id, limit), fetch='all')
+        return [dict(row) for row in rows] if rows else []
+
+    def get_archivable_history(self, cutoff, after_id=0, limit=5000):
+        """'cutoff' tarihinden önce başlamış senkronizasyon geçmişi kayıtlarını id sırasıyla parça parça döndürür."""
+        query = """
+            SELECT * FROM sync_history
+            WHERE start_time < ? AND id > ?
+            ORDER BY id LIMIT ?
+        """
+        rows = self._execute(query, (cutoff, after_id, limit), fetch='all')
+        return [dict(row) for row in rows] if rows else []
+
+    def delete_rows(self, table, ids):
+        """Verilen id'lere sahip kayıtları tek işlemde siler. Silinen kayıt sayısını döndürür."""
+        if table not in ARCHIVABLE_TABLES:
+            raise ValueError(f"Bakım işi bu tablodan kayıt silemez: {table}")
+        if not ids:
+            return 0
+        return self._executemany(f"DELETE FROM {table} WHERE id = ?", [(i,) for i in ids], commit=True)
+
+    def purge_finished_batches(self, cutoff):
+        """Takibi bitmiş (tamamlanmış/süresi dolmuş) ve 'cutoff' tarihinden eski paket kayıtlarını siler."""
+        sql = "DELETE FROM pending_batches WHERE status != 'PENDING' AND submitted_at < ?"
+        with self._write_transaction() as conn:
+            if conn is None:
+                return 0
+            return conn.execute(sql, (cutoff,)).rowcount
+
+    def prune_health_buckets(self, cutoff):
+        """Ana panel sağlık puanında artık kullanılmayan eski saatlik sayaç kovalarını siler."""
+        with self._write_transaction() as conn:
+            if conn is None:
+                return 0
+            return conn.execute("DELETE FROM sync_health_buckets WHERE bucket_hour < ?", (cutoff,)).rowcount
+
+    def get_storage_stats(self):
+        """Veritabanı dosyasının sayfa bilgilerini ve bayt cinsinden toplam/boş alan boyutunu döndürür."""
+        stats = {"page_count": 0, "page_size": 0, "freelist_count": 0, "size_bytes": 0, "free_bytes": 0}
+        for pragma in ("page_count", "page_size", "freelist_count"):
+            row = self._execute(f"PRAGMA {pragma}", fetch='one')
+            stats[pragma] = row[0] if row else 0
+        stats["size_bytes"] = stats["page_count"] * stats["page_size"]
+        stats["free_bytes"] = stats["freelist_count"] * stats["page_size"]
+        return stats
+
+    def ensure_incremental_auto_vacuum(self):
+        """
+        Veritabanını 'auto_vacuum = INCREMENTAL' kipine alır. Kip değişikliği ancak tam bir VACUUM ile
+        geçerli olduğundan, bu işlem veritabanı başına yalnızca bir kez yapılır. Dönüştürme yapıldıysa True döner.
+        """
+        row = self._execute("PRAGMA auto_vacuum", fetch='one')
+        if row and row[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        logger.info("Veritabanı 'auto_vacuum = INCREMENTAL' kipine alınıyor (tek seferlik tam VACUUM)...")
+        with BaseRepository._write_lock:
+            self._execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._execute("VACUUM")
+        return True
+
+    def incremental_vacuum(self):
+        """Silinen kayıtlardan boşalan sayfaları dosyadan geri kazanır ve WAL dosyasını küçültür."""
+        with BaseRepository._write_lock:
+            # 'execute' bu PRAGMA'yı tek adım çalıştırıp yalnızca bir sayfa boşaltır; betik olarak sonuna kadar çalıştırılır
+            self._execute("PRAGMA incremental_vacuum;", script=True)
+            self._execute("PRAGMA wal_checkpoint(TRUNCATE)", fetch='one')
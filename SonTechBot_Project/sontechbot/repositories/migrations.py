@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 08:00
+# Yapılan Değişiklikler:
+# 1. v9 göçü eklendi: Sağlık puanı kovaları stok kulvarının geçmiş kayıtlarını ('sync_type' 'stock' ile biter)
+#    saymıyor; kovalar bu kayıtlar olmadan yeniden hesaplanır.
+
+import datetime
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# (sürüm, açıklama, sırayla çalıştırılacak SQL ifadeleri)
+# Yeni bir şema değişikliği gerektiğinde listenin SONUNA bir sonraki sürüm numarasıyla eklenmelidir.
+# Uygulanmış bir göç sonradan DEĞİŞTİRİLMEMELİDİR.
+MIGRATIONS = [
+    (1, "sync_issues: çözülmemiş kayıt tekrarlarının temizlenmesi ve kısmi benzersiz indeks", (
+        """
+        DELETE FROM sync_issues
+        WHERE is_resolved = 0 AND id NOT IN (
+            SELECT MIN(id) FROM sync_issues WHERE is_resolved = 0
+            GROUP BY erp_product_id, barcode, erp_branch_name, issue_type
+        )
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_sync_issues_open
+            ON sync_issues (erp_product_id, barcode, erp_branch_name, issue_type) WHERE is_resolved = 0
+        """,
+    )),
+    (2, "sync_issues: rapor listeleri ve ana panel sayaçları için indeksler", (
+        # Çözülmüş/çözülmemiş sorun listeleri (WHERE is_resolved = ? ORDER BY timestamp DESC) ve toplam sayaç
+        "CREATE INDEX IF NOT EXISTS idx_sync_issues_resolved_ts ON sync_issues (is_resolved, timestamp)",
+        # Tüm sorunlar listesi (ORDER BY timestamp DESC)
+        "CREATE INDEX IF NOT EXISTS idx_sync_issues_timestamp ON sync_issues (timestamp)",
+        # Ana paneldeki türe göre çözülmemiş sorun sayıları; tabloya gitmeden yalnızca indeksten okunur
+        "CREATE INDEX IF NOT EXISTS idx_sync_issues_open_type ON sync_issues (issue_type) WHERE is_resolved = 0",
+    )),
+    (3, "sync_history: başlangıç zamanına göre sorgular için kapsayan indeks", (
+        # Son 24 saatin durumları ve son senkronizasyon özeti (WHERE/ORDER BY start_time)
+        "CREATE INDEX IF NOT EXISTS idx_sync_history_start_time ON sync_history (start_time, status)",
+    )),
+    (4, "Sorgu planlayıcısı için istatistiklerin güncellenmesi", (
+        "ANALYZE",
+    )),
+    (5, "Ana panel için tetikleyicilerle güncel tutulan sayaç tabloları", (
+        # Tür ve çözüm durumuna göre sorun sayıları
+        """
+        CREATE TABLE IF NOT EXISTS issue_counters (
+            issue_type TEXT NOT NULL, is_resolved INTEGER NOT NULL, count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (issue_type, is_resolved)
+        )
+        """,
+        # Saatlik senkronizasyon sayıları ('YYYY-MM-DD HH:00:00'); sağlık puanı son 24 kovadan hesaplanır
+        """
+        CREATE TABLE IF NOT EXISTS sync_health_buckets (
+            bucket_hour TEXT PRIMARY KEY, total INTEGER NOT NULL DEFAULT 0, successful INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "DELETE FROM issue_counters",
+        """
+        INSERT INTO issue_counters (issue_type, is_resolved, count)
+        SELECT COALESCE(issue_type, ''), is_resolved, COUNT(*) FROM sync_issues
+        GROUP BY COALESCE(issue_type, ''), is_resolved
+        """,
+        "DELETE FROM sync_health_buckets",
+        """
+        INSERT INTO sync_health_buckets (bucket_hour, total, successful)
+        SELECT substr(start_time, 1, 13) || ':00:00', COUNT(*),
+               SUM(CASE WHEN status IN ('Başarılı', 'Uyarılarla Tamamlandı') THEN 1 ELSE 0 END)
+        FROM sync_history GROUP BY substr(start_time, 1, 13)
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_issues_counter_insert AFTER INSERT ON sync_issues
+        BEGIN
+            INSERT OR IGNORE INTO issue_counters (issue_type, is_resolved, count)
+            VALUES (COALESCE(NEW.issue_type, ''), NEW.is_resolved, 0);
+            UPDATE issue_counters SET count = count + 1
+            WHERE issue_type = COALESCE(NEW.issue_type, '') AND is_resolved = NEW.is_resolved;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_issues_counter_delete AFTER DELETE ON sync_issues
+        BEGIN
+            UPDATE issue_counters SET count = count - 1
+            WHERE issue_type = COALESCE(OLD.issue_type, '') AND is_resolved = OLD.is_resolved;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_issues_counter_update AFTER UPDATE OF issue_type, is_resolved ON sync_issues
+        BEGIN
+            UPDATE issue_counters SET count = count - 1
+            WHERE issue_type = COALESCE(OLD.issue_type, '') AND is_resolved = OLD.is_resolved;
+            INSERT OR IGNORE INTO issue_counters (issue_type, is_resolved, count)
+            VALUES (COALESCE(NEW.issue_type, ''), NEW.is_resolved, 0);
+            UPDATE issue_counters SET count = count + 1
+            WHERE issue_type = COALESCE(NEW.issue_type, '') AND is_resolved = NEW.is_resolved;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_bucket_insert AFTER INSERT ON sync_history
+        BEGIN
+            INSERT OR IGNORE INTO sync_health_buckets (bucket_hour, total, successful)
+            VALUES (substr(NEW.start_time, 1, 13) || ':00:00', 0, 0);
+            UPDATE sync_health_buckets
+            SET total = total + 1,
+                successful = successful + (NEW.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(NEW.start_time, 1, 13) || ':00:00';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_bucket_delete AFTER DELETE ON sync_history
+        BEGIN
+            UPDATE sync_health_buckets
+            SET total = total - 1,
+                successful = successful - (OLD.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(OLD.start_time, 1, 13) || ':00:00';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_bucket_update AFTER UPDATE OF start_time, status ON sync_history
+        BEGIN
+            UPDATE sync_health_buckets
+            SET total = total - 1,
+                successful = successful - (OLD.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(OLD.start_time, 1, 13) || ':00:00';
+            INSERT OR IGNORE INTO sync_health_buckets (bucket_hour, total, successful)
+            VALUES (substr(NEW.start_time, 1, 13) || ':00:00', 0, 0);
+            UPDATE sync_health_buckets
+            SET total = total + 1,
+                successful = successful + (NEW.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(NEW.start_time, 1, 13) || ':00:00';
+        END
+        """,
+    )),
+    (6, "sync_issues: raporlar ekranındaki filtreli sayfalı sorgular için indeksler", (
+        # Çözüm durumu indekse konmadı: "tümü" filtresinde de sıralama indeksten okunur, durum satırda elenir
+        "CREATE INDEX IF NOT EXISTS idx_sync_issues_type_ts ON sync_issues (issue_type, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_sync_issues_branch_ts ON sync_issues (erp_branch_name, timestamp)",
+        # Barkodun başıyla eşleşen LIKE aramaları için; 'NOCASE' sayesinde LIKE bu indeksi kullanabilir
+        "CREATE INDEX IF NOT EXISTS idx_sync_issues_barcode ON sync_issues (barcode COLLATE NOCASE)",
+    )),
+    (7, "sync_cycle_spans: döngü adım süreleri ve paketlerin döngü bağlantısı", (
+        # start_ms/duration_ms döngünün başlangıcına göre milisaniyedir. Döngü bitmeden yapılan paket sonucu
+        # kontrollerinde history_id henüz boştur; döngü bitince batch_request_id üzerinden doldurulur.
+        """
+        CREATE TABLE IF NOT EXISTS sync_cycle_spans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, history_id INTEGER, batch_request_id TEXT, stage TEXT NOT NULL,
+            erp_branch_name TEXT, start_ms REAL NOT NULL, duration_ms REAL NOT NULL, item_count INTEGER, detail TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_sync_cycle_spans_history ON sync_cycle_spans (history_id, start_ms)",
+        """
+        CREATE INDEX IF NOT EXISTS idx_sync_cycle_spans_unattached ON sync_cycle_spans (batch_request_id)
+            WHERE history_id IS NULL
+        """,
+        # Geçmiş kaydı silindiğinde (bakım işi) adımları da silinir
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_spans_delete AFTER DELETE ON sync_history
+        BEGIN
+            DELETE FROM sync_cycle_spans WHERE history_id = OLD.id;
+        END
+        """,
+        # Paket sonucu kontrolleri de gönderildikleri döngünün profiline yazılabilsin diye
+        "ALTER TABLE pending_batches ADD COLUMN history_id INTEGER",
+        "ALTER TABLE pending_batches ADD COLUMN cycle_started_at REAL",
+    )),
+    (8, "pricing_rules: şube, marka, kategori ve barkod bazlı fiyat kuralları", (
+        # Boş (NULL) kapsam alanları "hepsi" anlamına gelir. Aynı ürüne birden fazla kural uyarsa önceliği
+        # yüksek olan, eşitse daha dar kapsamlı (barkod > marka+kategori > kategori > marka > genel) olan uygulanır.
+        """
+        CREATE TABLE IF NOT EXISTS pricing_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            priority INTEGER NOT NULL DEFAULT 0,
+            erp_branch_name TEXT,
+            erp_marka_adi TEXT,
+            erp_category_id TEXT,
+            barcode TEXT,
+            adjustment_percentage REAL NOT NULL DEFAULT 0,
+            adjustment_amount REAL NOT NULL DEFAULT 0,
+            rounding_mode TEXT NOT NULL DEFAULT 'none' CHECK (rounding_mode IN ('none', 'x99', 'tiered')),
+            min_price REAL,
+            max_price REAL,
+            is_active INTEGER NOT NULL DEFAULT 1,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_pricing_rules_active ON pricing_rules (is_active, priority)",
+    )),
+    (9, "sync_health_buckets: stok kulvarı döngülerinin sağlık puanından çıkarılması", (
+        # Stok kulvarı birkaç dakikada bir çalıştığı için sayılsaydı puan tam senkronizasyonu yansıtmazdı
+        "DROP TRIGGER IF EXISTS trg_sync_history_bucket_insert",
+        "DROP TRIGGER IF EXISTS trg_sync_history_bucket_delete",
+        "DROP TRIGGER IF EXISTS trg_sync_history_bucket_update",
+        "DELETE FROM sync_health_buckets",
+        """
+        INSERT INTO sync_health_buckets (bucket_hour, total, successful)
+        SELECT substr(start_time, 1, 13) || ':00:00', COUNT(*),
+               SUM(CASE WHEN status IN ('Başarılı', 'Uyarılarla Tamamlandı') THEN 1 ELSE 0 END)
+        FROM sync_history WHERE sync_type NOT LIKE '%stock' GROUP BY substr(start_time, 1, 13)
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_bucket_insert AFTER INSERT ON sync_history
+        WHEN NEW.sync_type NOT LIKE '%stock'
+        BEGIN
+            INSERT OR IGNORE INTO sync_health_buckets (bucket_hour, total, successful)
+            VALUES (substr(NEW.start_time, 1, 13) || ':00:00', 0, 0);
+            UPDATE sync_health_buckets
+            SET total = total + 1,
+                successful = successful + (NEW.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(NEW.start_time, 1, 13) || ':00:00';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_bucket_delete AFTER DELETE ON sync_history
+        WHEN OLD.sync_type NOT LIKE '%stock'
+        BEGIN
+            UPDATE sync_health_buckets
+            SET total = total - 1,
+                successful = successful - (OLD.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(OLD.start_time, 1, 13) || ':00:00';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sync_history_bucket_update AFTER UPDATE OF start_time, status ON sync_history
+        WHEN OLD.sync_type NOT LIKE '%stock'
+        BEGIN
+            UPDATE sync_health_buckets
+            SET total = total - 1,
+                successful = successful - (OLD.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(OLD.start_time, 1, 13) || ':00:00';
+            INSERT OR IGNORE INTO sync_health_buckets (bucket_hour, total, successful)
+            VALUES (substr(NEW.start_time, 1, 13) || ':00:00', 0, 0);
+            UPDATE sync_health_buckets
+            SET total = total + 1,
+                successful = successful + (NEW.status IN ('Başarılı', 'Uyarılarla Tamamlandı'))
+            WHERE bucket_hour = substr(NEW.start_time, 1, 13) || ':00:00';
+        END
+        """,
+    )),
+]
+
+
+def get_schema_version(conn):
+    """Veritabanına uygulanmış en yüksek şema sürümünü döndürür. Hiç göç uygulanmamışsa 0 döner."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY, description TEXT, applied_at DATETIME
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn, migrations=None):
+    """
+    Henüz uygulanmamış göçleri sürüm sırasına göre uygular. Her göç kendi işlemi (transaction) içinde
+    çalışır; bir ifade hata verirse o göç tamamen geri alınır ve sonraki göçlere geçilmez.
+    Uygulanan göç sayısını döndürür.
+    """
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m[0])
+    current_version = get_schema_version(conn)
+    conn.commit()
+    applied_count = 0
+
+    for version, description, statements in migrations:
+        if version <= current_version:
+            continue
+        logger.info(f"Veritabanı göçü uygulanıyor: v{version} - {description}")
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            conn.commit()
+            applied_count += 1
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Veritabanı göçü v{version} uygulanamadı, geri alındı: {e}", exc_info=True)
+            break
+
+    if applied_count:
+        logger.info(f"{applied_count} veritabanı göçü uygulandı. Şema sürümü: v{get_schema_version(conn)}")
+    return applied_count
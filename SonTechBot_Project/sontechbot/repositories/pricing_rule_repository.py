@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 03:45
+# Yapılan Değişiklikler:
+# 1. Şube, marka, kategori ve barkod bazlı fiyat kurallarını ('pricing_rules') yöneten repository sınıfı
+#    oluşturuldu. Kurallar döngü başında 'core.pricing.compile_pricing_rules' ile derlenir.
+
+import logging
+
+from .base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+ROUNDING_MODES = ("none", "x99", "tiered")
+
+
+def _optional_text(value):
+    """Boş metinleri NULL ("hepsi") olarak saklamak için."""
+    value = str(value).strip() if value is not None else ""
+    return value or None
+
+
+def _optional_float(value):
+    if value is None or str(value).strip() == "":
+        return None
+    return float(value)
+
+
+class PricingRuleRepository(BaseRepository):
+    """
+    Fiyat kuralları ile ilgili veritabanı işlemlerini yöneten sınıf. Boş kapsam alanları (şube, marka,
+    kategori, barkod) "hepsi" anlamına gelir.
+    """
+
+    def get_all_rules(self):
+        """Tüm fiyat kurallarını öncelik sırasıyla çeker."""
+        query = "SELECT * FROM pricing_rules ORDER BY priority DESC, id"
+        rows = self._execute(query, fetch='all')
+        return [dict(row) for row in rows] if rows else []
+
+    def get_active_rules(self):
+        """Senkronizasyonda uygulanacak, aktif fiyat kurallarını çeker."""
+        query = "SELECT * FROM pricing_rules WHERE is_active = 1 ORDER BY priority DESC, id"
+        rows = self._execute(query, fetch='all')
+        return [dict(row) for row in rows] if rows else []
+
+    def add_or_update_rule(self, rule_data):
+        """
+        'rule_data' içinde 'id' varsa o kuralı günceller, yoksa yeni kural ekler. Kuralın id'sini döndürür.
+        Barkoda özel kurallarda marka ve kategori anlamsız olduğu için boş bırakılır.
+        """
+        rounding_mode = rule_data.get("rounding_mode") or "none"
+        if rounding_mode not in ROUNDING_MODES:
+            raise ValueError(f"Geçersiz yuvarlama türü: '{rounding_mode}'. Geçerli değerler: {', '.join(ROUNDING_MODES)}")
+        min_price = _optional_float(rule_data.get("min_price"))
+        max_price = _optional_float(rule_data.get("max_price"))
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError(f"En düşük fiyat ({min_price}) en yüksek fiyattan ({max_price}) büyük olamaz.")
+
+        barcode = _optional_text(rule_data.get("barcode"))
+        params = (
+            _optional_text(rule_data.get("name")),
+            int(rule_data.get("priority") or 0),
+            _optional_text(rule_data.get("erp_branch_name")),
+            None if barcode else _optional_text(rule_data.get("erp_marka_adi")),
+            None if barcode else _optional_text(rule_data.get("erp_category_id")),
+            barcode,
+            float(rule_data.get("adjustment_percentage") or 0.0),
+            float(rule_data.get("adjustment_amount") or 0.0),
+            rounding_mode,
+            min_price,
+            max_price,
+            1 if rule_data.get("is_active", True) else 0,
+        )
+        rule_id = rule_data.get("id")
+        if rule_id:
+            sql = """
+                UPDATE pricing_rules SET
+                    name=?, priority=?, erp_branch_name=?, erp_marka_adi=?, erp_category_id=?, barcode=?,
+                    adjustment_percentage=?, adjustment_amount=?, rounding_mode=?, min_price=?, max_price=?,
+                    is_active=?, updated_at=CURRENT_TIMESTAMP
+                WHERE id=?
+            """
+            self._execute(sql, params + (int(rule_id),), commit=True)
+            return int(rule_id)
+        sql = """
+            INSERT INTO pricing_rules (
+                name, priority, erp_branch_name, erp_marka_adi, erp_category_id, barcode,
+                adjustment_percentage, adjustment_amount, rounding_mode, min_price, max_price, is_active
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        return self._execute(sql, params, commit=True)
+
+    def delete_rule(self, rule_id):
+        """Bir fiyat kuralını siler."""
+        self._execute("DELETE FROM pricing_rules WHERE id = ?", (int(rule_id),), commit=True)
+        logger.info(f"ID'si {rule_id} olan fiyat kuralı silindi.")
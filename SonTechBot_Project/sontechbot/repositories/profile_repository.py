@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 01:30
+# Yapılan Değişiklikler:
+# 1. Senkronizasyon döngülerinin adım sürelerini ('sync_cycle_spans') yazan ve okuyan repository sınıfı oluşturuldu.
+
+import logging
+
+from .base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileRepository(BaseRepository):
+    """Döngü profillerinin (adım süreleri) veritabanı işlemlerini yönetir. Kayıtlar geçmiş kaydının id'sine bağlıdır."""
+
+    def add_spans(self, history_id, spans):
+        """'CycleProfiler.get_spans' biçimindeki adımları tek işlemde kaydeder. Kaydedilen satır sayısını döndürür."""
+        if not history_id or not spans:
+            return 0
+        sql = """
+            INSERT INTO sync_cycle_spans (history_id, stage, erp_branch_name, start_ms, duration_ms, item_count, detail)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        params = [
+            (history_id, span["stage"], span.get("branch"), span["start_ms"], span["duration_ms"],
+             span.get("item_count"), span.get("detail"))
+            for span in spans
+        ]
+        return self._executemany(sql, params, commit=True) or 0
+
+    def add_batch_poll_span(self, batch_request_id, span):
+        """
+        Bir paket sonucu kontrolünü kaydeder. Döngü kaydı, paketin o anki 'history_id' değerinden aynı
+        sorguda alınır; döngü henüz bitmediyse boş kalır ve 'batch_repo.attach_history' ile doldurulur.
+        """
+        sql = """
+            INSERT INTO sync_cycle_spans (
+                history_id, batch_request_id, stage, erp_branch_name, start_ms, duration_ms, item_count, detail
+            )
+            VALUES ((SELECT history_id FROM pending_batches WHERE batch_request_id = ?), ?, ?, ?, ?, ?, ?, ?)
+        """
+        params = (str(batch_request_id), str(batch_request_id), span["stage"], span.get("branch"), span["start_ms"],
+                  span["duration_ms"], span.get("item_count"), span.get("detail"))
+        return self._execute(sql, params, commit=True)
+
+    def get_spans(self, history_id):
+        """Bir döngünün adımlarını başlangıç sırasıyla, 'CycleProfiler.get_spans' biçiminde döndürür."""
+        query = """
+            SELECT stage, erp_branch_name AS branch, start_ms, duration_ms, item_count, detail
+            FROM sync_cycle_spans WHERE history_id = ? ORDER BY start_ms
+        """
+        rows = self._execute(query, (history_id,), fetch='all')
+        return [dict(row) for row in rows] if rows else []
@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 07.07.2025 09:10
+# Güncelleme Tarihi: 19.10.2026 00:45
 # Yapılan Değişiklikler:
-# 1. 'KeyError: 'driver'' hatasını çözmek için 'get_erp_config' fonksiyonu güncellendi.
-# 2. Fonksiyon artık config dosyasında veya veritabanında 'driver' anahtarını aramıyor.
+# 1. Metrik yayınlama ayarlarını okuyan 'get_metrics_settings' eklendi.
 
 import logging
 
@@ -43,6 +42,7 @@ class SettingsRepository(BaseRepository):
 
         test_mode_str = self.get_app_setting("trendyol_test_mode_enabled", "True")
         cfg["test_mode_enabled"] = (test_mode_str == 'True')
+        cfg["base_url_override"] = self.get_app_setting("trendyol_base_url_override", cfg.get("base_url_override")) or ""
         return cfg
 
     def get_general_settings(self):
@@ -50,4 +50,69 @@ class SettingsRepository(BaseRepository):
         sync_interval = self.get_app_setting("sync_interval_minutes", cfg.get("sync_interval_minutes"))
         cfg["sync_interval_minutes"] = int(sync_interval or 15)
         cfg["log_level"] = self.get_app_setting("log_level", cfg.get("log_level"))
+        cfg["log_max_lines"] = self._get_int_setting("log_max_lines", cfg["log_max_lines"], minimum=50)
+        return cfg
+
+    def _get_int_setting(self, key, default, minimum=None):
+        value = self.get_app_setting(key, default)
+        try:
+            value = int(value)
+        except (ValueError, TypeError):
+            logger.warning(f"Geçersiz '{key}' değeri: {value}. Varsayılan kullanılıyor.")
+            value = default
+        return max(minimum, value) if minimum is not None else value
+
+    def get_sync_settings(self):
+        cfg = config.SYNC_SETTINGS_DEFAULT.copy()
+        delta_str = self.get_app_setting("delta_sync_enabled", str(cfg.get("delta_sync_enabled")))
+        cfg["delta_sync_enabled"] = (delta_str == 'True')
+        bulk_fetch_str = self.get_app_setting("erp_bulk_fetch_enabled", str(cfg.get("erp_bulk_fetch_enabled")))
+        cfg["erp_bulk_fetch_enabled"] = (bulk_fetch_str == 'True')
+        cfg["sync_max_workers"] = self._get_int_setting("sync_max_workers", cfg["sync_max_workers"], minimum=1)
+        cfg["erp_fetch_batch_size"] = self._get_int_setting("erp_fetch_batch_size", cfg["erp_fetch_batch_size"], minimum=100)
+        adaptive_str = self.get_app_setting("adaptive_chunk_enabled", str(cfg.get("adaptive_chunk_enabled")))
+        cfg["adaptive_chunk_enabled"] = (adaptive_str == 'True')
+        cfg["chunk_size_max"] = self._get_int_setting("chunk_size_max", cfg["chunk_size_max"], minimum=10)
+        for key in ("erp_incremental_mode", "erp_incremental_stock_column", "erp_incremental_price_column"):
+            cfg[key] = (self.get_app_setting(key, cfg[key]) or cfg[key]).strip()
+        cfg["erp_full_reconcile_minutes"] = self._get_int_setting(
+            "erp_full_reconcile_minutes", cfg["erp_full_reconcile_minutes"], minimum=5
+        )
+        return cfg
+
+    def get_maintenance_settings(self):
+        cfg = config.MAINTENANCE_SETTINGS_DEFAULT.copy()
+        cfg["issue_retention_days"] = self._get_int_setting("issue_retention_days", cfg["issue_retention_days"], minimum=1)
+        cfg["history_retention_days"] = self._get_int_setting("history_retention_days", cfg["history_retention_days"], minimum=1)
+        cfg["maintenance_interval_hours"] = self._get_int_setting(
+            "maintenance_interval_hours", cfg["maintenance_interval_hours"], minimum=1
+        )
+        archive_str = self.get_app_setting("archive_enabled", str(cfg.get("archive_enabled")))
+        cfg["archive_enabled"] = (archive_str == 'True')
+        return cfg
+
+    def get_metrics_settings(self):
+        cfg = config.METRICS_SETTINGS_DEFAULT.copy()
+        enabled_str = self.get_app_setting("metrics_enabled", str(cfg.get("metrics_enabled")))
+        cfg["metrics_enabled"] = (enabled_str == 'True')
+        cfg["metrics_http_port"] = self._get_int_setting("metrics_http_port", cfg["metrics_http_port"], minimum=0)
+        cfg["metrics_bind_address"] = (self.get_app_setting("metrics_bind_address", cfg["metrics_bind_address"])
+                                       or cfg["metrics_bind_address"]).strip()
+        cfg["metrics_textfile_path"] = (self.get_app_setting("metrics_textfile_path", cfg["metrics_textfile_path"]) or "").strip()
+        cfg["metrics_textfile_interval_seconds"] = self._get_int_setting(
+            "metrics_textfile_interval_seconds", cfg["metrics_textfile_interval_seconds"], minimum=1
+        )
+        return cfg
+
+    def get_schedule_settings(self):
+        cfg = config.SCHEDULE_SETTINGS_DEFAULT.copy()
+        enabled_str = self.get_app_setting("auto_sync_enabled", str(cfg.get("auto_sync_enabled")))
+        cfg["auto_sync_enabled"] = (enabled_str == 'True')
+        cfg["sync_overlap_policy"] = self.get_app_setting("sync_overlap_policy", cfg["sync_overlap_policy"]) or cfg["sync_overlap_policy"]
+        cfg["sync_windows"] = self.get_app_setting("sync_windows", cfg["sync_windows"]) or ""
+        stock_lane_str = self.get_app_setting("stock_lane_enabled", str(cfg.get("stock_lane_enabled")))
+        cfg["stock_lane_enabled"] = (stock_lane_str == 'True')
+        cfg["stock_sync_interval_minutes"] = self._get_int_setting(
+            "stock_sync_interval_minutes", cfg["stock_sync_interval_minutes"], minimum=1
+        )
         return cfg
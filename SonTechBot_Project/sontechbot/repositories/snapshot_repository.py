@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 09:10
+# Yapılan Değişiklikler:
+# 1. Delta senkronizasyon için, her (mağaza, barkod) çifti adına Trendyol'a en son gönderilen
+#    stok/fiyat bilgisini tutan 'sync_snapshots' tablosunu yöneten repository sınıfı oluşturuldu.
+
+import datetime
+import hashlib
+import logging
+
+from .base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+def compute_content_hash(item):
+    """Trendyol'a gönderilecek bir ürünün stok ve fiyat bilgisinden kısa bir özet (hash) üretir."""
+    raw = f"{int(item['quantity'])}|{float(item['sellingPrice']):.2f}|{float(item['originalPrice']):.2f}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SnapshotRepository(BaseRepository):
+    """
+    Trendyol'a son başarılı gönderimde iletilen stok ve fiyat bilgilerinin
+    (anlık görüntü) veritabanı işlemlerini yöneten sınıf.
+    """
+
+    def get_snapshots_for_store(self, store_id):
+        """Bir mağaza için kayıtlı tüm anlık görüntüleri barkod -> kayıt sözlüğü olarak döndürür."""
+        query = """
+            SELECT barcode, quantity, selling_price, original_price, content_hash
+            FROM sync_snapshots WHERE store_id = ?
+        """
+        rows = self._execute(query, (str(store_id),), fetch='all')
+        return {row['barcode']: dict(row) for row in rows} if rows else {}
+
+    def save_snapshots(self, store_id, items):
+        """
+        Trendyol'a gönderilen ürünlerin son durumunu kaydeder.
+        'items' listesindeki her eleman, Trendyol'a gönderilen paketteki ürün sözlüğüdür.
+        """
+        if not items:
+            return 0
+        sql = """
+            INSERT INTO sync_snapshots (
+                store_id, barcode, quantity, selling_price,
+                original_price, content_hash, last_pushed_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(store_id, barcode) DO UPDATE SET
+                quantity=excluded.quantity,
+                selling_price=excluded.selling_price,
+                original_price=excluded.original_price,
+                content_hash=excluded.content_hash,
+                last_pushed_at=excluded.last_pushed_at
+        """
+        now_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        params = [
+            (
+                str(store_id), str(item['barcode']), int(item['quantity']),
+                float(item['sellingPrice']), float(item['originalPrice']),
+                compute_content_hash(item), now_str
+            )
+            for item in items
+        ]
+        return self._executemany(sql, params, commit=True)
+
+    def delete_snapshots(self, store_id, barcodes):
+        """
+        Verilen barkodların anlık görüntülerini siler. Böylece bu ürünler
+        bir sonraki döngüde değişmiş kabul edilerek yeniden gönderilir.
+        """
+        if not barcodes:
+            return 0
+        sql = "DELETE FROM sync_snapshots WHERE store_id = ? AND barcode = ?"
+        params = [(str(store_id), str(barcode)) for barcode in barcodes]
+        return self._executemany(sql, params, commit=True)
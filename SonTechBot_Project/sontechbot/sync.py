@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 07:00
+# Yapılan Değişiklikler:
+# 1. Stok kulvarının kendi kilidi olduğu için servis kipi kapanırken stok döngüsünün bitmesi de bekleniyor.
+#
+# Kullanım (SonTechBot_Project klasöründen):
+#   python -m sontechbot.sync                  -> Tek bir senkronizasyon döngüsü çalıştırır ve çıkar
+#   python -m sontechbot.sync --full           -> Delta kontrolü olmadan tüm stoklu ürünleri gönderir
+#   python -m sontechbot.sync --stock          -> Yalnızca stok miktarı değişen ürünlerin stoklarını gönderir
+#   python -m sontechbot.sync --daemon         -> Ayarlardaki aralıkla sürekli çalışır (Ctrl+C ile durur)
+#   python -m sontechbot.sync --daemon --interval 10
+#
+# Çıkış kodları: 0 = başarılı/uyarılarla tamamlandı, 1 = döngü başarısız, 2 = başlatılamadı (lisans, veritabanı)
+
+import argparse
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from sontechbot import config
+from sontechbot.core import licensing_handler, synchronizer
+from sontechbot.core.batch_poller import batch_poller
+from sontechbot.core.maintenance import maintenance_scheduler
+from sontechbot.core.metrics_exporter import metrics_exporter
+from sontechbot.core.scheduler import (AUTO_SYNC_SCOPE, STOCK_SYNC_SCOPE,
+                                      enable_auto_sync, sync_scheduler)
+from sontechbot.repositories import (close_database_connection,
+                                     initialize_database, settings_repo)
+
+logger = logging.getLogger("sontechbot.sync")
+
+SUCCESS_STATUSES = ("Başarılı", "Uyarılarla Tamamlandı")
+VALID_LICENSE_STATUSES = ('valid', 'trial', 'ACTIVE', 'offline')
+# Arayüz için yazılmış durum mesajlarındaki Kivy biçimlendirme etiketleri ([color=...], [b] vb.)
+_MARKUP_PATTERN = re.compile(r"\[/?(?:color|b|i|u|size)(?:=[^\]]*)?\]")
+
+
+def setup_logging(log_level=None):
+    """Konsola ve dönen (rotating) bir log dosyasına yazan loglama sistemini kurar."""
+    os.makedirs(config.LOGS_DIR, exist_ok=True)
+    log_level_str = (log_level or settings_repo.get_app_setting("log_level", "INFO") or "INFO").upper()
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, log_level_str, logging.INFO))
+    if not root_logger.handlers:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(config.LOG_FORMAT))
+        file_handler = RotatingFileHandler(config.SYNC_LOG_FILE, maxBytes=5*1024*1024, backupCount=2, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(config.LOG_FORMAT))
+        root_logger.addHandler(stream_handler)
+        root_logger.addHandler(file_handler)
+
+
+def log_status_message(message):
+    """Senkronizasyon durum mesajlarını, arayüz biçimlendirmesinden arındırarak log'a yazar."""
+    logger.info(_MARKUP_PATTERN.sub("", str(message)))
+
+
+def check_license():
+    if getattr(config, 'DEV_MODE', False):
+        logger.warning("!!! GELİŞTİRİCİ MODU AKTİF: Lisans kontrolü atlandı. !!!")
+        return True
+    result = licensing_handler.check_license_status()
+    if result.get('status') in VALID_LICENSE_STATUSES:
+        return True
+    logger.error(f"Lisans geçerli değil: {result.get('status')} - {result.get('message', '')}")
+    return False
+
+
+def run_once(stop_event, force_full=False, batch_wait_seconds=0, stock_only=False):
+    """
+    Tek bir senkronizasyon döngüsü çalıştırır ('stock_only' True ise hızlı stok döngüsü). 'batch_wait_seconds'
+    verilirse, gönderilen paketlerin sonuçları en fazla bu kadar süre beklenir; bitmeyenler bir sonraki
+    çalıştırmada kontrol edilir.
+    """
+    if stock_only:
+        result = synchronizer.run_stock_sync_cycle(sync_type='cli-stock')
+    else:
+        result = synchronizer.run_single_sync_cycle(sync_type='cli', force_full=force_full)
+    logger.info(f"Senkronizasyon sonucu: {result['status']} - {result['summary_message']}")
+    if batch_wait_seconds > 0 and batch_poller.is_running():
+        logger.info(f"Paket sonuçları en fazla {batch_wait_seconds} sn bekleniyor...")
+        deadline = time.monotonic() + batch_wait_seconds
+        while batch_poller.is_running() and time.monotonic() < deadline and not stop_event.is_set():
+            stop_event.wait(1)
+    return 0 if result['status'] in SUCCESS_STATUSES else 1
+
+
+def run_daemon(stop_event, interval_minutes=None, force_full_first=False):
+    """
+    Senkronizasyonu 'stop_event' ayarlanana kadar 'sync_scheduler' ile planlı olarak çalıştırır. Çalışma
+    zamanları, ayarlardaki aralık ve zaman aralıklarına göre bir önceki planlanan zamandan hesaplanır.
+    """
+    batch_poller.start()
+    maintenance_scheduler.start()
+    next_run = enable_auto_sync(interval_minutes=interval_minutes, remember=False, force_full_first=force_full_first)
+    logger.info(f"Servis kipi: ilk senkronizasyon {next_run.strftime('%Y-%m-%d %H:%M:%S')}.")
+    # Zaman aşımı olmadan beklemek Windows'ta Ctrl+C sinyalinin işlenmesini engeller
+    while not stop_event.wait(1):
+        pass
+    sync_scheduler.stop()
+    while any(sync_scheduler.is_scope_running(scope) for scope in (AUTO_SYNC_SCOPE, STOCK_SYNC_SCOPE)):
+        time.sleep(1)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sontechbot.sync", description=f"{config.APP_TITLE} - arayüzsüz senkronizasyon")
+    parser.add_argument("--daemon", action="store_true", help="Tek döngü yerine, ayarlardaki aralıkla sürekli çalış")
+    parser.add_argument("--interval", type=int, help="Servis kipinde döngü aralığı (dakika). Verilmezse ayarlardan okunur.")
+    parser.add_argument("--full", action="store_true", help="(İlk) döngüde delta kontrolünü atla ve tüm stoklu ürünleri gönder")
+    parser.add_argument("--stock", action="store_true",
+                        help="Tek döngü kipinde yalnızca stok miktarı değişen ürünlerin stoklarını gönder (fiyat okunmaz)")
+    parser.add_argument("--batch-wait", type=int, default=300,
+                        help="Tek döngü kipinde paket sonuçlarının en fazla kaç saniye bekleneceği (0: bekleme)")
+    parser.add_argument("--log-level", help="DEBUG, INFO, WARNING veya ERROR. Verilmezse ayarlardan okunur.")
+    args = parser.parse_args(argv)
+    if args.stock and (args.daemon or args.full):
+        parser.error("--stock, --daemon ve --full ile birlikte kullanılamaz.")
+
+    try:
+        initialize_database()
+    except Exception as e:
+        print(f"Veritabanı başlatılamadı: {e}", file=sys.stderr)
+        return 2
+    setup_logging(args.log_level)
+    logger.info(f"--- {config.APP_TITLE} v{config.APP_VERSION} senkronizasyon servisi başlatıldı ---")
+    if not check_license():
+        close_database_connection()
+        return 2
+
+    synchronizer.set_gui_status_updater(log_status_message)
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.info("Durdurma isteği alındı, devam eden döngü bitince çıkılacak...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    metrics_exporter.start()
+
+    try:
+        if args.daemon:
+            exit_code = run_daemon(stop_event, args.interval, force_full_first=args.full)
+        else:
+            batch_poller.start()
+            exit_code = run_once(stop_event, force_full=args.full, batch_wait_seconds=args.batch_wait, stock_only=args.stock)
+    finally:
+        sync_scheduler.stop()
+        synchronizer.close_trendyol_client()
+        batch_poller.stop()
+        maintenance_scheduler.stop()
+        metrics_exporter.stop()
+        close_database_connection()
+        logger.info("Senkronizasyon servisi durduruldu.")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,9 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 21:30
+# Yapılan Değişiklikler:
+# 1. Senkronizasyon döngüsü sırasında gösterilen yükleniyor penceresi synchronizer modülünden buraya taşındı
+#    ('show_sync_loading_popup' / 'hide_sync_loading_popup'). Fonksiyonlar her iş parçacığından çağrılabilir.
+
 import logging
 
 from kivy.clock import Clock
@@ -181,4 +187,29 @@ class LoadingPopup(ModalView):
             self.animation_event = None
 
     def set_message(self, message):
-        self.message_label.text = message
\ No newline at end of file
+        self.message_label.text = message
+
+
+_sync_loading_popup = None
+
+
+def show_sync_loading_popup(message="İşlem devam ediyor..."):
+    """Senkronizasyon döngüsü başlarken yükleniyor penceresini açar (synchronizer.set_cycle_hooks ile kullanılır)."""
+    def open_popup(dt):
+        global _sync_loading_popup
+        if _sync_loading_popup is None:
+            _sync_loading_popup = LoadingPopup(message=message)
+        else:
+            _sync_loading_popup.set_message(message)
+        _sync_loading_popup.open()
+    Clock.schedule_once(open_popup, 0)
+
+
+def hide_sync_loading_popup():
+    """Senkronizasyon döngüsü bittiğinde yükleniyor penceresini kısa bir gecikmeyle kapatır."""
+    def close_popup(dt):
+        global _sync_loading_popup
+        if _sync_loading_popup:
+            _sync_loading_popup.dismiss()
+            _sync_loading_popup = None
+    Clock.schedule_once(close_popup, 0.5)
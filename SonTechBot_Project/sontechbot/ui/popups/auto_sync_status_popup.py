@@ -1,14 +1,10 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 06.07.2025 07:00
+# Güncelleme Tarihi: 19.10.2026 10:30
 # Yapılan Değişiklikler:
-# 1. 'AttributeError' hatasını çözmek için loglama mantığı güncellendi.
-# 2. 'dashboard = App.get_running_app().root.screen_manager.get_screen(...)' şeklindeki güvensiz erişim kaldırıldı.
-# 3. Tüm log mesajları artık 'synchronizer.update_gui_status()' fonksiyonu üzerinden güvenli bir şekilde gönderiliyor.
-# 4. Bu, popup'ın ana arayüzle olan bağını kopararak daha sağlam bir yapı oluşturur.
+# 1. Zamanlayıcıya geçişten sonra kullanılmayan 'settings_repo' içe aktarması kaldırıldı.
 
 import datetime
 import logging
-import threading
 
 from kivy.app import App
 from kivy.clock import Clock
@@ -16,22 +12,110 @@ from kivy.graphics import Color as KivyColor
 from kivy.graphics import Rectangle
 from kivy.metrics import dp
 from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.togglebutton import ToggleButton
+from kivy.uix.widget import Widget
 from kivy.utils import get_color_from_hex
 
 from ...core import synchronizer
-from ...repositories import history_repo, settings_repo
+from ...core.profiling import (STAGE_BATCH_POLL, STAGE_DB_READ,
+                               STAGE_DB_WRITE, STAGE_ERP_CONNECT,
+                               STAGE_ERP_QUERY, STAGE_LABELS, STAGE_POST,
+                               STAGE_SETTINGS, STAGE_TRANSFORM,
+                               summarize_spans)
+from ...core.scheduler import (AUTO_SYNC_SCOPE, STOCK_SYNC_SCOPE,
+                               disable_auto_sync, enable_auto_sync,
+                               sync_scheduler)
+from ...repositories import history_repo, profile_repo
 from ..helpers import (RENK_BUTON_GRI_ARKA, RENK_BUTON_KIRMIZI_ARKA,
-                       RENK_BUTON_YESIL_ARKA, RENK_HEADER_ARKA,
-                       RENK_HEADER_YAZI, create_section_header,
+                       RENK_BUTON_YESIL_ARKA, RENK_DIVIDER, RENK_HEADER_ARKA,
+                       RENK_HEADER_YAZI, RENK_TEXT_PRIMARY,
+                       RENK_TEXT_SECONDARY, create_section_header,
                        create_styled_button)
 
 logger = logging.getLogger(__name__)
 
+# Şelale çubuklarının adım türüne göre renkleri
+STAGE_COLORS = {
+    STAGE_SETTINGS: get_color_from_hex('#90A4AE'),
+    STAGE_ERP_CONNECT: get_color_from_hex('#8D6E63'),
+    STAGE_ERP_QUERY: get_color_from_hex('#6D4C41'),
+    STAGE_TRANSFORM: get_color_from_hex('#7E57C2'),
+    STAGE_DB_READ: get_color_from_hex('#26A69A'),
+    STAGE_POST: get_color_from_hex('#1E88E5'),
+    STAGE_DB_WRITE: get_color_from_hex('#00897B'),
+    STAGE_BATCH_POLL: get_color_from_hex('#FFA000'),
+}
+
+
+class _WaterfallBar(Widget):
+    """Bir şelale satırının çubuğu: döngü süresine oranla başlangıç konumu ve genişliği çizilir."""
+
+    def __init__(self, start_ratio, width_ratio, color, **kwargs):
+        super().__init__(**kwargs)
+        self.start_ratio = start_ratio
+        self.width_ratio = width_ratio
+        with self.canvas:
+            KivyColor(rgba=RENK_DIVIDER[:3] + [0.3])
+            self.track = Rectangle()
+            KivyColor(rgba=color)
+            self.bar = Rectangle()
+        self.bind(pos=self._redraw, size=self._redraw)
+
+    def _redraw(self, *args):
+        self.track.pos, self.track.size = self.pos, self.size
+        bar_height = self.height * 0.6
+        self.bar.pos = (self.x + self.width * self.start_ratio, self.y + (self.height - bar_height) / 2)
+        self.bar.size = (max(dp(2), self.width * self.width_ratio), bar_height)
+
+
+class CycleWaterfall(BoxLayout):
+    """Bir döngünün profilini (adım, şube) satırlarından oluşan bir şelale grafiği olarak gösterir."""
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', spacing=dp(4), **kwargs)
+        self.title_label = Label(text="Profil kaydı yok.", size_hint_y=None, height=dp(24), color=RENK_TEXT_SECONDARY,
+                                 halign='left', valign='middle')
+        self.title_label.bind(size=self.title_label.setter('text_size'))
+        self.add_widget(self.title_label)
+        scroll = ScrollView(bar_width=dp(8))
+        self.rows_layout = GridLayout(cols=1, spacing=dp(2), size_hint_y=None, row_default_height=dp(22))
+        self.rows_layout.bind(minimum_height=self.rows_layout.setter('height'))
+        scroll.add_widget(self.rows_layout)
+        self.add_widget(scroll)
+
+    def show(self, record):
+        self.rows_layout.clear_widgets()
+        spans = profile_repo.get_spans(record['id']) if record else []
+        if not spans:
+            self.title_label.text = "Bu döngü için profil kaydı yok."
+            return
+        rows = summarize_spans(spans)
+        # Paket sonucu kontrolleri döngü bittikten sonra da sürebildiğinden ölçek en son biten adıma göre alınır
+        total_ms = max(max(row["end_ms"] for row in rows), 1.0)
+        self.title_label.text = (f"{record.get('start_time', '')} - {record.get('sync_type', '')}: "
+                                 f"döngü {record.get('duration_seconds') or 0} sn, ölçek {total_ms / 1000:.2f} sn")
+        for row in rows:
+            label = STAGE_LABELS.get(row["stage"], row["stage"])
+            if row["branch"]:
+                label += f" - {row['branch']}"
+            if row["count"] > 1:
+                label += f" (x{row['count']})"
+            line = BoxLayout(size_hint_y=None, height=dp(22), spacing=dp(6))
+            name_label = Label(text=label, size_hint_x=0.32, font_size=dp(12), color=RENK_TEXT_PRIMARY,
+                               halign='left', valign='middle', shorten=True)
+            name_label.bind(size=name_label.setter('text_size'))
+            line.add_widget(name_label)
+            line.add_widget(_WaterfallBar(row["start_ms"] / total_ms, (row["end_ms"] - row["start_ms"]) / total_ms,
+                                          STAGE_COLORS.get(row["stage"], RENK_DIVIDER), size_hint_x=0.53))
+            line.add_widget(Label(text=f"{row['total_ms'] / 1000:.2f} sn", size_hint_x=0.15, font_size=dp(12),
+                                  color=RENK_TEXT_PRIMARY))
+            self.rows_layout.add_widget(line)
+
 
 class AutoSyncStatusPopup(Popup):
     def __init__(self, **kwargs):
@@ -40,10 +124,9 @@ class AutoSyncStatusPopup(Popup):
         self.size_hint = (0.9, 0.9)
         self.auto_dismiss = False
 
-        self.auto_sync_event = None
-        self.countdown_event = None
-        self.auto_sync_interval = 900
-        self.countdown = 0
+        self.status_event = None
+        self._last_seen_finish = None
+        self._selected_history_id = None
 
         main_layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(15))
         control_panel = BoxLayout(size_hint_y=None, height=dp(60), spacing=dp(10))
@@ -80,11 +163,26 @@ class AutoSyncStatusPopup(Popup):
         history_scroll.add_widget(self.history_layout)
         main_layout.add_widget(history_scroll)
 
+        main_layout.add_widget(create_section_header("Döngü Profili"))
+        self.waterfall = CycleWaterfall(size_hint_y=None, height=dp(220))
+        main_layout.add_widget(self.waterfall)
+
         close_button = create_styled_button("Kapat", self.dismiss, size_hint_y=None, height=dp(45), background_color=RENK_BUTON_GRI_ARKA)
         main_layout.add_widget(close_button)
 
         self.content = main_layout
-        self.bind(on_open=self.load_history)
+        self.bind(on_open=self._on_popup_open, on_dismiss=self._on_popup_dismiss)
+
+    def _on_popup_open(self, *args):
+        self.load_history()
+        self.refresh_status(0)
+        if not self.status_event:
+            self.status_event = Clock.schedule_interval(self.refresh_status, 1)
+
+    def _on_popup_dismiss(self, *args):
+        if self.status_event:
+            self.status_event.cancel()
+            self.status_event = None
 
     def load_history(self, *args):
         self.history_layout.clear_widgets()
@@ -97,13 +195,25 @@ class AutoSyncStatusPopup(Popup):
             except (TypeError, ValueError):
                 start_time = record.get('start_time', 'N/A')
 
-            self.history_layout.add_widget(Label(text=start_time, size_hint_x=col_widths[0]))
+            # Zaman hücresi, döngünün profilini şelale bölümünde açar
+            time_button = Button(text=start_time, size_hint_x=col_widths[0], background_normal='',
+                                 background_color=RENK_DIVIDER[:3] + [0.25], color=RENK_TEXT_PRIMARY)
+            time_button.bind(on_release=lambda instance, r=record: self.show_profile(r))
+            self.history_layout.add_widget(time_button)
             self.history_layout.add_widget(Label(text=record.get('sync_type', 'N/A'), size_hint_x=col_widths[1]))
             self.history_layout.add_widget(Label(text=record.get('status', 'N/A'), size_hint_x=col_widths[2]))
             self.history_layout.add_widget(Label(text=str(record.get('products_processed', '0')), size_hint_x=col_widths[3]))
             self.history_layout.add_widget(Label(text=str(record.get('products_sent', '0')), size_hint_x=col_widths[4]))
             self.history_layout.add_widget(Label(text=record.get('batch_request_id', 'N/A'), size_hint_x=col_widths[5]))
 
+        selected = next((r for r in history if r['id'] == self._selected_history_id), None)
+        self.show_profile(selected or (history[0] if history else None), remember=selected is not None)
+
+    def show_profile(self, record, remember=True):
+        """Döngünün profilini şelale bölümünde gösterir. 'remember' False ise liste yenilenince en son döngüye dönülür."""
+        self._selected_history_id = record['id'] if (record and remember) else None
+        self.waterfall.show(record)
+
     def toggle_auto_sync(self, instance):
         if instance.state == 'down':
             self.start_auto_sync()
@@ -111,59 +221,52 @@ class AutoSyncStatusPopup(Popup):
             self.stop_auto_sync()
 
     def start_auto_sync(self):
-        if self.auto_sync_event:
+        if sync_scheduler.has_job(AUTO_SYNC_SCOPE):
             return
+        dashboard = App.get_running_app().main_screen_manager.get_screen('dashboard_screen')
+        next_run = enable_auto_sync(on_finish_callback=dashboard.update_dashboard_data)
+        interval_minutes = sync_scheduler.get_job_status(AUTO_SYNC_SCOPE)["interval_seconds"] // 60
+        synchronizer.update_gui_status(
+            f"Otomatik senkronizasyon {interval_minutes} dakikada bir çalışacak. İlk çalışma: {next_run.strftime('%H:%M:%S')}"
+        )
+        self.refresh_status(0)
 
-        general_settings = settings_repo.get_general_settings()
-        self.auto_sync_interval = int(general_settings.get('sync_interval_minutes', 15)) * 60
+    def stop_auto_sync(self):
+        disable_auto_sync()
+        synchronizer.update_gui_status("Otomatik senkronizasyon durduruldu.")
+        self.refresh_status(0)
+
+    def refresh_status(self, dt):
+        """Durum, geri sayım ve düğme görünümünü zamanlayıcının güncel durumuna göre günceller."""
+        status = sync_scheduler.get_job_status(AUTO_SYNC_SCOPE)
+        if not status:
+            self.status_label.text = "[b]Durum:[/b] [color=d32f2f]PASİF[/color]"
+            self.countdown_label.text = "Sonraki Çalışma: --:--"
+            self.toggle_button.state = 'normal'
+            self.toggle_button.text = 'Başlat'
+            self.toggle_button.background_color = RENK_BUTON_YESIL_ARKA
+            return
 
-        self.status_label.text = "[b]Durum:[/b] [color=4caf50]AKTİF[/color]"
+        if status["running"]:
+            self.status_label.text = "[b]Durum:[/b] [color=ffa000]ÇALIŞIYOR[/color]"
+        else:
+            self.status_label.text = "[b]Durum:[/b] [color=4caf50]AKTİF[/color]"
+        self.countdown_label.text = f"Sonraki: {self._format_remaining(status['next_run'])}"
+        stock_status = sync_scheduler.get_job_status(STOCK_SYNC_SCOPE)
+        if stock_status:
+            self.countdown_label.text += f"  |  Stok: {self._format_remaining(stock_status['next_run'])}"
+        self.toggle_button.state = 'down'
         self.toggle_button.text = 'Durdur'
         self.toggle_button.background_color = RENK_BUTON_KIRMIZI_ARKA
 
-        # DÜZELTME: Log mesajını merkezi sistem üzerinden gönder.
-        synchronizer.update_gui_status(f"Otomatik senkronizasyon {self.auto_sync_interval // 60} dakikada bir çalışacak.")
-
-        self.auto_sync_callback(0)
-        self.auto_sync_event = Clock.schedule_interval(self.auto_sync_callback, self.auto_sync_interval)
-        self.countdown = self.auto_sync_interval
-        self.countdown_event = Clock.schedule_interval(self.update_countdown_label, 1)
-
-    def stop_auto_sync(self):
-        if self.auto_sync_event:
-            self.auto_sync_event.cancel()
-        if self.countdown_event:
-            self.countdown_event.cancel()
-        self.auto_sync_event = None
-        self.countdown_event = None
-
-        self.status_label.text = "[b]Durum:[/b] [color=d32f2f]PASİF[/color]"
-        self.toggle_button.text = 'Başlat'
-        self.toggle_button.background_color = RENK_BUTON_YESIL_ARKA
-        self.countdown_label.text = "Sonraki Çalışma: --:--"
-
-        # DÜZELTME: Log mesajını merkezi sistem üzerinden gönder.
-        synchronizer.update_gui_status("Otomatik senkronizasyon durduruldu.")
-
-    def update_countdown_label(self, dt):
-        self.countdown -= 1
-        mins, secs = divmod(self.countdown, 60)
-        self.countdown_label.text = f"Sonraki: {mins:02d}:{secs:02d}"
-        if self.countdown <= 0:
-            self.countdown = self.auto_sync_interval
-
-    def auto_sync_callback(self, dt):
-        # DÜZELTME: Log mesajını merkezi sistem üzerinden gönder.
-        synchronizer.update_gui_status("Otomatik senkronizasyon döngüsü başlıyor...")
-
-        def after_sync_tasks():
-            # Senkronizasyon bittikten sonra ana paneldeki verileri ve bu penceredeki geçmişi güncelle.
-            # Bu kısım dolaylı yoldan çalıştığı için güvenlidir.
-            App.get_running_app().main_screen_manager.get_screen('dashboard_screen').update_dashboard_data()
+        finished_times = [s["last_finished"] for s in (status, stock_status) if s and s["last_finished"]]
+        last_finished = max(finished_times) if finished_times else None
+        if last_finished and last_finished != self._last_seen_finish:
+            self._last_seen_finish = last_finished
             self.load_history()
 
-        threading.Thread(
-            target=synchronizer.run_single_sync_cycle,
-            kwargs={'sync_type': 'auto', 'on_finish_callback': after_sync_tasks},
-            daemon=True
-        ).start()
+    @staticmethod
+    def _format_remaining(next_run):
+        remaining = max(0, int((next_run - datetime.datetime.now()).total_seconds()))
+        mins, secs = divmod(remaining, 60)
+        return f"{mins:02d}:{secs:02d}"
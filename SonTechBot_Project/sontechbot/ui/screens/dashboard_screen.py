@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 06.07.2025 06:50
+# Güncelleme Tarihi: 18.10.2026 22:15
 # Yapılan Değişiklikler:
-# 1. 'AttributeError' hatasını çözmek için ekran değiştirme mantığı güncellendi.
-# 2. Ekran değiştirme komutu, artık 'App.get_running_app().main_screen_manager' üzerinden,
-#    ana uygulamada oluşturulan merkezi ve güvenli referansı kullanıyor.
+# 1. Manuel senkronizasyon, otomatik senkronizasyonla aynı kapsam kilidini ('sync_scheduler.run_exclusive')
+#    kullanıyor; bir döngü çalışırken ikinci bir döngü başlatılmaz.
 
+import collections
 import datetime
 import logging
 import random
@@ -15,14 +15,18 @@ from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
 from kivy.uix.screenmanager import Screen
-from kivy.uix.scrollview import ScrollView
 from kivy_garden.graph import BarPlot, Graph
 from kivymd.uix.card import MDCard
 from kivymd.uix.label import MDLabel
 
 from sontechbot.core import synchronizer
-from sontechbot.repositories import dashboard_repo
+from sontechbot.core.scheduler import AUTO_SYNC_SCOPE, sync_scheduler
+from sontechbot.config import GENERAL_SETTINGS_DEFAULT
+from sontechbot.repositories import dashboard_repo, settings_repo
 from sontechbot.ui.helpers import (RENK_BUTON_TURUNCU_ARKA,
                                    RENK_BUTON_YESIL_ARKA, RENK_CARD, RENK_ERROR,
                                    RENK_LOG_ARKA, RENK_LOG_YAZI, RENK_PRIMARY,
@@ -32,12 +36,29 @@ from sontechbot.ui.popups.auto_sync_status_popup import AutoSyncStatusPopup
 
 logger = logging.getLogger(__name__)
 
+LOG_LINE_HEIGHT = dp(22)
+
+
+class LogLine(Label):
+    """İşlem loglarındaki tek bir satır; RecycleView tarafından yeniden kullanılır."""
+
+    def __init__(self, **kwargs):
+        super().__init__(markup=True, color=RENK_LOG_YAZI, halign='left', valign='middle', shorten=True,
+                         size_hint_y=None, height=LOG_LINE_HEIGHT, **kwargs)
+        self.bind(width=lambda instance, width: setattr(instance, 'text_size', (width, None)))
+
 
 class DashboardScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         self.auto_sync_popup = None
+        # Ekranda gösterilen satırlar (halka tampon) ve henüz ekrana aktarılmamış mesajlar
+        self._log_lines = collections.deque(
+            [{'text': '[b]Durum:[/b] Beklemede...'}], maxlen=GENERAL_SETTINGS_DEFAULT["log_max_lines"]
+        )
+        self._pending_log_messages = collections.deque()
+        self._flush_log_trigger = Clock.create_trigger(self._flush_log_messages)
         main_layout = BoxLayout(orientation='vertical', padding=dp(20), spacing=dp(20))
 
         top_panel_layout = BoxLayout(orientation='horizontal', spacing=dp(20), size_hint_y=0.6)
@@ -76,18 +97,28 @@ class DashboardScreen(Screen):
         )
         log_card.add_widget(MDLabel(text="İşlem Logları", theme_text_color="Custom", text_color=RENK_LOG_YAZI, font_style="H6", size_hint_y=None, height=dp(30)))
 
-        self.log_scroll = ScrollView(bar_width=dp(10))
-        self.log_label = MDLabel(text='[b]Durum:[/b] Beklemede...\n', markup=True, theme_text_color="Custom", text_color=RENK_LOG_YAZI, size_hint_y=None)
-        self.log_label.bind(texture_size=self.log_label.setter('size'))
-        self.log_scroll.add_widget(self.log_label)
-        log_card.add_widget(self.log_scroll)
+        self.log_view = RecycleView(bar_width=dp(10), scroll_type=['bars', 'content'])
+        self.log_view.viewclass = LogLine
+        log_layout = RecycleBoxLayout(orientation='vertical', size_hint_y=None,
+                                      default_size=(None, LOG_LINE_HEIGHT), default_size_hint=(1, None))
+        log_layout.bind(minimum_height=log_layout.setter('height'))
+        self.log_view.add_widget(log_layout)
+        self.log_view.data = list(self._log_lines)
+        log_card.add_widget(self.log_view)
 
         main_layout.add_widget(log_card)
         self.add_widget(main_layout)
 
     def on_enter(self, *args):
+        self._apply_log_settings()
         self.update_dashboard_data()
 
+    def _apply_log_settings(self):
+        max_lines = settings_repo.get_general_settings().get("log_max_lines", GENERAL_SETTINGS_DEFAULT["log_max_lines"])
+        if max_lines != self._log_lines.maxlen:
+            self._log_lines = collections.deque(self._log_lines, maxlen=max_lines)
+            self.log_view.data = list(self._log_lines)
+
     def _create_kpi_card(self, title, initial_value):
         card = MDCard(
             orientation='vertical', padding=dp(20), size_hint=(1, 1),
@@ -157,27 +188,49 @@ class DashboardScreen(Screen):
         self.issue_graph.x_labels = [label.replace("_", " ").title() for label in issue_counts.keys()]
 
     def add_log_message(self, message):
-        def update_label(dt):
-            timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-            if "HATA:" in message.upper() or "KRİTİK" in message.upper():
-                color_hex_str = 'D32F2F'
-            elif "UYARI:" in message.upper():
-                color_hex_str = 'FFA000'
-            elif "BAŞARILI" in message.upper():
-                color_hex_str = '4CAF50'
-            else:
-                color_hex_str = 'ECEFF1'
-            colored_message = f"[color={color_hex_str}]{message}[/color]"
-            self.log_label.text += f"[color=808080]{timestamp}[/color] - {colored_message}\n"
-            self.log_scroll.scroll_y = 0
-        Clock.schedule_once(update_label)
+        """
+        Log mesajını kuyruğa ekler ve bir sonraki karede ekrana aktarılmasını ister. Her iş parçacığından
+        çağrılabilir; aynı kare içinde gelen mesajlar tek seferde işlenir.
+        """
+        self._pending_log_messages.append((datetime.datetime.now().strftime('%H:%M:%S'), message))
+        self._flush_log_trigger()
+
+    @staticmethod
+    def _format_log_line(timestamp, message):
+        message_upper = message.upper()
+        if "HATA:" in message_upper or "KRİTİK" in message_upper:
+            color_hex_str = 'D32F2F'
+        elif "UYARI:" in message_upper:
+            color_hex_str = 'FFA000'
+        elif "BAŞARILI" in message_upper:
+            color_hex_str = '4CAF50'
+        else:
+            color_hex_str = 'ECEFF1'
+        return {'text': f"[color=808080]{timestamp}[/color] - [color={color_hex_str}]{message}[/color]"}
+
+    def _flush_log_messages(self, dt):
+        pending = self._pending_log_messages
+        # Tampondan taşacak kadar eski bekleyen mesaj biçimlendirilmeden atlanır
+        overflow = len(pending) - self._log_lines.maxlen
+        for _ in range(max(0, overflow)):
+            pending.popleft()
+        while pending:
+            timestamp, message = pending.popleft()
+            self._log_lines.append(self._format_log_line(timestamp, message))
+        self.log_view.data = list(self._log_lines)
+        self.log_view.scroll_y = 0
 
     def start_manual_sync(self, instance):
         self.add_log_message("Manuel senkronizasyon talebi alındı, başlatılıyor...")
         threading.Thread(target=self._run_sync_and_refresh, daemon=True).start()
 
     def _run_sync_and_refresh(self):
-        synchronizer.run_single_sync_cycle(sync_type='manual', on_finish_callback=self.update_dashboard_data)
+        started = sync_scheduler.run_exclusive(
+            AUTO_SYNC_SCOPE, synchronizer.run_single_sync_cycle,
+            sync_type='manual', on_finish_callback=self.update_dashboard_data
+        )
+        if not started:
+            self.add_log_message("UYARI: Devam eden bir senkronizasyon döngüsü var. Manuel senkronizasyon başlatılmadı.")
 
     def go_to_reports_screen(self, instance):
         # DÜZELTME: Ekran yöneticisine ana uygulamadaki merkezi referans üzerinden eriş.
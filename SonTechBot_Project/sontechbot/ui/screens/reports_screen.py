@@ -1,3 +1,12 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 18.10.2026 20:00
+# Yapılan Değişiklikler:
+# 1. 'Hata Raporları' sekmesi tüm sorunları tek seferde okuyup her satır için ayrı widget'lar oluşturmak yerine
+#    sorunları sayfa sayfa (ISSUES_PAGE_SIZE) okuyor ve RecycleView ile yalnızca ekranda görünen satırları çiziyor.
+#    Liste sonuna kaydırıldıkça bir sonraki sayfa arka planda yüklenir.
+# 2. Sorun türü, şube ve barkod filtreleri eklendi. Filtreleme veritabanında, indeksli sorgularla yapılır.
+# 3. Eski bir yüklemenin sonucu, filtre değiştikten sonra gelirse listeye yazılmaz.
+
 import datetime
 import logging
 import os
@@ -11,17 +20,21 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.checkbox import CheckBox
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.screenmanager import Screen
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.spinner import Spinner
 from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
 
 from ...core import synchronizer
 from ...erp_integrations import ERP12Handler
-from ...repositories import issue_repo, settings_repo
+from ...repositories import branch_repo, issue_repo, settings_repo
 from ..helpers import (RENK_BUTON_GRI_ARKA, RENK_BUTON_MAVI_ARKA,
                        RENK_BUTON_TURUNCU_ARKA, RENK_BUTON_YESIL_ARKA,
                        RENK_HEADER_ARKA, RENK_HEADER_YAZI, RENK_LOG_YAZI,
-                       create_styled_button)
+                       create_styled_button, create_styled_textinput)
 from ..popups.error_reports_popup import ErrorDetailPopup
 
 logger = logging.getLogger(__name__)
@@ -32,6 +45,73 @@ try:
 except ImportError:
     EXCEL_EXPORT_ENABLED = False
 
+ISSUES_PAGE_SIZE = 200
+ISSUE_ROW_HEIGHT = dp(40)
+ISSUE_COL_WIDTHS = [0.15, 0.15, 0.15, 0.15, 0.25, 0.15]
+ALL_TYPES_TEXT = "Tüm Türler"
+ALL_BRANCHES_TEXT = "Tüm Şubeler"
+# Liste sonuna bu orandan fazla yaklaşıldığında sonraki sayfa yüklenir (scroll_y: 1 = en üst, 0 = en alt)
+LOAD_MORE_SCROLL_THRESHOLD = 0.05
+
+
+class IssueRow(RecycleDataViewBehavior, GridLayout):
+    """
+    Sorun listesindeki tek bir satır. RecycleView yalnızca ekranda görünen kadar satır oluşturur ve
+    kaydırıldıkça aynı satırları farklı kayıtlarla yeniden doldurur.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(cols=6, size_hint_y=None, height=ISSUE_ROW_HEIGHT, spacing=dp(5), **kwargs)
+        self.issue = {}
+        self.screen = None
+
+        self.time_label = self._create_label(ISSUE_COL_WIDTHS[0])
+        self.type_label = self._create_label(ISSUE_COL_WIDTHS[1])
+        self.barcode_label = self._create_label(ISSUE_COL_WIDTHS[2])
+        self.branch_label = self._create_label(ISSUE_COL_WIDTHS[3])
+        self.message_label = self._create_label(ISSUE_COL_WIDTHS[4], halign='left', valign='top', shorten=True, ellipsis_options={'color': (1, 0.2, 0.2, 1)})
+        self.message_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width * 0.95, None)))
+        for label in (self.time_label, self.type_label, self.barcode_label, self.branch_label, self.message_label):
+            self.add_widget(label)
+
+        self.action_layout = BoxLayout(orientation='horizontal', size_hint_x=ISSUE_COL_WIDTHS[5], spacing=dp(5))
+        self.detail_button = create_styled_button("Detay", self._on_detail, background_color=RENK_BUTON_MAVI_ARKA, font_size=dp(10), height=dp(30))
+        self.resolve_button = create_styled_button("Çözüldü", self._on_resolve, background_color=RENK_BUTON_YESIL_ARKA, font_size=dp(10), height=dp(30))
+        self.action_layout.add_widget(self.detail_button)
+        self.add_widget(self.action_layout)
+
+    @staticmethod
+    def _create_label(size_hint_x, **kwargs):
+        return Label(font_size=dp(12), color=RENK_LOG_YAZI, size_hint_x=size_hint_x, **kwargs)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.screen = getattr(rv, 'screen', None)
+        self.issue = data['issue']
+        try:
+            formatted_time = datetime.datetime.strptime(self.issue.get("timestamp", ""), '%Y-%m-%d %H:%M:%S').strftime('%d.%m %H:%M')
+        except (ValueError, TypeError):
+            formatted_time = self.issue.get("timestamp", "")
+        self.time_label.text = str(formatted_time)
+        self.type_label.text = str(self.issue.get("issue_type", ""))
+        self.barcode_label.text = str(self.issue.get("barcode", ""))
+        self.branch_label.text = str(self.issue.get("erp_branch_name", ""))
+        self.message_label.text = str(self.issue.get("message", ""))
+
+        show_resolve = not self.issue.get('is_resolved')
+        if show_resolve and self.resolve_button.parent is None:
+            self.action_layout.add_widget(self.resolve_button)
+        elif not show_resolve and self.resolve_button.parent is not None:
+            self.action_layout.remove_widget(self.resolve_button)
+        return super().refresh_view_attrs(rv, index, {})
+
+    def _on_detail(self, instance):
+        if self.screen:
+            self.screen.show_issue_details(self.issue)
+
+    def _on_resolve(self, instance):
+        if self.screen and self.issue.get('id') is not None:
+            self.screen.mark_issue_resolved_handler(self.issue['id'])
+
 
 class ReportsScreen(Screen):
     def __init__(self, **kwargs):
@@ -39,7 +119,9 @@ class ReportsScreen(Screen):
         self.current_filter = 0
         self.price_inputs = {}
         self.unpriced_products = []
-        self.issue_rows = {}
+        self.issues_next_cursor = None
+        self._issues_generation = 0
+        self._issues_loading = False
 
         main_layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
         tab_panel = TabbedPanel(do_default_tab=False, tab_width=dp(200), tab_pos='top_left')
@@ -57,6 +139,7 @@ class ReportsScreen(Screen):
         self.add_widget(main_layout)
 
     def on_enter(self, *args):
+        self.load_issue_filter_options()
         self.load_issues()
         self.load_unpriced_products()
 
@@ -71,11 +154,23 @@ class ReportsScreen(Screen):
         filter_layout.add_widget(self.all_btn)
         layout.add_widget(filter_layout)
 
+        search_layout = BoxLayout(size_hint_y=None, height=dp(45), spacing=dp(10))
+        self.issue_type_spinner = Spinner(text=ALL_TYPES_TEXT, values=[ALL_TYPES_TEXT], size_hint_x=0.3)
+        self.issue_branch_spinner = Spinner(text=ALL_BRANCHES_TEXT, values=[ALL_BRANCHES_TEXT], size_hint_x=0.3)
+        self.issue_type_spinner.bind(text=lambda *a: self.load_issues())
+        self.issue_branch_spinner.bind(text=lambda *a: self.load_issues())
+        self.barcode_filter_input = create_styled_textinput(hint_text="Barkod ile ara", size_hint_x=0.25)
+        self.barcode_filter_input.bind(on_text_validate=lambda *a: self.load_issues())
+        search_layout.add_widget(self.issue_type_spinner)
+        search_layout.add_widget(self.issue_branch_spinner)
+        search_layout.add_widget(self.barcode_filter_input)
+        search_layout.add_widget(create_styled_button("Filtrele", lambda x: self.load_issues(), background_color=RENK_BUTON_MAVI_ARKA, size_hint_x=0.15, height=dp(45)))
+        layout.add_widget(search_layout)
+
         header_layout = GridLayout(cols=6, size_hint_y=None, height=dp(40), spacing=dp(5))
         headers = ["Zaman", "Tür", "Barkod", "Şube", "Mesaj", "Aksiyonlar"]
-        col_widths = [0.15, 0.15, 0.15, 0.15, 0.25, 0.15]
         for i, text in enumerate(headers):
-            header_label = Label(text=text, color=RENK_HEADER_YAZI, font_size=dp(14), bold=True, size_hint_x=col_widths[i], halign='center')
+            header_label = Label(text=text, color=RENK_HEADER_YAZI, font_size=dp(14), bold=True, size_hint_x=ISSUE_COL_WIDTHS[i], halign='center')
             with header_label.canvas.before:
                 Color(rgba=RENK_HEADER_ARKA)
                 header_label.rect = Rectangle(size=header_label.size, pos=header_label.pos)
@@ -83,11 +178,18 @@ class ReportsScreen(Screen):
             header_layout.add_widget(header_label)
         layout.add_widget(header_layout)
 
-        scrollview = ScrollView(size_hint=(1, 1), bar_width=dp(10))
-        self.issues_layout = GridLayout(cols=1, spacing=dp(2), size_hint_y=None, row_default_height=dp(40))
-        self.issues_layout.bind(minimum_height=self.issues_layout.setter('height'))
-        scrollview.add_widget(self.issues_layout)
-        layout.add_widget(scrollview)
+        self.issues_rv = RecycleView(size_hint=(1, 1), bar_width=dp(10), scroll_type=['bars', 'content'])
+        self.issues_rv.screen = self
+        self.issues_rv.viewclass = IssueRow
+        issues_layout = RecycleBoxLayout(orientation='vertical', spacing=dp(2), size_hint_y=None,
+                                         default_size=(None, ISSUE_ROW_HEIGHT), default_size_hint=(1, None))
+        issues_layout.bind(minimum_height=issues_layout.setter('height'))
+        self.issues_rv.add_widget(issues_layout)
+        self.issues_rv.bind(scroll_y=self._on_issues_scroll)
+        layout.add_widget(self.issues_rv)
+
+        self.issues_status_label = Label(text="", font_size=dp(12), color=RENK_LOG_YAZI, size_hint_y=None, height=dp(25))
+        layout.add_widget(self.issues_status_label)
         return layout
 
     def set_filter(self, filter_type):
@@ -97,67 +199,109 @@ class ReportsScreen(Screen):
         self.all_btn.md_bg_color = RENK_BUTON_MAVI_ARKA if filter_type == 2 else RENK_BUTON_GRI_ARKA
         self.load_issues()
 
+    def load_issue_filter_options(self):
+        if hasattr(self, 'issue_type_spinner'):
+            threading.Thread(target=self._run_load_issue_filter_options, daemon=True).start()
+
+    def _run_load_issue_filter_options(self):
+        issue_types = issue_repo.get_issue_types()
+        branch_names = sorted({m.get('erp_branch_name') for m in branch_repo.get_all_branch_mappings() if m.get('erp_branch_name')})
+
+        def apply_options(dt):
+            self.issue_type_spinner.values = [ALL_TYPES_TEXT] + issue_types
+            self.issue_branch_spinner.values = [ALL_BRANCHES_TEXT] + branch_names
+        Clock.schedule_once(apply_options)
+
+    def _get_issue_filters(self):
+        """Ekrandaki filtre seçimlerini 'issue_repo.get_issues_page' parametrelerine çevirir."""
+        issue_type = self.issue_type_spinner.text
+        branch_name = self.issue_branch_spinner.text
+        return {
+            "is_resolved": {0: False, 1: True}.get(self.current_filter),
+            "issue_type": issue_type if issue_type != ALL_TYPES_TEXT else None,
+            "branch_name": branch_name if branch_name != ALL_BRANCHES_TEXT else None,
+            "barcode": self.barcode_filter_input.text.strip() or None,
+        }
+
     def load_issues(self, *args):
-        if hasattr(self, 'issues_layout'):
-            threading.Thread(target=self._run_load_issues, daemon=True).start()
-
-    def _run_load_issues(self):
-        if self.current_filter == 0:
-            issues_to_load = issue_repo.get_all_unresolved_issues()
-        elif self.current_filter == 1:
-            issues_to_load = issue_repo.get_all_resolved_issues()
-        else:
-            issues_to_load = issue_repo.get_all_issues()
-        Clock.schedule_once(lambda dt: self.populate_issues_ui(issues_to_load))
-
-    def populate_issues_ui(self, issues_to_load):
-        self.issues_layout.clear_widgets()
-        self.issue_rows.clear()
-        if not issues_to_load:
-            self.issues_layout.add_widget(Label(text="Gösterilecek sorun bulunamadı.", size_hint_y=None, height=dp(50)))
+        """Listeyi seçili filtrelerle baştan (ilk sayfadan) yükler."""
+        if not hasattr(self, 'issues_rv'):
+            return
+        self._issues_generation += 1
+        self.issues_next_cursor = None
+        self._issues_loading = True
+        self.issues_status_label.text = "Yükleniyor..."
+        threading.Thread(
+            target=self._run_load_issues, args=(self._issues_generation, self._get_issue_filters(), None), daemon=True
+        ).start()
+
+    def load_more_issues(self):
+        """Bir sonraki sayfayı mevcut listenin sonuna ekler."""
+        if self._issues_loading or not self.issues_next_cursor:
+            return
+        self._issues_loading = True
+        threading.Thread(
+            target=self._run_load_issues,
+            args=(self._issues_generation, self._get_issue_filters(), self.issues_next_cursor), daemon=True
+        ).start()
+
+    def _run_load_issues(self, generation, filters, cursor):
+        issues, next_cursor = issue_repo.get_issues_page(cursor=cursor, limit=ISSUES_PAGE_SIZE, **filters)
+        Clock.schedule_once(lambda dt: self.populate_issues_ui(generation, issues, next_cursor, append=cursor is not None))
+
+    def populate_issues_ui(self, generation, issues, next_cursor, append=False):
+        # Bu arada filtre değiştiyse sonuç artık geçersizdir
+        if generation != self._issues_generation:
             return
+        self._issues_loading = False
+        self.issues_next_cursor = next_cursor
+        new_data = [{'issue': issue} for issue in issues]
+        if append:
+            self.issues_rv.data.extend(new_data)
+        else:
+            self.issues_rv.data = new_data
+            self.issues_rv.scroll_y = 1
+        self._update_issues_status_label()
+
+    def _update_issues_status_label(self):
+        count = len(self.issues_rv.data)
+        if not count:
+            self.issues_status_label.text = "Gösterilecek sorun bulunamadı."
+        elif self.issues_next_cursor:
+            self.issues_status_label.text = f"{count} kayıt gösteriliyor. Daha fazlası için listeyi aşağı kaydırın."
+        else:
+            self.issues_status_label.text = f"{count} kayıt gösteriliyor."
 
-        col_widths = [0.15, 0.15, 0.15, 0.15, 0.25, 0.15]
-        for issue in issues_to_load:
-            row = GridLayout(cols=6, size_hint_y=None, height=dp(40), spacing=dp(5))
-            try:
-                formatted_time = datetime.datetime.strptime(issue.get("timestamp", ""), '%Y-%m-%d %H:%M:%S').strftime('%d.%m %H:%M')
-            except (ValueError, TypeError):
-                formatted_time = issue.get("timestamp", "")
-
-            row.add_widget(Label(text=formatted_time, font_size=dp(12), color=RENK_LOG_YAZI, size_hint_x=col_widths[0]))
-            row.add_widget(Label(text=str(issue.get("issue_type", "")), font_size=dp(12), color=RENK_LOG_YAZI, size_hint_x=col_widths[1]))
-            row.add_widget(Label(text=str(issue.get("barcode", "")), font_size=dp(12), color=RENK_LOG_YAZI, size_hint_x=col_widths[2]))
-            row.add_widget(Label(text=str(issue.get("erp_branch_name", "")), font_size=dp(12), color=RENK_LOG_YAZI, size_hint_x=col_widths[3]))
-            msg_label = Label(text=str(issue.get("message", "")), font_size=dp(12), color=RENK_LOG_YAZI, size_hint_x=col_widths[4], halign='left', valign='top', shorten=True, ellipsis_options={'color': (1, 0.2, 0.2, 1)})
-            msg_label.bind(width=lambda instance, width: setattr(instance, 'text_size', (width * 0.95, None)))
-            row.add_widget(msg_label)
-
-            action_layout = BoxLayout(orientation='horizontal', size_hint_x=col_widths[5], spacing=dp(5))
-            detail_button = create_styled_button("Detay", lambda x, i=issue: self.show_issue_details(i), background_color=RENK_BUTON_MAVI_ARKA, font_size=dp(10), height=dp(30))
-            action_layout.add_widget(detail_button)
-
-            if not issue.get('is_resolved'):
-                resolve_button = create_styled_button("Çözüldü", lambda x, issue_id=issue['id'], r_widget=row: self.mark_issue_resolved_handler(issue_id, r_widget), background_color=RENK_BUTON_YESIL_ARKA, font_size=dp(10), height=dp(30))
-                action_layout.add_widget(resolve_button)
-            row.add_widget(action_layout)
-
-            self.issues_layout.add_widget(row)
-            self.issue_rows[issue['id']] = row
+    def _on_issues_scroll(self, instance, scroll_y):
+        if scroll_y <= LOAD_MORE_SCROLL_THRESHOLD:
+            self.load_more_issues()
 
     def show_issue_details(self, issue_data):
         ErrorDetailPopup(issue_data=issue_data).open()
 
-    def mark_issue_resolved_handler(self, issue_id, row_widget):
-        threading.Thread(target=self._run_mark_resolved_in_background, args=(issue_id, row_widget), daemon=True).start()
+    def mark_issue_resolved_handler(self, issue_id):
+        threading.Thread(target=self._run_mark_resolved_in_background, args=(issue_id,), daemon=True).start()
 
-    def _run_mark_resolved_in_background(self, issue_id, row_widget):
+    def _run_mark_resolved_in_background(self, issue_id):
         if issue_repo.mark_issue_resolved(issue_id):
-            Clock.schedule_once(lambda dt: self.issues_layout.remove_widget(row_widget))
+            Clock.schedule_once(lambda dt: self._on_issue_resolved(issue_id))
         else:
             dashboard = App.get_running_app().root.screen_manager.get_screen('dashboard_screen')
             Clock.schedule_once(lambda dt: dashboard.add_log_message(f"HATA: ID {issue_id} çözüldü olarak işaretlenemedi."))
 
+    def _on_issue_resolved(self, issue_id):
+        for index, entry in enumerate(self.issues_rv.data):
+            if entry['issue'].get('id') != issue_id:
+                continue
+            if self.current_filter == 0:
+                # Çözülmemişler listesinde çözülen kayıt listeden çıkar
+                self.issues_rv.data.pop(index)
+            else:
+                entry['issue']['is_resolved'] = 1
+                self.issues_rv.refresh_from_data()
+            break
+        self._update_issues_status_label()
+
     def build_unpriced_products_tab(self):
         from ..helpers import create_styled_textinput
         layout = BoxLayout(orientation='vertical', spacing=dp(10))
@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 09:00
+# Güncelleme Tarihi: 19.10.2026 02:15
 # Yapılan Değişiklikler:
-# 1. Kullanıcının isteği doğrultusunda, arayüzü basitleştirmek için 'Kategori Eşleştirme' ve 'Marka Eşleştirme' bölümleri tamamen kaldırıldı.
-# 2. 'AttributeError' hatasını çözmek için, Trendyol'dan kategori ve marka listelerini çeken kodlar kaldırıldı.
-# 3. Kod, sadece temel ERP ve API ayarları ile Şube yönetimine odaklanacak şekilde yeniden düzenlendi.
+# 1. 'Genel Ayarlar' sekmesine metrik yayını (açık/kapalı, HTTP portu, dinleme adresi, metrik dosyası) eklendi.
+#    Metrik ayarları değiştiyse yayın kaydettikten sonra yeni ayarlarla yeniden başlatılır.
 
 import logging
 import threading
@@ -22,6 +21,10 @@ from kivy.uix.spinner import Spinner
 from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelHeader
 
 from ...core import synchronizer
+from ...core.metrics_exporter import metrics_exporter
+from ...core.scheduler import (AUTO_SYNC_SCOPE, OVERLAP_QUEUE, OVERLAP_SKIP,
+                               enable_auto_sync, parse_schedule_windows,
+                               sync_scheduler)
 from ...ecommerce_integrations.trendyol_handler import TrendyolGoAPI
 from ...erp_integrations import ERP12Handler
 from ...repositories import branch_repo, settings_repo
@@ -31,6 +34,8 @@ from ..helpers import (RENK_BUTON_YESIL_ARKA, SPINNER_PLACEHOLDER_TEXTS,
 
 logger = logging.getLogger(__name__)
 
+OVERLAP_POLICY_TEXTS = {OVERLAP_SKIP: "Yeni çalışmayı atla", OVERLAP_QUEUE: "Bitince bir kez daha çalıştır"}
+
 
 class SettingsScreen(Screen):
     def __init__(self, **kwargs):
@@ -137,6 +142,26 @@ class SettingsScreen(Screen):
 
         self.sync_interval_input = create_styled_textinput(text="15", input_filter='int')
         create_form_row(form, 'Otomatik Senk. Aralığı (Dakika):', self.sync_interval_input)
+        self.sync_max_workers_input = create_styled_textinput(text="4", input_filter='int')
+        create_form_row(form, 'Paralel Şube Sayısı:', self.sync_max_workers_input)
+        self.log_max_lines_input = create_styled_textinput(text="500", input_filter='int')
+        create_form_row(form, 'Log Satır Sınırı:', self.log_max_lines_input)
+        self.overlap_policy_spinner = Spinner(text=OVERLAP_POLICY_TEXTS[OVERLAP_SKIP], values=list(OVERLAP_POLICY_TEXTS.values()), size_hint_y=None, height=dp(45))
+        create_form_row(form, 'Döngü Çakışırsa:', self.overlap_policy_spinner)
+        self.sync_windows_input = create_styled_textinput(hint_text="Örn: 1-6 09:00-22:00=5; 22:00-09:00=60")
+        create_form_row(form, 'Zaman Aralıkları (gün SS:DD-SS:DD=dk):', self.sync_windows_input)
+        self.stock_lane_checkbox = CheckBox(active=False)
+        create_form_row(form, 'Hızlı Stok Senk. Aktif:', self.stock_lane_checkbox)
+        self.stock_sync_interval_input = create_styled_textinput(text="2", input_filter='int')
+        create_form_row(form, 'Stok Senk. Aralığı (Dakika):', self.stock_sync_interval_input)
+        self.metrics_enabled_checkbox = CheckBox(active=False)
+        create_form_row(form, 'Metrik Yayını Aktif:', self.metrics_enabled_checkbox)
+        self.metrics_port_input = create_styled_textinput(text="9464", input_filter='int')
+        create_form_row(form, 'Metrik HTTP Portu (0 = kapalı):', self.metrics_port_input)
+        self.metrics_bind_address_input = create_styled_textinput(text="127.0.0.1")
+        create_form_row(form, 'Metrik Dinleme Adresi:', self.metrics_bind_address_input)
+        self.metrics_textfile_input = create_styled_textinput(hint_text="Örn: C:\\node_exporter\\textfile\\sontechbot.prom")
+        create_form_row(form, 'Metrik Dosyası (isteğe bağlı):', self.metrics_textfile_input)
 
         layout.add_widget(form)
         layout.add_widget(Label(size_hint_y=1))
@@ -156,6 +181,9 @@ class SettingsScreen(Screen):
         erp_cfg = settings_repo.get_erp_config()
         trendyol_cfg = settings_repo.get_trendyol_config()
         general_cfg = settings_repo.get_general_settings()
+        general_cfg.update(settings_repo.get_sync_settings())
+        general_cfg.update(settings_repo.get_schedule_settings())
+        general_cfg.update(settings_repo.get_metrics_settings())
         self.selected_price_list_id = settings_repo.get_app_setting("selected_trendyol_price_list_id")
         
         Clock.schedule_once(lambda dt: self.populate_static_settings(erp_cfg, trendyol_cfg, general_cfg))
@@ -177,6 +205,16 @@ class SettingsScreen(Screen):
         self.test_mode_checkbox.active = trendyol_cfg.get('test_mode_enabled', True)
         
         self.sync_interval_input.text = str(general_cfg.get('sync_interval_minutes') or '15')
+        self.sync_max_workers_input.text = str(general_cfg.get('sync_max_workers') or '4')
+        self.log_max_lines_input.text = str(general_cfg.get('log_max_lines') or '500')
+        self.overlap_policy_spinner.text = OVERLAP_POLICY_TEXTS.get(general_cfg.get('sync_overlap_policy'), OVERLAP_POLICY_TEXTS[OVERLAP_SKIP])
+        self.sync_windows_input.text = general_cfg.get('sync_windows') or ''
+        self.stock_lane_checkbox.active = general_cfg.get('stock_lane_enabled', False)
+        self.stock_sync_interval_input.text = str(general_cfg.get('stock_sync_interval_minutes') or '2')
+        self.metrics_enabled_checkbox.active = general_cfg.get('metrics_enabled', False)
+        self.metrics_port_input.text = str(general_cfg.get('metrics_http_port', 9464))
+        self.metrics_bind_address_input.text = general_cfg.get('metrics_bind_address') or '127.0.0.1'
+        self.metrics_textfile_input.text = general_cfg.get('metrics_textfile_path') or ''
 
     def test_erp_connection_and_load_lists(self, instance):
         erp_config = {
@@ -278,12 +316,28 @@ class SettingsScreen(Screen):
             "trendyol_supplier_id": self.trendyol_supplier_id_input.text.strip(),
             "trendyol_test_mode_enabled": str(self.test_mode_checkbox.active),
             "selected_trendyol_price_list_id": self.selected_price_list_id,
-            "sync_interval_minutes": self.sync_interval_input.text.strip() or "15"
+            "sync_interval_minutes": self.sync_interval_input.text.strip() or "15",
+            "sync_max_workers": self.sync_max_workers_input.text.strip() or "4",
+            "log_max_lines": self.log_max_lines_input.text.strip() or "500",
+            "sync_overlap_policy": next((k for k, v in OVERLAP_POLICY_TEXTS.items() if v == self.overlap_policy_spinner.text), OVERLAP_SKIP),
+            "sync_windows": self.sync_windows_input.text.strip(),
+            "stock_lane_enabled": str(self.stock_lane_checkbox.active),
+            "stock_sync_interval_minutes": self.stock_sync_interval_input.text.strip() or "2",
+            "metrics_enabled": str(self.metrics_enabled_checkbox.active),
+            "metrics_http_port": self.metrics_port_input.text.strip() or "0",
+            "metrics_bind_address": self.metrics_bind_address_input.text.strip() or "127.0.0.1",
+            "metrics_textfile_path": self.metrics_textfile_input.text.strip()
         }
+        try:
+            parse_schedule_windows(settings_data["sync_windows"])
+        except ValueError as e:
+            synchronizer.update_gui_status(f"UYARI: {e} Zaman aralıkları kaydedilmedi.")
+            settings_data["sync_windows"] = None
         threading.Thread(target=self._run_save_settings, args=(settings_data,), daemon=True).start()
 
     def _run_save_settings(self, settings_data):
         try:
+            previous_metrics_settings = settings_repo.get_metrics_settings()
             for key, value in settings_data.items():
                 if value is not None:
                     settings_repo.save_app_setting(key, value)
@@ -298,6 +352,12 @@ class SettingsScreen(Screen):
                 }
                 branch_repo.add_or_update_branch_mapping(branch_data)
 
+            if sync_scheduler.has_job(AUTO_SYNC_SCOPE):
+                dashboard = App.get_running_app().main_screen_manager.get_screen('dashboard_screen')
+                enable_auto_sync(on_finish_callback=dashboard.update_dashboard_data)
+            metrics_settings = settings_repo.get_metrics_settings()
+            if metrics_settings != previous_metrics_settings:
+                metrics_exporter.restart(metrics_settings)
             synchronizer.update_gui_status("Tüm ayarlar başarıyla kaydedildi.")
         except Exception as e:
             logger.error("Ayarlar kaydedilirken hata oluştu.", exc_info=True)
@@ -1,10 +1,7 @@
 # -*- coding: utf-8 -*-
-# Güncelleme Tarihi: 08.07.2025 05:35
+# Güncelleme Tarihi: 19.10.2026 02:15
 # Yapılan Değişiklikler:
-# 1. Bu dosya, projenin tüm özelliklerini içeren son, tam ve kararlı sürümüdür.
-# 2. Sistem tepsisi, otomatik başlatma, pasif lisanslama ve otomatik ODBC sürücüsü algılama özellikleri entegre edilmiştir.
-# 3. Tüm bilinen hatalar ('AttributeError', 'KeyError', 'NameError', 'TypeError') düzeltilmiştir.
-# 4. Kodun her bölümüne, ne işe yaradığını açıklayan detaylı Türkçe yorumlar eklenmiştir.
+# 1. Ayarlarda açıksa senkronizasyon metrikleri (Prometheus/OpenMetrics) uygulama açıkken yayınlanır.
 
 import os
 import sys
@@ -42,10 +39,15 @@ from pystray import MenuItem as TrayMenuItem
 # --- Proje İçi Modüller ---
 from sontechbot import config
 from sontechbot.core import licensing_handler, synchronizer
+from sontechbot.core.batch_poller import batch_poller
+from sontechbot.core.maintenance import maintenance_scheduler
+from sontechbot.core.metrics_exporter import metrics_exporter
+from sontechbot.core.scheduler import restore_auto_sync, sync_scheduler
 from sontechbot.repositories import (close_database_connection,
                                      initialize_database, settings_repo)
 from sontechbot.ui.helpers import (LoadingPopup, RENK_ANA_ARKA_PLAN,
-                                   RENK_PRIMARY)
+                                   RENK_PRIMARY, hide_sync_loading_popup,
+                                   show_sync_loading_popup)
 from sontechbot.ui.popups.license_activation_popup import \
     LicenseActivationPopup
 from sontechbot.ui.screens.dashboard_screen import DashboardScreen
@@ -187,6 +189,15 @@ class SonTechBotGUIApp(MDApp):
         
         dashboard = self.main_screen_manager.get_screen('dashboard_screen')
         synchronizer.set_gui_status_updater(dashboard.add_log_message)
+        synchronizer.set_cycle_hooks(on_cycle_start=show_sync_loading_popup, on_cycle_end=hide_sync_loading_popup)
+        # Önceki oturumdan sonucu beklenen paketler varsa takibine devam edilir
+        batch_poller.start()
+        # Eski kayıtların arşivlenmesi ve veritabanı sıkıştırması arka planda periyodik olarak yapılır
+        maintenance_scheduler.start()
+        # Merkezi izleme için metrik uç noktası / dosyası (ayarlarda açıksa)
+        metrics_exporter.start()
+        if restore_auto_sync(on_finish_callback=dashboard.update_dashboard_data):
+            dashboard.add_log_message("Otomatik senkronizasyon önceki oturumdaki planıyla sürdürülüyor.")
         
         logger.info("Uygulama arayüzü başarıyla başlatıldı.")
         root.sidebar.change_screen('dashboard_screen', 'Ana Panel')
@@ -236,6 +247,11 @@ class SonTechBotGUIApp(MDApp):
     def on_stop(self):
         """Uygulama kapatılırken çalışan son fonksiyondur."""
         logger.info("Uygulama kapatılıyor...")
+        sync_scheduler.stop()
+        synchronizer.close_trendyol_client()
+        batch_poller.stop()
+        maintenance_scheduler.stop()
+        metrics_exporter.stop()
         close_database_connection()
         logger.info("Veritabanı bağlantısı kapatıldı. Çıkış yapıldı.")
 
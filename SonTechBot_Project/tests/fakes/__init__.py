@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 11:00
+# Yapılan Değişiklikler:
+# 1. Testlerin ortak bekleme yardımcısı ('wait_until') dışa aktarıldı.
+#
+# Trendyol GO API'si ve ERP 12 için çevrimdışı çalışan yerel taklitler (test ve benchmark'lar için).
+
+from .synthetic_erp import SyntheticERP, SyntheticERPHandler
+from .temp_database import TemporaryDatabase
+from .trendyol_server import FakeTrendyolServer
+from .waiting import wait_until
+
+__all__ = ["FakeTrendyolServer", "SyntheticERP", "SyntheticERPHandler", "TemporaryDatabase", "wait_until"]
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 07:00
+# Yapılan Değişiklikler:
+# 1. Stok miktarları, ERP12Handler gibi barkod başına 'ERPStockRow' (miktar, grup kodu) olarak döndürülüyor.
+#
+# ERP 12 bağlantısı olmadan senkronizasyon döngülerini çalıştırmak için sentetik bir ERP veri kaynağı.
+# Ürün satırları 'ERPProductRow' şemasındadır. Aynı tohum (seed) her seferinde aynı kataloğu, stokları ve
+# fiyatları üretir. 'mutate' ile ürünlerin bir kısmının stok ve fiyatı değiştirilebilir (delta ve artımlı
+# okuma ölçümleri için).
+#
+# Kullanım:
+#   erp = SyntheticERP(product_count=10000, branch_count=4)
+#   synchronizer.set_erp_handler_factory(erp.handler_factory())
+
+import functools
+import random
+import threading
+
+from sontechbot.erp_integrations.erp12_handler import ERPProductRow, ERPStockRow, branch_product_key
+
+VAT_RATES = (1, 10, 20)
+UNITS = ("ADET", "KG", "PAKET")
+FIRST_LOCATION_ID = 101
+FIRST_PRICE_LIST_ID = 201
+
+
+class SyntheticERP:
+    """
+    Bellekte üretilen, deterministik bir ERP veri kaynağı. Şube stokları ve fiyatları, ürün ve lokasyon
+    ID'lerinden hesaplandığı için saklanmaz; yalnızca 'mutate' ile değiştirilen ürünlerin sürümleri tutulur.
+
+    - 'zero_stock_rate': Şubelerde stoğu 0 olan ürünlerin oranı (gerçek sorgu gibi bu ürünler döndürülmez).
+    - 'unpriced_rate': Fiyat listesinde fiyatı 0 olan ürünlerin oranı ("Fiyatsız Ürün" sorunları için).
+    """
+
+    def __init__(self, product_count, branch_count=1, category_count=40, brand_count=150,
+                 zero_stock_rate=0.1, unpriced_rate=0.0, seed=0):
+        self.product_count = int(product_count)
+        self.branch_count = int(branch_count)
+        self.category_count = max(1, int(category_count))
+        self.brand_count = max(1, int(brand_count))
+        self.zero_stock_rate = zero_stock_rate
+        self.unpriced_rate = unpriced_rate
+        self.seed = int(seed)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._versions = {}
+        self.handler_count = 0
+
+    def branch_maps(self):
+        """'branch_repo.add_or_update_branch_mapping' ile kaydedilebilecek şube eşleştirmelerini döndürür."""
+        return [{
+            "erp_branch_name": f"Şube {i + 1:02d}", "erp_location_id": str(FIRST_LOCATION_ID + i),
+            "erp_price_list_id": str(FIRST_PRICE_LIST_ID + i), "stock_buffer": 0,
+            "trendyol_store_id": str(900000 + i + 1), "is_active": True
+        } for i in range(self.branch_count)]
+
+    def categories(self):
+        """'category_repo.add_or_update_category_rule' ile kaydedilebilecek, senkronizasyonu açık kategori kurallarını döndürür."""
+        return [{
+            "erp_category_id": self._category_name(i), "erp_category_name": self._category_name(i),
+            "sync_enabled": True, "price_adjustment_percentage": 0.0
+        } for i in range(self.category_count)]
+
+    def handler_factory(self):
+        """'synchronizer.set_erp_handler_factory' için ERP12Handler yerine geçen fabrika fonksiyonu."""
+        return functools.partial(SyntheticERPHandler, self)
+
+    def mutate(self, fraction, seed=None):
+        """
+        Ürünlerin 'fraction' oranındaki kısmının tüm şubelerdeki stok ve fiyatını değiştirir.
+        Değişen ürün ID'lerini döndürür; bu ürünler sonraki su seviyesi sorgusunda değişmiş görünür.
+        """
+        count = min(self.product_count, int(round(self.product_count * fraction)))
+        rng = random.Random(seed) if seed is not None else self._random
+        product_ids = rng.sample(range(1, self.product_count + 1), count)
+        with self._lock:
+            self._generation += 1
+            for product_id in product_ids:
+                self._versions[product_id] = self._generation
+        return set(product_ids)
+
+    @staticmethod
+    def _category_name(index):
+        return f"GRUP {index + 1:03d}"
+
+    def _hash(self, product_id, location_id, salt):
+        version = self._versions.get(product_id, 0)
+        value = (product_id * 2654435761 + location_id * 40503 + version * 1013904223
+                 + salt * 97 + self.seed * 69069) & 0xFFFFFFFF
+        # xorshift karıştırması: ardışık ID'ler için düzgün dağılım
+        value ^= (value << 13) & 0xFFFFFFFF
+        value ^= value >> 17
+        value ^= (value << 5) & 0xFFFFFFFF
+        return value
+
+    def catalog_row(self, product_id):
+        """Ürünün katalog sütunlarını (stok ve fiyat hariç) 'ERPProductRow' sırasıyla döndürür."""
+        return (
+            product_id, f"STK{product_id:07d}", f"Sentetik Ürün {product_id}", f"869{product_id:010d}",
+            UNITS[product_id % len(UNITS)], VAT_RATES[product_id % len(VAT_RATES)],
+            self._category_name(product_id % self.category_count), f"Marka {product_id % self.brand_count + 1}", 1
+        )
+
+    def quantity(self, product_id, location_id):
+        value = self._hash(product_id, location_id, 1)
+        if (value % 10000) < self.zero_stock_rate * 10000:
+            return 0
+        return 1 + (value >> 14) % 250
+
+    def price(self, product_id, price_list_id):
+        value = self._hash(product_id, price_list_id, 2)
+        if (value % 10000) < self.unpriced_rate * 10000:
+            return 0.0
+        return round(5 + ((value >> 14) % 150000) / 100, 2)
+
+    def rows_for_branch(self, location_id, price_list_id, product_ids=None):
+        """
+        Şubenin ürün satırlarını üretir. Gerçek sorgular gibi, 'product_ids' verilmezse yalnızca stoklu ürünler,
+        verilirse bu ürünlerin tamamı (stoğu 0 olanlar dahil) döndürülür.
+        """
+        ids = sorted(product_ids) if product_ids is not None else range(1, self.product_count + 1)
+        for product_id in ids:
+            if not 1 <= product_id <= self.product_count:
+                continue
+            quantity = self.quantity(product_id, location_id)
+            if quantity <= 0 and product_ids is None:
+                continue
+            yield ERPProductRow(*self.catalog_row(product_id), quantity, self.price(product_id, price_list_id))
+
+    def changed_since(self, generation):
+        with self._lock:
+            return {product_id for product_id, version in self._versions.items() if version > generation}
+
+    @property
+    def generation(self):
+        return self._generation
+
+
+class SyntheticERPHandler:
+    """
+    'SyntheticERP' verisini ERP12Handler'ın senkronizasyonda kullanılan metotlarıyla sunar.
+    Su seviyesi, 'mutate' çağrılarının sayısıdır; artımlı okuma kipi ve sütun ayarları yok sayılır.
+    """
+
+    def __init__(self, erp, erp_config_override=None):
+        self.erp = erp
+        self.erp_config = erp_config_override or {}
+        with erp._lock:
+            erp.handler_count += 1
+
+    @staticmethod
+    def _branch_ids(branch_map):
+        try:
+            return int(branch_map.get("erp_location_id")), int(branch_map.get("erp_price_list_id"))
+        except (ValueError, TypeError):
+            return None
+
+    def test_connection(self):
+        return True, "Bağlantı başarılı!"
+
+    def iter_product_batches_for_branch(self, branch_map, batch_size=None):
+        ids = self._branch_ids(branch_map)
+        if ids is None:
+            return
+        batch_size = int(batch_size or 5000)
+        batch = []
+        for row in self.erp.rows_for_branch(*ids):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def get_products_from_erp_for_branch(self, branch_map):
+        return [row for batch in self.iter_product_batches_for_branch(branch_map) for row in batch]
+
+    def get_products_from_erp_for_branches(self, branch_maps, product_ids=None, batch_size=None):
+        products_by_branch = {}
+        for branch_map in branch_maps:
+            ids = self._branch_ids(branch_map)
+            if ids is not None:
+                products_by_branch[branch_product_key(branch_map)] = list(
+                    self.erp.rows_for_branch(*ids, product_ids=product_ids))
+        return products_by_branch
+
+    def get_stock_quantities_for_branches(self, branch_maps):
+        quantities_by_location = {}
+        for branch_map in branch_maps:
+            ids = self._branch_ids(branch_map)
+            if ids is not None:
+                quantities_by_location[str(ids[0])] = {
+                    row.barcode1: ERPStockRow(row.erp_stock_quantity, row.erp_grup_kod) for row in self.erp.rows_for_branch(*ids)
+                }
+        return quantities_by_location
+
+    def get_change_watermark(self, mode):
+        return str(self.erp.generation)
+
+    def get_changed_product_ids(self, mode, since, stock_column=None, price_column=None):
+        try:
+            return self.erp.changed_since(int(since))
+        except (ValueError, TypeError):
+            return None
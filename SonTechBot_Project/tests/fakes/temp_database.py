@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 05:30
+# Yapılan Değişiklikler:
+# 1. Testlerin uygulama veritabanına dokunmadan geçici bir SQLite dosyasıyla çalışması için 'TemporaryDatabase'
+#    oluşturuldu.
+
+import os
+import shutil
+import tempfile
+
+from sontechbot.repositories import close_database_connection, initialize_database
+from sontechbot.repositories.base_repository import BaseRepository
+
+
+class TemporaryDatabase:
+    """
+    Tüm repository'leri geçici bir klasördeki yeni bir veritabanına yönlendirir ve tabloları oluşturur.
+    'stop' ile bağlantılar kapatılır, önceki veritabanı yolu geri yüklenir ve geçici klasör silinir.
+    """
+
+    def __init__(self):
+        self._folder = None
+        self._previous_path = None
+
+    def start(self):
+        close_database_connection()
+        self._folder = tempfile.mkdtemp(prefix="sontechbot-test-")
+        self._previous_path = BaseRepository.db_path
+        BaseRepository.db_path = os.path.join(self._folder, "test.db")
+        initialize_database()
+        return self
+
+    def stop(self):
+        close_database_connection()
+        BaseRepository.db_path = self._previous_path
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 00:45
+# Yapılan Değişiklikler:
+# 1. Trendyol GO API'sinin senkronizasyonda kullanılan uç noktalarını (fiyat-stok, paket sonucu, depolar,
+#    kategoriler, markalar) taklit eden yerel bir HTTP sunucusu oluşturuldu. Gecikme, hız sınırı (429) ve
+#    ürün bazlı başarısızlık oranları ayarlanabilir; gelen istek, bayt ve ürün sayıları sayılır.
+#
+# Kullanım:
+#   with FakeTrendyolServer(latency_seconds=0.05, throttle_rate=0.02, failure_rate=0.01) as server:
+#       api = TrendyolGoAPI(server.supplier_id, server.api_key, server.api_secret, None,
+#                           base_url_override=server.base_url)
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_ITEMS_PER_REQUEST = 1000
+
+_ROUTES = [
+    ("POST", "price-and-inventory",
+     re.compile(r"^/integrator/product/grocery/suppliers/(?P<supplier_id>[^/]+)/products/price-and-inventory$")),
+    ("GET", "batch-requests",
+     re.compile(r"^/integrator/product/grocery/suppliers/(?P<supplier_id>[^/]+)/batch-requests/(?P<batch_id>[^/]+)$")),
+    ("GET", "warehouses", re.compile(r"^/integrator/suppliers/(?P<supplier_id>[^/]+)/warehouses$")),
+    ("GET", "categories", re.compile(r"^/integrator/product/grocery/categories$")),
+    ("GET", "brands", re.compile(r"^/integrator/product/grocery/brands$")),
+]
+
+
+def _error_body(message):
+    return {"errors": [{"message": message}]}
+
+
+class _FakeTrendyolRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive: istemcinin bağlantı havuzu gerçek sunucudaki gibi yeniden kullanılabilsin
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+
+        for route_method, endpoint, pattern in _ROUTES:
+            match = pattern.match(url.path)
+            if match and route_method == method:
+                break
+        else:
+            endpoint, match = None, None
+
+        status, payload, headers = fake.handle(method, endpoint, match.groupdict() if match else {},
+                                               parse_qs(url.query), body, self.headers)
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        fake._record_response(endpoint, len(body), len(data))
+
+
+class FakeTrendyolServer:
+    """
+    Trendyol GO API'sinin yerel, bellek içi bir taklidi. 127.0.0.1 üzerinde boş bir portta çalışır.
+
+    - 'latency_seconds': Her isteğe eklenen yanıt gecikmesi.
+    - 'throttle_rate': İsteklerin bu oranı 'Retry-After' başlığıyla 429 döner.
+    - 'failure_rate': Gönderilen ürünlerin bu oranı, paket sonucunda FAILURE olarak işaretlenir.
+    - 'processing_polls': Bir paket, bu kadar sorgulamada IN_PROGRESS döner, sonra COMPLETED olur.
+    Aynı 'seed' ile aynı istek sırası aynı 429/FAILURE kararlarını üretir.
+    """
+
+    def __init__(self, supplier_id="100001", api_key="fake-api-key", api_secret="fake-api-secret",
+                 latency_seconds=0.0, throttle_rate=0.0, failure_rate=0.0, processing_polls=0,
+                 retry_after_seconds=1, category_count=300, brand_count=600, seed=0):
+        self.supplier_id = str(supplier_id)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency_seconds = latency_seconds
+        self.throttle_rate = throttle_rate
+        self.failure_rate = failure_rate
+        self.processing_polls = processing_polls
+        self.retry_after_seconds = retry_after_seconds
+        self.category_count = category_count
+        self.brand_count = brand_count
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._batches = {}
+        self._httpd = None
+        self._thread = None
+        self.reset_stats()
+
+    @property
+    def base_url(self):
+        if not self._httpd:
+            raise RuntimeError("Sahte Trendyol sunucusu başlatılmadı.")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        if self._httpd:
+            return self
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FakeTrendyolRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-trendyol", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join(5)
+        self._httpd, self._thread = None, None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                "requests": 0, "requests_by_endpoint": {}, "bytes_in": 0, "bytes_out": 0,
+                "items_received": 0, "items_failed": 0, "throttled": 0, "batches": 0
+            }
+
+    def get_stats(self):
+        """Son 'reset_stats' çağrısından bu yana biriken sayaçların bir kopyasını döndürür."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["requests_by_endpoint"] = dict(self._stats["requests_by_endpoint"])
+        return stats
+
+    def _record_response(self, endpoint, bytes_in, bytes_out):
+        with self._lock:
+            self._stats["requests"] += 1
+            key = endpoint or "unknown"
+            self._stats["requests_by_endpoint"][key] = self._stats["requests_by_endpoint"].get(key, 0) + 1
+            self._stats["bytes_in"] += bytes_in
+            self._stats["bytes_out"] += bytes_out
+
+    def handle(self, method, endpoint, path_params, query, body, headers):
+        """Bir isteği işler ve (durum kodu, JSON gövdesi, ek başlıklar) döndürür."""
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if endpoint is None:
+            return 404, _error_body("Kaynak bulunamadı."), {}
+        if headers.get("api-key") != self.api_key or headers.get("x-api-secret-key") != self.api_secret:
+            return 401, _error_body("Geçersiz API anahtarı."), {}
+        if "supplier_id" in path_params and path_params["supplier_id"] != self.supplier_id:
+            return 403, _error_body("Tedarikçiye erişim yetkisi yok."), {}
+        with self._lock:
+            throttled = self.throttle_rate and self._random.random() < self.throttle_rate
+            if throttled:
+                self._stats["throttled"] += 1
+        if throttled:
+            return 429, _error_body("Too many requests."), {"Retry-After": str(self.retry_after_seconds)}
+
+        handler = getattr(self, "_handle_" + endpoint.replace("-", "_"))
+        return handler(path_params, query, body)
+
+    def _handle_price_and_inventory(self, path_params, query, body):
+        try:
+            items = json.loads(body or b"{}").get("items")
+        except (ValueError, AttributeError):
+            items = None
+        if not isinstance(items, list) or not items:
+            return 400, _error_body("'items' listesi boş veya geçersiz."), {}
+        if len(items) > MAX_ITEMS_PER_REQUEST:
+            return 413, _error_body(f"Tek istekte en fazla {MAX_ITEMS_PER_REQUEST} ürün gönderilebilir."), {}
+
+        results = []
+        with self._lock:
+            for item in items:
+                reasons = self._validate_item(item)
+                if not reasons and self.failure_rate and self._random.random() < self.failure_rate:
+                    reasons = ["Ürün mağazada bulunamadı."]
+                results.append({"requestItem": item, "status": "FAILURE" if reasons else "SUCCESS",
+                                "failureReasons": reasons})
+            batch_id = str(uuid.uuid4())
+            self._batches[batch_id] = {"items": results, "polls_left": self.processing_polls}
+            self._stats["items_received"] += len(items)
+            self._stats["items_failed"] += sum(1 for r in results if r["status"] == "FAILURE")
+            self._stats["batches"] += 1
+        return 200, {"batchRequestId": batch_id}, {}
+
+    @staticmethod
+    def _validate_item(item):
+        reasons = []
+        if not isinstance(item, dict) or not str(item.get("barcode") or "").strip():
+            return ["Barkod boş olamaz."]
+        if not isinstance(item.get("quantity"), int) or item["quantity"] < 0:
+            reasons.append("Stok miktarı geçersiz.")
+        for key in ("sellingPrice", "originalPrice"):
+            if not isinstance(item.get(key), (int, float)) or item[key] <= 0:
+                reasons.append(f"'{key}' sıfırdan büyük olmalıdır.")
+        if not item.get("storeId"):
+            reasons.append("Mağaza ID'si boş olamaz.")
+        return reasons
+
+    def _handle_batch_requests(self, path_params, query, body):
+        batch_id = path_params["batch_id"]
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return 404, _error_body(f"Paket bulunamadı: {batch_id}"), {}
+            if batch["polls_left"] > 0:
+                batch["polls_left"] -= 1
+                return 200, {"batchRequestId": batch_id, "status": "IN_PROGRESS", "items": []}, {}
+        return 200, {"batchRequestId": batch_id, "status": "COMPLETED", "items": batch["items"]}, {}
+
+    def _handle_warehouses(self, path_params, query, body):
+        return 200, [{"id": 1, "name": "Merkez Depo"}], {}
+
+    @staticmethod
+    def _page(query, total):
+        page = int(query.get("page", ["0"])[0])
+        size = int(query.get("size", ["200"])[0])
+        return range(page * size, min(total, (page + 1) * size))
+
+    def _handle_categories(self, path_params, query, body):
+        return 200, [{"id": i + 1, "name": f"Kategori {i + 1}"} for i in self._page(query, self.category_count)], {}
+
+    def _handle_brands(self, path_params, query, body):
+        return 200, {"brands": [{"id": i + 1, "name": f"Marka {i + 1}"} for i in self._page(query, self.brand_count)]}, {}
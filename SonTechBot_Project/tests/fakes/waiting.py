@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 11:00
+# Yapılan Değişiklikler:
+# 1. Arka plan iş parçacıklarını bekleyen testlerin ortak kullandığı 'wait_until' yardımcısı buraya taşındı.
+
+import time
+
+
+def wait_until(condition, timeout=5.0, interval=0.01):
+    """'condition' doğru dönene ya da 'timeout' saniye dolana kadar bekler; koşulun son değerini döndürür."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return condition()
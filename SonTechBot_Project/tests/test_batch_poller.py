@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 11:00
+# Yapılan Değişiklikler:
+# 1. 'wait_until' yardımcısı 'tests.fakes' içinden kullanılıyor.
+#
+# Paket sonucu kontrol servisinin eksik Trendyol ayarlarında beklemeye devam etmesi ve sürekli hata veren
+# paketleri 'max_attempts' denemeden sonra takipten çıkarması için testler.
+
+import unittest
+
+from sontechbot.core.batch_poller import BatchStatusPoller
+from sontechbot.repositories import batch_repo
+from tests.fakes import TemporaryDatabase, wait_until
+
+
+class FakeStatusClient:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.checked = []
+
+    def check_batch_request_status(self, batch_request_id):
+        self.checked.append(batch_request_id)
+        if self.error:
+            raise self.error
+        return self.response
+
+    def close(self):
+        pass
+
+
+class BatchPollerTest(unittest.TestCase):
+    def setUp(self):
+        self.database = TemporaryDatabase().start()
+        self.poller = BatchStatusPoller(initial_delay=0.01, max_delay=0.05, max_attempts=3, max_workers=1)
+
+    def tearDown(self):
+        self.poller.stop()
+        self.database.stop()
+
+    def test_missing_config_is_retried_instead_of_stopping(self):
+        client = FakeStatusClient(response={"status": "COMPLETED", "items": []})
+        clients = [None, None, client]
+        self.poller._create_api_client = lambda: clients.pop(0) if len(clients) > 1 else clients[0]
+        batch_repo.add_pending_batch("B1", "Şube", "900001", ["869"], first_check_delay=0)
+
+        self.poller.start()
+
+        self.assertTrue(wait_until(lambda: batch_repo.count_pending_batches() == 0))
+        self.assertEqual(client.checked, ["B1"])
+
+    def test_failing_status_requests_expire_after_max_attempts(self):
+        client = FakeStatusClient(error=RuntimeError("bağlantı kesildi"))
+        batch_repo.add_pending_batch("B2", "Şube", "900001", ["869"], first_check_delay=0)
+        batch = batch_repo.get_due_batches()[0]
+
+        for attempts in range(self.poller.max_attempts - 1):
+            self.poller._check_batch(client, dict(batch, attempts=attempts))
+            self.assertEqual(batch_repo.count_pending_batches(), 1)
+        self.poller._check_batch(client, dict(batch, attempts=self.poller.max_attempts - 1))
+
+        self.assertEqual(batch_repo.count_pending_batches(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
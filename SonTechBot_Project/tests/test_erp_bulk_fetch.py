@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 05:00
+# Yapılan Değişiklikler:
+# 1. Toplu sorgunun sonuç kümesi sırası (katalog, fiyatlar, stoklar) ve parça parça okunması için güncellendi.
+#
+# Toplu ERP sorgusunun sonuçlarını şubelere dağıtan 'get_products_from_erp_for_branches' için testler.
+# Aynı lokasyonu farklı fiyat listeleriyle kullanan şubelerin her biri kendi fiyatlarını almalıdır.
+#
+# Çalıştırma (SonTechBot_Project klasöründen):
+#   python -m unittest discover -s tests
+
+import unittest
+
+from sontechbot.erp_integrations.erp12_handler import ERP12Handler, branch_product_key
+
+
+class FakeCursor:
+    """Sırayla verilen sonuç kümelerini pyodbc imleci gibi döndüren imleç."""
+
+    def __init__(self, result_sets):
+        self._result_sets = [list(rows) for rows in result_sets]
+        self._index = 0
+        self.arraysize = 1
+        self.fast_executemany = False
+        self.executed = []
+        self.fetch_sizes = []
+
+    def execute(self, sql, *params):
+        self.executed.append((sql, params))
+        return self
+
+    def executemany(self, sql, params):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        rows, self._result_sets[self._index] = self._result_sets[self._index], []
+        return rows
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        rows = self._result_sets[self._index][:size]
+        self._result_sets[self._index] = self._result_sets[self._index][size:]
+        return rows
+
+    def nextset(self):
+        self._index += 1
+        return self._index < len(self._result_sets)
+
+
+def make_handler(result_sets):
+    handler = ERP12Handler.__new__(ERP12Handler)
+    handler.conn, handler.cursor, handler.connect_timings = None, None, []
+    handler.erp_config = {}
+    cursor = FakeCursor(result_sets)
+
+    def connect():
+        handler.cursor = cursor
+        return True
+
+    handler._connect_erp_db = connect
+    handler._close_erp_db = lambda: None
+    return handler
+
+
+def catalog_row(product_id):
+    return (product_id, f"STK{product_id}", f"Ürün {product_id}", f"869{product_id:010d}", "ADET", 20, "GRUP 1", "Marka", 1)
+
+
+class BulkFetchTest(unittest.TestCase):
+    def setUp(self):
+        catalog = [catalog_row(1), catalog_row(2)]
+        prices = [(1, 201, 10.0), (2, 201, 20.0), (1, 202, 11.0), (2, 202, 22.0), (1, 203, 30.0)]
+        stocks = [(1, 101, 5), (1, 102, 7), (2, 101, 3)]
+        self.handler = make_handler([catalog, prices, stocks])
+
+    def test_branches_sharing_location_get_their_own_price_list(self):
+        branches = [
+            {"erp_branch_name": "A", "erp_location_id": "101", "erp_price_list_id": "201"},
+            {"erp_branch_name": "B", "erp_location_id": "101", "erp_price_list_id": "202"},
+            {"erp_branch_name": "C", "erp_location_id": "102", "erp_price_list_id": "203"},
+        ]
+        result = self.handler.get_products_from_erp_for_branches(branches)
+
+        prices = {branch["erp_branch_name"]: {row.erp_product_id: (row.erp_stock_quantity, row.price)
+                                              for row in result[branch_product_key(branch)]}
+                  for branch in branches}
+        self.assertEqual(prices["A"], {1: (5, 10.0), 2: (3, 20.0)})
+        self.assertEqual(prices["B"], {1: (5, 11.0), 2: (3, 22.0)})
+        self.assertEqual(prices["C"], {1: (7, 30.0)})
+
+    def test_invalid_branch_ids_are_skipped(self):
+        self.assertIsNone(branch_product_key({"erp_location_id": "abc", "erp_price_list_id": "201"}))
+        result = self.handler.get_products_from_erp_for_branches([{"erp_location_id": None, "erp_price_list_id": "201"}])
+        self.assertEqual(result, {})
+
+    def test_result_sets_are_read_in_batches(self):
+        branch = {"erp_location_id": "101", "erp_price_list_id": "201"}
+        result = self.handler.get_products_from_erp_for_branches([branch], batch_size=1)
+        self.assertEqual(len(result[branch_product_key(branch)]), 2)
+        self.assertEqual(set(self.handler.cursor.fetch_sizes), {1})
+
+    def test_empty_incremental_read_returns_empty_lists(self):
+        branch = {"erp_location_id": "101", "erp_price_list_id": "201"}
+        self.assertEqual(self.handler.get_products_from_erp_for_branches([branch], product_ids=set()),
+                         {branch_product_key(branch): []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 10:00
+# Yapılan Değişiklikler:
+# 1. Bakım işinin yalnızca saklama süresi dolmuş kayıtları (sorunlarda yalnızca çözülmüşleri) arşivleyip
+#    silmesi, arşiv dosyalarının tam olarak silinen kayıtları içermesi ve sayaç tablolarının silmelerden sonra
+#    tutarlı kalması için testler.
+
+import datetime
+import glob
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from sontechbot import config
+from sontechbot.core.maintenance import run_maintenance
+from sontechbot.repositories import history_repo, issue_repo, maintenance_repo
+from tests.fakes import TemporaryDatabase
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def days_ago(days, utc=False):
+    now = datetime.datetime.utcnow() if utc else datetime.datetime.now()
+    return (now - datetime.timedelta(days=days)).strftime(DATETIME_FORMAT)
+
+
+def read_archive(prefix, folder):
+    rows = []
+    for path in glob.glob(os.path.join(folder, f"{prefix}_*.jsonl.gz")):
+        with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+            rows.extend(json.loads(line) for line in archive_file)
+    return rows
+
+
+class MaintenanceTest(unittest.TestCase):
+    def setUp(self):
+        self.database = TemporaryDatabase().start()
+        self.archive_dir = tempfile.mkdtemp(prefix="sontechbot-archive-")
+        patcher = mock.patch.object(config, "ARCHIVE_DIR", self.archive_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.database.stop()
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def _add_issue(self, product_id, issue_type, timestamp, resolved):
+        issue_repo.add_sync_issues_bulk([{"erp_product_id": product_id, "barcode": f"869{product_id}",
+                                          "erp_branch_name": "Merkez", "issue_type": issue_type, "message": "test"}])
+        issue_repo._execute("UPDATE sync_issues SET timestamp = ?, is_resolved = ? WHERE erp_product_id = ?",
+                            (timestamp, int(resolved), str(product_id)), commit=True)
+
+    def _add_history(self, start_time, sync_type="auto", status="Başarılı"):
+        return history_repo.add_sync_history_entry({"start_time": start_time, "duration_seconds": 1.0,
+                                                    "sync_type": sync_type, "status": status,
+                                                    "summary_message": sync_type})
+
+    def _rows(self, query):
+        return [tuple(row) for row in maintenance_repo._execute(query, fetch='all') or []]
+
+    def test_only_expired_rows_are_archived_and_deleted(self):
+        self._add_issue(1, "Fiyatsız Ürün", days_ago(40, utc=True), resolved=True)
+        self._add_issue(2, "Fiyatsız Ürün", days_ago(40, utc=True), resolved=False)
+        self._add_issue(3, "Fiyatsız Ürün", days_ago(10, utc=True), resolved=True)
+        self._add_issue(4, "Barkod Hatası", days_ago(40, utc=True), resolved=True)
+        old_full = self._add_history(days_ago(100), status="Kritik Hata")
+        old_stock = self._add_history(days_ago(100), sync_type="auto-stock")
+        self._add_history(days_ago(10))
+        self._add_history(days_ago(1), status="Uyarılarla Tamamlandı")
+
+        report = run_maintenance(force=True)
+
+        self.assertEqual((report["issues_archived"], report["history_archived"]), (2, 2))
+        self.assertEqual(self._rows("SELECT erp_product_id FROM sync_issues ORDER BY id"), [("2",), ("3",)])
+        archived_issues = read_archive("sync_issues", self.archive_dir)
+        self.assertEqual(sorted(row["erp_product_id"] for row in archived_issues), ["1", "4"])
+        self.assertTrue(all(row["is_resolved"] == 1 for row in archived_issues))
+        archived_history = read_archive("sync_history", self.archive_dir)
+        self.assertEqual(sorted(row["id"] for row in archived_history), sorted([old_full, old_stock]))
+        self.assertEqual(len(self._rows("SELECT id FROM sync_history")), 2)
+
+    def test_counters_stay_consistent_after_deletes(self):
+        for product_id in range(1, 7):
+            self._add_issue(product_id, "Fiyatsız Ürün" if product_id % 2 else "Barkod Hatası",
+                            days_ago(40 if product_id < 5 else 1, utc=True), resolved=product_id % 3 != 0)
+        for days, status in ((100, "Başarılı"), (100, "Kritik Hata"), (5, "Kritik Hata"), (0, "Başarılı")):
+            self._add_history(days_ago(days), status=status)
+        self._add_history(days_ago(100), sync_type="auto-stock", status="Kritik Hata")
+
+        run_maintenance(force=True)
+
+        self.assertEqual(
+            sorted(self._rows("SELECT issue_type, is_resolved, count FROM issue_counters WHERE count > 0")),
+            sorted(self._rows("SELECT COALESCE(issue_type, ''), is_resolved, COUNT(*) FROM sync_issues "
+                              "GROUP BY COALESCE(issue_type, ''), is_resolved")))
+        self.assertEqual(
+            sorted(self._rows("SELECT bucket_hour, total, successful FROM sync_health_buckets WHERE total > 0")),
+            sorted(self._rows("SELECT substr(start_time, 1, 13) || ':00:00', COUNT(*), "
+                              "SUM(status IN ('Başarılı', 'Uyarılarla Tamamlandı')) FROM sync_history "
+                              "WHERE sync_type NOT LIKE '%stock' GROUP BY substr(start_time, 1, 13)")))
+        self.assertEqual(self._rows("SELECT COUNT(*) FROM sync_health_buckets WHERE total < 0"), [(0,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
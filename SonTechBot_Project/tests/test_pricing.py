@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 11:30
+# Yapılan Değişiklikler:
+# 1. Kural testleri ile NumPy eşitlik testleri arasındaki eksik boş satır eklendi.
+#
+# Fiyat kurallarının öncelik sırası, kademeli yuvarlama, yuvarlamadan önce uygulanan en düşük/en yüksek
+# fiyat sınırı ve kategori eşleştirmesi test edilir.
+#
+# Fiyatlandırmanın NumPy (vektörel) yolu ile düz Python yolunun aynı sonucu verdiği de doğrulanır:
+# 2 haneye yuvarlama, kategori filtresi, boş/sıfır/negatif fiyatlar ve 255/256 satır sınırı.
+
+import random
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from sontechbot.core import pricing
+from sontechbot.erp_integrations.erp12_handler import ERPProductRow
+
+CATEGORY_RULES = [
+    {"erp_category_id": "GIDA", "sync_enabled": True, "price_adjustment_percentage": 12.5},
+    {"erp_category_id": "ICECEK", "sync_enabled": True, "price_adjustment_percentage": None},
+    {"erp_category_id": "KOZMETIK", "sync_enabled": True, "price_adjustment_percentage": -10},
+    {"erp_category_id": "TEMIZLIK", "sync_enabled": False, "price_adjustment_percentage": 5},
+]
+PRICING_RULES = [
+    {"id": 1, "priority": 0, "erp_category_id": "GIDA", "adjustment_percentage": 3, "rounding_mode": "x99"},
+    {"id": 2, "priority": 0, "erp_marka_adi": "Marka B", "adjustment_amount": 1.5, "rounding_mode": "tiered",
+     "min_price": 5, "max_price": 395},
+    {"id": 4, "priority": 0, "erp_category_id": "KOZMETIK", "rounding_mode": "x99", "min_price": 20, "max_price": 20},
+    {"id": 3, "priority": 5, "barcode": "8690000000007", "adjustment_amount": -2000},
+]
+BRANCH = {"erp_branch_name": "Merkez", "stock_buffer": 2}
+
+
+def make_products(count, seed=1):
+    """Kenar durumları (boş/sayısal barkod, boş/sıfır/negatif fiyat, kuralı olmayan kategori) içeren ürünler."""
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        barcode = f"869{i:010d}"
+        price = round(rng.uniform(0.5, 600), 3)
+        quantity = rng.randint(0, 50)
+        if i % 11 == 0:
+            barcode = rng.choice(["", None, f" {barcode} ", 8690000000000 + i])
+        if i % 7 == 0:
+            price = rng.choice([None, 0, -3.5, Decimal("12.345"), 2.675, 1.005])
+        if i % 13 == 0:
+            quantity = rng.choice([None, Decimal("3.7"), -1, 0])
+        group = rng.choice(["GIDA", "ICECEK", "KOZMETIK", "TEMIZLIK", "TANIMSIZ", None])
+        brand = rng.choice(["Marka A", "Marka B", None])
+        products.append(ERPProductRow(i, f"STK{i}", f"Ürün {i}", barcode, "ADET", 20, group, brand, 1, quantity, price))
+    return products
+
+
+def price_of(compiled, price, barcode="8690000000001", group="GIDA", brand="Marka A", branch=BRANCH):
+    """Tek bir ürünün gönderilecek fiyatını döndürür (gönderilmiyorsa None)."""
+    product = ERPProductRow(1, "STK1", "Ürün 1", barcode, "ADET", 20, group, brand, 1, 10, price)
+    result = compiled.price_batch([product], branch)
+    return result.send_prices[0] if result.send_prices else None
+
+
+class PricingRuleTest(unittest.TestCase):
+    def _compile(self, *pricing_rules):
+        return pricing.compile_pricing_rules([{"erp_category_id": "GIDA", "sync_enabled": True}],
+                                             [dict({"id": i + 1}, **rule) for i, rule in enumerate(pricing_rules)])
+
+    def test_tiered_rounding_examples(self):
+        compiled = self._compile({"rounding_mode": "tiered"})
+        for price, expected in ((4.32, 4.39), (12.30, 12.99), (123.40, 129.99), (10.0, 9.99), (100.0, 99.99)):
+            with self.subTest(price=price):
+                self.assertEqual(price_of(compiled, price), expected)
+
+    def test_x99_keeps_whole_prices(self):
+        compiled = self._compile({"rounding_mode": "x99"})
+        self.assertEqual(price_of(compiled, 12.30), 12.99)
+        self.assertEqual(price_of(compiled, 13.0), 12.99)
+
+    def test_more_specific_rule_wins_at_equal_priority(self):
+        compiled = self._compile(
+            {"adjustment_amount": 1},
+            {"erp_marka_adi": "Marka A", "adjustment_amount": 2},
+            {"erp_category_id": "GIDA", "adjustment_amount": 3},
+            {"erp_marka_adi": "Marka A", "erp_category_id": "GIDA", "adjustment_amount": 4},
+            {"barcode": "8690000000001", "adjustment_amount": 5},
+        )
+        self.assertEqual(price_of(compiled, 10), 15)
+        self.assertEqual(price_of(compiled, 10, barcode="8690000000002"), 14)
+        self.assertEqual(price_of(compiled, 10, barcode="8690000000002", brand="Marka B"), 13)
+        self.assertEqual(price_of(compiled, 10, barcode="8690000000002", group="ICECEK"), None)
+        compiled = self._compile({"adjustment_amount": 1}, {"erp_marka_adi": "Marka A", "adjustment_amount": 2})
+        self.assertEqual(price_of(compiled, 10, brand="Marka B"), 11)
+
+    def test_priority_beats_specificity_and_branch_rule_beats_global(self):
+        compiled = self._compile(
+            {"barcode": "8690000000001", "adjustment_amount": 5},
+            {"priority": 1, "adjustment_amount": 1},
+        )
+        self.assertEqual(price_of(compiled, 10), 11)
+        compiled = self._compile(
+            {"erp_category_id": "GIDA", "adjustment_amount": 1},
+            {"erp_branch_name": "merkez ", "erp_category_id": "GIDA", "adjustment_amount": 2},
+        )
+        self.assertEqual(price_of(compiled, 10), 12)
+        self.assertEqual(price_of(compiled, 10, branch={"erp_branch_name": "Şube 2"}), 11)
+
+    def test_price_limits_are_applied_before_rounding(self):
+        compiled = self._compile({"rounding_mode": "x99", "min_price": 5, "max_price": 95})
+        self.assertEqual(price_of(compiled, 3.2), 5.99)
+        self.assertEqual(price_of(compiled, 120), 94.99)
+        self.assertEqual(price_of(compiled, 50.5), 50.99)
+        compiled = self._compile({"rounding_mode": "x99", "min_price": 5, "max_price": 5})
+        self.assertEqual(price_of(compiled, 3.2), 5.0)
+
+    def test_category_rules_match_like_rule_scopes(self):
+        compiled = pricing.compile_pricing_rules([{"erp_category_id": " Temizlik ", "sync_enabled": True}],
+                                                 [{"id": 1, "erp_category_id": "TEMIZLIK", "adjustment_amount": 1}])
+        self.assertEqual(price_of(compiled, 10, group="temizlik"), 11)
+        self.assertEqual(price_of(compiled, 10, group="TEMIZLIK "), 11)
+        self.assertTrue(compiled.category_enabled("TEMIZLIK"))
+        self.assertFalse(compiled.category_enabled("GIDA"))
+
+
+@unittest.skipUnless(pricing.np is not None, "NumPy kurulu değil")
+class VectorizedParityTest(unittest.TestCase):
+    def setUp(self):
+        self._previous_flag = pricing.VECTORIZED_PRICING_ENABLED
+        pricing.VECTORIZED_PRICING_ENABLED = True
+        self.category_only = pricing.compile_pricing_rules(CATEGORY_RULES)
+        self.with_rules = pricing.compile_pricing_rules(CATEGORY_RULES, PRICING_RULES)
+
+    def tearDown(self):
+        pricing.VECTORIZED_PRICING_ENABLED = self._previous_flag
+
+    def _price_both_ways(self, compiled, products):
+        vectorized = compiled.price_batch(products, BRANCH)
+        pricing.VECTORIZED_PRICING_ENABLED = False
+        try:
+            python = compiled.price_batch(products, BRANCH)
+        finally:
+            pricing.VECTORIZED_PRICING_ENABLED = True
+        return vectorized, python
+
+    def test_round_prices_matches_builtin_round(self):
+        rng = random.Random(7)
+        values = [2.675, 1.005, 0.125, 0.375, 1234.565, 10.0, 0.0, 99.995, 4.39, 129.99]
+        values += [round(rng.uniform(0, 1000), 3) for _ in range(2000)]
+        values += [rng.randint(0, 100000) / 1000 + 0.005 for _ in range(2000)]
+        rounded = pricing._round_prices(pricing.np.array(values, dtype=pricing.np.float64))
+        self.assertEqual(rounded, [round(value, 2) for value in values])
+
+    def test_paths_agree_on_mixed_products(self):
+        products = make_products(3000)
+        for compiled in (self.category_only, self.with_rules):
+            with self.subTest(rule_count=compiled.rule_count):
+                vectorized, python = self._price_both_ways(compiled, products)
+                self.assertEqual(vectorized, python)
+
+    def test_category_filter_and_unpriced_products(self):
+        products = make_products(512)
+        result = self.category_only.price_batch(products, BRANCH)
+        send_rows = {str(p.barcode1).strip(): p for p in products if p.barcode1}
+
+        groups = {send_rows[barcode].erp_grup_kod for barcode in result.send_barcodes}
+        self.assertLessEqual(groups, {"GIDA", "ICECEK", "KOZMETIK"})
+        # Boş fiyatlı ürünler, kategorisi açıksa fiyatsız sayılır; kapalı kategoriler fiyatsız listesine girmez
+        for row_index, price in result.unpriced:
+            self.assertIn(products[row_index].erp_grup_kod, {"GIDA", "ICECEK", "KOZMETIK"})
+            self.assertLessEqual(price, 0)
+        self.assertTrue(any(products[row_index].price is None for row_index, _ in result.unpriced))
+        self.assertEqual(len(result.barcodes), sum(1 for p in products if str(p.barcode1 or '').strip()))
+
+    def test_vectorized_path_starts_at_threshold(self):
+        for compiled in (self.category_only, self.with_rules):
+            for count in (pricing.VECTORIZE_MIN_ROWS - 1, pricing.VECTORIZE_MIN_ROWS):
+                products = make_products(count, seed=count)
+                with self.subTest(rule_count=compiled.rule_count, count=count), \
+                        mock.patch.object(compiled, "_price_batch_vectorized",
+                                          wraps=compiled._price_batch_vectorized) as vectorized_call:
+                    vectorized, python = self._price_both_ways(compiled, products)
+                    self.assertEqual(vectorized_call.called, count >= pricing.VECTORIZE_MIN_ROWS)
+                    self.assertEqual(vectorized, python)
+
+
+if __name__ == "__main__":
+    unittest.main()
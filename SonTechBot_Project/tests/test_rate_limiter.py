@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 06:00
+# Yapılan Değişiklikler:
+# 1. Trendyol istemcilerinin jeton kovalarını satıcı ve uç nokta bazında paylaştığını doğrulayan testler.
+
+import unittest
+
+from sontechbot.ecommerce_integrations.rate_limiter import clear_shared_buckets, get_shared_bucket
+from sontechbot.ecommerce_integrations.trendyol_handler import TrendyolGoAPI
+
+PRICE_ENDPOINT = "/integrator/inventory/sellers/1/price-and-inventory"
+
+
+def make_client(supplier_id="1000", rate_limits=None):
+    return TrendyolGoAPI(supplier_id, "key", "secret", None, base_url_override="http://127.0.0.1:1",
+                         rate_limits=rate_limits)
+
+
+class SharedBucketTest(unittest.TestCase):
+    def setUp(self):
+        clear_shared_buckets()
+
+    def tearDown(self):
+        clear_shared_buckets()
+
+    def test_clients_of_same_supplier_share_buckets(self):
+        first, second = make_client(), make_client()
+        try:
+            self.assertIs(first._get_bucket(PRICE_ENDPOINT), second._get_bucket(PRICE_ENDPOINT))
+            self.assertIsNot(first._get_bucket(PRICE_ENDPOINT), first._get_bucket("/other"))
+        finally:
+            first.close()
+            second.close()
+
+    def test_different_suppliers_have_separate_buckets(self):
+        first, second = make_client("1000"), make_client("2000")
+        try:
+            self.assertIsNot(first._get_bucket(PRICE_ENDPOINT), second._get_bucket(PRICE_ENDPOINT))
+        finally:
+            first.close()
+            second.close()
+
+    def test_shared_tokens_are_drawn_from_one_limit(self):
+        first = get_shared_bucket("scope", "price-and-inventory", rate=1000, capacity=2)
+        second = get_shared_bucket("scope", "price-and-inventory", rate=1000, capacity=2)
+        first.acquire()
+        first.acquire()
+        # Kapasite iki istemcinin toplamı için geçerlidir; üçüncü jeton için beklenir
+        self.assertGreater(second.acquire(), 0)
+
+    def test_changed_limits_update_existing_bucket(self):
+        bucket = get_shared_bucket("scope", "default", rate=5, capacity=10)
+        self.assertIs(get_shared_bucket("scope", "default", rate=2, capacity=4), bucket)
+        self.assertEqual((bucket.rate, bucket.capacity), (2.0, 4.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
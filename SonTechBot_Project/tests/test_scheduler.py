@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 11:00
+# Yapılan Değişiklikler:
+# 1. 'wait_until' yardımcısı 'tests.fakes' içinden kullanılıyor.
+#
+# Zamanlayıcının zaman aralığı tanımları, gece yarısını geçen aralıklar, kaymayan (drift-free) çalışma
+# zamanı hesabı ve çakışma politikaları (skip/queue) için testler. Saat, zamanlayıcıya dışarıdan verilir.
+
+import datetime
+import threading
+import time
+import unittest
+
+from sontechbot.core.scheduler import (MAX_CATCH_UP, OVERLAP_QUEUE, OVERLAP_SKIP, SyncScheduler,
+                                       interval_at, next_slot, next_slot_after, parse_schedule_windows)
+from tests.fakes import wait_until
+
+# 17.10.2025 bir Cuma'dır (ISO gün numarası 5)
+FRIDAY = datetime.datetime(2025, 10, 17)
+
+
+def at(day_offset, hour, minute=0, second=0):
+    return FRIDAY + datetime.timedelta(days=day_offset, hours=hour, minutes=minute, seconds=second)
+
+
+class FakeClock:
+    def __init__(self, moment):
+        self.moment = moment
+
+    def __call__(self):
+        return self.moment
+
+
+class ParseScheduleWindowsTest(unittest.TestCase):
+    def test_day_ranges_lists_and_every_day(self):
+        windows = parse_schedule_windows("1-5 09:00-22:00=5; 6,7 10:00-20:00=10; 22:00-09:00=60")
+        self.assertEqual([w.weekdays for w in windows],
+                         [frozenset({1, 2, 3, 4, 5}), frozenset({6, 7}), frozenset(range(1, 8))])
+        self.assertEqual([(w.start_minute, w.end_minute, w.interval_seconds) for w in windows],
+                         [(540, 1320, 300), (600, 1200, 600), (1320, 540, 3600)])
+
+    def test_empty_text_has_no_windows(self):
+        self.assertEqual(parse_schedule_windows(""), [])
+        self.assertEqual(parse_schedule_windows(None), [])
+
+    def test_invalid_definitions_raise(self):
+        for text in ("09:00-22:00", "8 09:00-22:00=5", "1-5 09:00-09:00=5", "09:00-22:00=0", "25:00-26:00=5",
+                     "1 2 09:00-10:00=5"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_schedule_windows(text)
+
+
+class ScheduleWindowTest(unittest.TestCase):
+    def test_window_crossing_midnight_belongs_to_start_day(self):
+        window = parse_schedule_windows("5 22:00-06:00=60")[0]
+        self.assertTrue(window.contains(at(0, 23)))        # Cuma 23:00
+        self.assertTrue(window.contains(at(1, 5, 59)))     # Cumartesi 05:59
+        self.assertFalse(window.contains(at(1, 6)))        # Cumartesi 06:00 (bitiş hariç)
+        self.assertFalse(window.contains(at(1, 23)))       # Cumartesi 23:00
+        self.assertFalse(window.contains(at(0, 5)))        # Cuma 05:00 (Perşembe başlamadı)
+
+    def test_first_matching_window_wins(self):
+        windows = parse_schedule_windows("5 09:00-12:00=5; 09:00-22:00=10")
+        self.assertEqual(interval_at(at(0, 10), 3600, windows), 300)
+        self.assertEqual(interval_at(at(0, 13), 3600, windows), 600)
+        self.assertEqual(interval_at(at(0, 23), 3600, windows), 3600)
+
+    def test_next_start_skips_days_not_in_window(self):
+        window = parse_schedule_windows("1-5 09:00-22:00=5")[0]
+        self.assertEqual(window.next_start_after(at(0, 10)), at(3, 9))   # Cuma 10:00 -> Pazartesi 09:00
+
+
+class NextSlotTest(unittest.TestCase):
+    def test_slots_stay_aligned_to_previous_slot(self):
+        # Döngü 17 dakika sürse de plan 10:00 hizasında devam eder; 10:15 ve 10:10 kaçırılır, 10:20 seçilir
+        self.assertEqual(next_slot_after(at(0, 10), at(0, 10, 17), 5 * 60), at(0, 10, 20))
+        self.assertEqual(next_slot_after(at(0, 10), at(0, 10, 4, 59), 5 * 60), at(0, 10, 5))
+
+    def test_slot_moves_to_start_of_more_frequent_window(self):
+        windows = parse_schedule_windows("09:00-22:00=5")
+        self.assertEqual(next_slot(at(0, 8, 30), 3600, windows), at(0, 9))
+        self.assertEqual(next_slot(at(0, 9), 3600, windows), at(0, 9, 5))
+        self.assertEqual(next_slot(at(0, 21, 55), 3600, windows), at(0, 22))
+        self.assertEqual(next_slot(at(0, 22), 3600, windows), at(0, 23))
+
+    def test_interval_follows_window_crossing_midnight(self):
+        windows = parse_schedule_windows("22:00-06:00=120")
+        self.assertEqual(next_slot(at(0, 23), 600, windows), at(1, 1))
+        self.assertEqual(next_slot(at(1, 5), 600, windows), at(1, 7))
+        self.assertEqual(next_slot(at(1, 6), 600, windows), at(1, 6, 10))
+
+    def test_long_downtime_restarts_plan_from_now(self):
+        now = at(0, 10) + MAX_CATCH_UP + datetime.timedelta(minutes=7)
+        self.assertEqual(next_slot_after(at(0, 10), now, 5 * 60), now + datetime.timedelta(minutes=5))
+
+
+class OverlapPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(at(0, 10))
+        self.scheduler = SyncScheduler(now_func=self.clock)
+        self.runs = []
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def _add_job(self, overlap_policy):
+        def job():
+            self.runs.append(self.clock())
+
+        self.scheduler.add_job("sync", job, 5, overlap_policy=overlap_policy, persist=False)
+        # Kayıtlı zaman olmadığı için iş hemen bir kez çalışır
+        self.assertTrue(wait_until(lambda: len(self.runs) == 1 and not self.scheduler.is_scope_running("sync")))
+
+    def _run_manual_cycle_while(self, action):
+        started, release = threading.Event(), threading.Event()
+
+        def manual_cycle():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=self.scheduler.run_exclusive, args=("sync", manual_cycle))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        try:
+            action()
+        finally:
+            release.set()
+            thread.join(5)
+
+    def test_queued_run_starts_when_manual_run_finishes(self):
+        self._add_job(OVERLAP_QUEUE)
+
+        def queue_run():
+            self.scheduler.run_now("sync")
+            self.assertTrue(self.scheduler.get_job_status("sync")["queued"])
+
+        self._run_manual_cycle_while(queue_run)
+        # Bir sonraki planlı zaman (10:05) gelmeden, elle başlatılan döngü biter bitmez çalışır
+        self.assertTrue(wait_until(lambda: len(self.runs) == 2))
+        self.assertFalse(self.scheduler.get_job_status("sync")["queued"])
+
+    def test_skipped_run_is_counted_and_not_repeated(self):
+        self._add_job(OVERLAP_SKIP)
+        self._run_manual_cycle_while(lambda: self.scheduler.run_now("sync"))
+
+        self.assertEqual(self.scheduler.get_job_status("sync")["skipped_runs"], 1)
+        time.sleep(0.1)
+        self.assertEqual(len(self.runs), 1)
+
+    def test_manual_run_is_refused_while_job_runs(self):
+        release = threading.Event()
+        self.scheduler.add_job("sync", lambda: release.wait(5), 5, persist=False)
+        self.assertTrue(wait_until(lambda: self.scheduler.is_scope_running("sync")))
+        try:
+            self.assertFalse(self.scheduler.run_exclusive("sync", self.fail))
+        finally:
+            release.set()
+        self.assertTrue(wait_until(lambda: not self.scheduler.is_scope_running("sync")))
+        self.assertTrue(self.scheduler.run_exclusive("sync", lambda: None))
+
+
+if __name__ == "__main__":
+    unittest.main()
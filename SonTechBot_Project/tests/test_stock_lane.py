@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Güncelleme Tarihi: 19.10.2026 08:30
+# Yapılan Değişiklikler:
+# 1. ERP'den stoklu ürün dönmeyen şubenin ürünlerinin sıfırlanmaması için test eklendi.
+#
+# Stok kulvarının senkronizasyonu kapatılan kategorileri ayıklaması, tam senkronizasyonun işlediği mağazaya
+# dokunmaması, boş geçen döngülerin geçmişe yazılmaması ve stok kulvarı kayıtlarının ana panel özeti, sağlık
+# puanı ve geçmiş listesinden ayrılması da test edilir.
+
+import datetime
+import time
+import unittest
+
+from sontechbot.core import synchronizer
+from sontechbot.core.adaptive_batcher import AdaptiveChunker
+from sontechbot.core.batch_poller import batch_poller
+from sontechbot.core.pricing import compile_pricing_rules
+from sontechbot.erp_integrations import ERPStockRow
+from sontechbot.repositories import dashboard_repo, history_repo, snapshot_repo
+from tests.fakes import TemporaryDatabase
+
+STORE_ID = "900001"
+BRANCH = {"erp_branch_name": "Merkez", "trendyol_store_id": STORE_ID, "erp_location_id": "101", "stock_buffer": 0}
+
+
+def sent_item(barcode, quantity, price=10.0):
+    return {"barcode": barcode, "quantity": quantity, "sellingPrice": price, "originalPrice": price, "storeId": STORE_ID}
+
+
+class FakeStockClient:
+    def __init__(self):
+        self.sent = []
+
+    def update_stock_price(self, chunk):
+        self.sent.extend(chunk)
+        return {"batchRequestId": f"B{len(self.sent)}"}
+
+    def get_last_request_stats(self):
+        return {"wait_seconds": 0.0}
+
+
+class StockLaneTest(unittest.TestCase):
+    def setUp(self):
+        self.database = TemporaryDatabase().start()
+        self.pricing_rules = compile_pricing_rules([
+            {"erp_category_id": "GIDA", "sync_enabled": True},
+            {"erp_category_id": "TEMIZLIK", "sync_enabled": False},
+        ])
+        self.client = FakeStockClient()
+        snapshot_repo.save_snapshots(STORE_ID, [sent_item("A", 5), sent_item("B", 5), sent_item("C", 5)])
+
+    def tearDown(self):
+        # Gönderilen paketler kaydedilirken paket sonucu kontrolü de başlatılır
+        batch_poller.stop()
+        self.database.stop()
+
+    def _sync(self, stock_rows):
+        return synchronizer._sync_branch_stock(BRANCH, self.client, stock_rows, self.pricing_rules,
+                                               AdaptiveChunker.fixed(100))
+
+    def test_disabled_category_is_not_updated(self):
+        result = self._sync({"A": ERPStockRow(8, "GIDA"), "B": ERPStockRow(9, "TEMIZLIK")})
+
+        # B'nin kategorisi kapatıldı; C artık stoklu değil ve sıfırlanır
+        self.assertEqual({item["barcode"]: item["quantity"] for item in self.client.sent}, {"A": 8, "C": 0})
+        self.assertEqual(result["processed"], 2)
+        self.assertEqual(snapshot_repo.get_snapshots_for_store(STORE_ID)["B"]["quantity"], 5)
+
+    def test_empty_erp_result_does_not_zero_store(self):
+        result = self._sync({})
+
+        self.assertEqual(self.client.sent, [])
+        self.assertEqual(result["processed"], 0)
+        self.assertEqual(snapshot_repo.get_snapshots_for_store(STORE_ID)["A"]["quantity"], 5)
+
+    def test_store_locked_by_full_sync_is_skipped(self):
+        with synchronizer._get_store_lock(STORE_ID):
+            result = self._sync({"A": ERPStockRow(8, "GIDA")})
+
+        self.assertEqual(self.client.sent, [])
+        self.assertEqual(result["processed"], 0)
+        self.assertFalse(synchronizer._get_store_lock(STORE_ID).locked())
+
+
+class StockHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.database = TemporaryDatabase().start()
+
+    def tearDown(self):
+        self.database.stop()
+
+    def _finish(self, sync_type, status="Başarılı", record_history=True):
+        totals = {"processed": 10, "sent": 0, "issues": 0}
+        return synchronizer._finish_cycle(sync_type, datetime.datetime.now(), time.time(), status, f"{sync_type} özeti",
+                                          totals, [], record_history=record_history)
+
+    def test_idle_cycle_is_not_recorded(self):
+        result = self._finish("auto-stock", record_history=False)
+
+        self.assertIsNone(result["history_id"])
+        self.assertEqual(history_repo.get_sync_history(include_stock=True), [])
+
+    def test_stock_cycles_are_left_out_of_dashboard_and_history(self):
+        self._finish("auto")
+        self._finish("auto-stock", status="Kritik Hata")
+        self._finish("cli-stock", status="Kritik Hata")
+
+        self.assertEqual([r["sync_type"] for r in history_repo.get_sync_history()], ["auto"])
+        self.assertEqual(len(history_repo.get_sync_history(include_stock=True)), 3)
+        stats = dashboard_repo.get_dashboard_stats()
+        self.assertEqual(stats["last_sync_summary"], "auto özeti")
+        self.assertEqual(stats["health_score"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()